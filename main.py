@@ -14,6 +14,8 @@ from gi.repository import Gtk, Adw, Gio  # type: ignore
 from ui.mainwindow import MainWindow
 from ui.notifymanager import NotifyManager
 from ui.signalmanager import SignalManager
+from ui.executor import CalcExecutor, SWE_LOCK
+from sweph import timezones
 
 
 class AstrogtApp(Gtk.Application):
@@ -28,9 +30,12 @@ class AstrogtApp(Gtk.Application):
         # managers
         self.signal_manager = SignalManager(self)
         self.notify_manager = NotifyManager(self)
+        self.executor = CalcExecutor(self)
         # initialize sweph
         ephemeris_path = os.path.join(os.path.dirname(__file__), "sweph/ephe")
         swe.set_ephe_path(ephemeris_path)
+        # timezonefinder is slow to load : do it while ui starts
+        timezones.start()
         # early initialize chart_settings if used before being set by panelsettings
         self.chart_settings = {}
 
@@ -58,8 +63,10 @@ class AstrogtApp(Gtk.Application):
         win.present()
 
     def do_shutdown(self):
-        # close sweph at application exit
-        swe.close()
+        # stop calculation worker, then close sweph at application exit
+        self.executor.shutdown()
+        with SWE_LOCK:
+            swe.close()
         # call parent shutdown
         Gio.Application.do_shutdown(self)
 
@@ -1,107 +1,143 @@
 # sweph/calculations/aspects.py
 # ruff: noqa: E402, E701
-import math
+import numpy as np
 import gi
 
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk  # type: ignore
-from typing import List
+from typing import Dict, List, Optional
 from ui.fonts.glyphs import ASPECTS
+from user.settings import ASPECT_ORBS
+
+
+# all pairs in one broadcast pass : result is structured array (n1 x n2)
+# aspect = index into ASPECT_ANGLES, -1 if none within orb
+ASPECT_ANGLES = np.array(sorted(ASPECTS), dtype=np.float64)
+ASPECT_DTYPE = np.dtype([
+    ("angle", "f8"),
+    ("aspect", "i1"),
+    ("orb", "f8"),
+    ("applying", "?"),
+])
+# draw order for tables
+DRAW_ORDER = ["mo", "me", "ve", "su", "ma", "ju", "sa", "ur", "ne", "pl", "ra"]
+
+
+def angle_diff(a, b):
+    # shortest angle difference, range -180..+180 (scalars or arrays)
+    diff = np.mod(np.subtract(b, a), 360.0)
+    return np.where(diff > 180.0, diff - 360.0, diff)
+
+
+def aspect_orbs(orb: Optional[float] = None) -> np.ndarray:
+    """orb per aspect angle : single orb overrides settings"""
+    if orb is not None:
+        return np.full(ASPECT_ANGLES.size, float(orb))
+    return np.array([ASPECT_ORBS.get(int(a), 1.5) for a in ASPECT_ANGLES])
+
+
+def aspect_grid(
+    lon1: np.ndarray,
+    speed1: np.ndarray,
+    lon2: np.ndarray,
+    speed2: np.ndarray,
+    orbs: Optional[np.ndarray] = None,
+    same: bool = False,
+) -> np.ndarray:
+    """aspects of every body in 1 to every body in 2"""
+    lon1, speed1 = np.asarray(lon1, float), np.asarray(speed1, float)
+    lon2, speed2 = np.asarray(lon2, float), np.asarray(speed2, float)
+    orbs = aspect_orbs() if orbs is None else orbs
+    angle = angle_diff(lon1[:, None], lon2[None, :])
+    # deviation from every aspect angle : n1 x n2 x aspects
+    dev = np.abs(np.abs(angle)[..., None] - ASPECT_ANGLES)
+    within = dev <= orbs
+    nearest = np.argmin(np.where(within, dev, np.inf), axis=-1)
+    has = within.any(axis=-1)
+    if same:
+        # object with itself : needed for matrix consistency only
+        np.fill_diagonal(has, False)
+    orb = np.take_along_axis(dev, nearest[..., None], axis=-1)[..., 0]
+    signed = np.copysign(ASPECT_ANGLES[nearest], angle)
+    delta_speed = speed2[None, :] - speed1[:, None]
+    grid = np.zeros(angle.shape, dtype=ASPECT_DTYPE)
+    grid["angle"] = angle
+    grid["aspect"] = np.where(has, nearest, -1)
+    grid["orb"] = np.where(has, orb, np.nan)
+    grid["applying"] = has & ((angle - signed) * delta_speed < 0)
+    if same:
+        np.fill_diagonal(grid["angle"], np.nan)
+    return grid
+
+
+def pos_arrays(pos, order: List[str] = DRAW_ORDER):
+    """positions dict (e1 / e2) or list (p2 / transit) to names, lon, speed"""
+    if isinstance(pos, dict):
+        items = [v for k, v in pos.items() if isinstance(k, int)]
+    else:
+        items = [v for v in pos or [] if isinstance(v, dict) and "lon" in v]
+    by_name = {v["name"]: v for v in items if v.get("name") in order}
+    names = [n for n in order if n in by_name]
+    lon = np.array([by_name[n]["lon"] for n in names], dtype=np.float64)
+    speed = np.array([by_name[n].get("lon speed", 0.0) for n in names])
+    return names, lon, speed.astype(np.float64)
+
+
+def grid_cell(grid: np.ndarray, i: int, j: int) -> Dict:
+    """dict view of one cell : for tables"""
+    cell = grid[i, j]
+    idx = int(cell["aspect"])
+    if idx < 0:
+        angle = float(cell["angle"])
+        return {
+            "angle": None if np.isnan(angle) else round(angle, 2),
+            "major": False,
+            "aspect": None,
+            "aspect angle": None,
+            "glyph": "",
+            "orb": None,
+            "applying": None,
+        }
+    asp_angle = int(ASPECT_ANGLES[idx])
+    glyph, name = ASPECTS[asp_angle]
+    return {
+        "angle": round(float(cell["angle"]), 2),
+        "major": True,
+        "aspect": name,
+        "aspect angle": asp_angle,
+        "glyph": glyph,
+        "orb": round(float(cell["orb"]), 1),
+        "applying": bool(cell["applying"]),
+    }
 
 
-def angle_diff(a: float, b: float) -> float:
-    # shortest angle difference, range -180..+180
-    diff = (b - a) % 360.0
-    # diff = (a - b) % 360.0 # for am2, also change line there
-    if diff > 180.0:
-        diff -= 360.0
-    return diff
-
-
-def normalize_deg(a):
-    # normalize to 0..360, allow tuple input
-    if isinstance(a, tuple):
-        a = a[0]
-    return a % 360.0
-
-
-def is_applying(lon1, speed1, lon2, speed2, angle):
-    diff = angle_diff(lon1, lon2)
-    orb = diff - angle
-    delta_speed = speed2 - speed1
-    return orb * delta_speed < 0
-
-
-def nearest_major_aspect(angle: float, orb: float):
-    """get major aspects within defined orb"""
-    for aspect_angle, (glyph, aspect_name) in ASPECTS.items():
-        diff = min(abs(angle - aspect_angle), abs(360 - abs(angle - aspect_angle)))
-        if diff <= orb:
-            return aspect_angle, glyph, aspect_name, diff
-    return None
-
-
-def aspects_matrix(objs_map: list[str], pos_map: dict, orb: float):
-    num = len(objs_map)
-    matrix = []
-    for i in range(num):
-        row = []
-        obj1_name = objs_map[i]
-        obj1 = pos_map[obj1_name]
-        for j in range(num):
-            obj2_name = objs_map[j]
-            obj2 = pos_map[obj2_name]
-            if i == j:
-                # both obj are same planet : needed for matrix consistency only
-                row.append({
-                    "obj1": obj1_name,
-                    "obj2": obj2_name,
-                    "speed1": None,
-                    "angle": None,
-                    "major": False,
-                    "aspect": None,
-                    "aspect angle": None,
-                    "glyph": "",
-                    "orb": None,
-                    "applying": None,
-                })
-                continue
-            lon1, lon2 = obj1["lon"], obj2["lon"]
-            speed1, speed2 = obj1["lon speed"], obj2["lon speed"]
-            angle = angle_diff(lon1, lon2)
-            applying = None
-            asp_angle, glyph, asp_name, orb_actual = None, "", "", None
-            major = False
-            maj = nearest_major_aspect(abs(angle), orb)
-            if maj:
-                asp_angle, glyph, asp_name, orb_actual = maj
-                signed_asp_angle = math.copysign(asp_angle, angle)
-                applying = is_applying(lon1, speed1, lon2, speed2, signed_asp_angle)
-                major = True
-            row.append({
-                "obj1": obj1["name"],
-                "obj2": obj2["name"],
-                "angle": round(angle, 2),
-                "major": major,
-                "aspect": asp_name if major else None,
-                "aspect angle": asp_angle if major else None,
-                "glyph": glyph if major else "",
-                "orb": round(orb_actual, 1)
-                if orb_actual is not None and major
-                else None,
-                "applying": applying if major else None,
-            })
-        matrix.append(row)
-    # collect speed for retro character in panetables.py
-    speeds = {name: pos_map[name]["lon speed"] for name in objs_map}
-    return objs_map, matrix, speeds
+def cross_aspects(app, lon: np.ndarray, speed: np.ndarray) -> Dict:
+    """synastry grids of event 1 against event 2 & p2 : empty if no e2"""
+    cross = {}
+    if not app.e2_sweph.get("jd_ut"):
+        return cross
+    # transit ring packs e2 positions : same grid as e2
+    sources = {
+        "e2": getattr(app, "e2_positions", None),
+        "p2": getattr(app, "p2_pos", None),
+    }
+    for key, other in sources.items():
+        if not other:
+            continue
+        names2, lon2, speed2 = pos_arrays(other)
+        if names2:
+            cross[key] = {
+                "obj names": names2,
+                "grid": aspect_grid(lon, speed, lon2, speed2),
+            }
+    return cross
 
 
 def calculate_aspects(event: str):
     """calculate aspectarian for one or both events"""
     app = Gtk.Application.get_default()
     notify = app.notify_manager
-    msg = "event {event}\n"
+    msg = f"event {event}\n"
     # print flags
     print_am = False
     do_filter = False
@@ -113,43 +149,37 @@ def calculate_aspects(event: str):
             route=["terminal", "user"],
         )
         return
-    events: List[str] = [event] if event else ["e1", "e2"]
+    # e1 holds synastry grids : rebuilt on any e2 / p2 change or e2 clear
+    events: List[str] = ["e1"] if event == "e1" else ["e1", "e2"]
     if "e2" in events and not app.e2_sweph.get("jd_ut"):
         # skip e2 if no julian day 2 utc set = user not interested in e2
         events.remove("e2")
         msg += "e2 removed\n"
-    if event == "e1":
-        pos = getattr(app, "e1_positions", None)
-    elif event == "e2":
-        pos = getattr(app, "e2_positions", None)
-
-    draw_order = ["mo", "me", "ve", "su", "ma", "ju", "sa", "ur", "ne", "pl", "ra"]
-    if pos:
-        # get objects positions by name
-        pos_map = {v["name"]: v for k, v in pos.items() if isinstance(k, int)}
-        objs_map = [name for name in draw_order if name in pos_map]
-    msg = f"objsmap : {objs_map} | posmap : {pos_map}"
-    # msg += f"posmap : {pos_map}"
-    orb = 1.5
-    obj_names, aspect_matrix, speeds = aspects_matrix(objs_map, pos_map, orb)
-    aspects_data = {
-        "obj names": obj_names,
-        "aspects": aspect_matrix,
-        "speeds": speeds,
-    }
-
-    if print_am:
-        print("--- am ---")
-        for row in aspect_matrix:
-            for cell in row:
+    for ev in events:
+        pos = getattr(app, f"{ev}_positions", None)
+        if not pos:
+            continue
+        obj_names, lon, speed = pos_arrays(pos)
+        msg += f"{ev} objs : {obj_names}\n"
+        grid = aspect_grid(lon, speed, lon, speed, same=True)
+        aspects_data = {
+            "obj names": obj_names,
+            "grid": grid,
+            "speeds": dict(zip(obj_names, speed.tolist())),
+        }
+        if ev == "e1":
+            aspects_data["cross"] = cross_aspects(app, lon, speed)
+        if print_am:
+            print(f"--- am {ev} ---")
+            for i, j in zip(*np.nonzero(grid["aspect"] >= 0)):
+                cell = grid_cell(grid, i, j)
                 if not do_filter or cell.get("major"):
                     print(
-                        f"{cell['obj1']}->{cell['obj2']} | {cell['aspect']} | "
+                        f"{obj_names[i]}->{obj_names[j]} | {cell['aspect']} | "
                         f"applying={'a' if cell['applying'] else 's'} "
                     )
-        print("--- am end ---")
-    # --- new code end
-    app.signal_manager._emit("aspects_changed", event, aspects_data)
+            print("--- am end ---")
+        app.signal_manager._emit("aspects_changed", ev, aspects_data)
     notify.debug(
         msg,
         source="aspects",
@@ -158,5 +188,7 @@ def calculate_aspects(event: str):
 
 
 def connect_signals_aspects(signal_manager):
-    """update aspects when positions change"""
+    """update aspects when positions, p2 or event 2 change"""
     signal_manager._connect("positions_changed", calculate_aspects)
+    signal_manager._connect("p2_changed", calculate_aspects)
+    signal_manager._connect("e2_cleared", calculate_aspects)
@@ -0,0 +1,209 @@
+# sweph/calculations/astrofeatures.py
+# ruff: noqa: E402
+# astro state for every timestamp of a time series (ie datagraph ohlc bars) :
+# positions, naksatras, aspects, cyclic index, hora lord, station proximity
+# & running dasa lords of natal event
+# as columns of one dataframe, computed over whole time index at once
+# export from terminal :
+# python -m sweph.calculations.astrofeatures in.csv out.parquet [lon lat alt tz]
+import contextlib
+import os
+import sys
+import numpy as np
+import pandas as pd
+import swisseph as swe
+from typing import Iterable, Optional, Tuple
+from sweph.calculations.engine import calc_positions, codes_for
+from sweph.calculations.aspects import ASPECT_ANGLES, angle_diff, aspect_orbs
+from sweph.calculations.cyclicindex import SLOW_ORDER
+from sweph.calculations.hora import ORDER, hora_lords
+from sweph.calculations import stationindex
+from sweph.calculations.dasas import active_lords, get_system
+
+DEFAULT_OBJECTS = (
+    "sun",
+    "moon",
+    "mercury",
+    "venus",
+    "mars",
+    "jupiter",
+    "saturn",
+    "uranus",
+    "neptune",
+    "pluto",
+    "true node",
+)
+UNIX_EPOCH_JD = 2440587.5
+
+
+def index_to_jd(index: pd.DatetimeIndex, tz: str = "UTC") -> np.ndarray:
+    """datetime index (naive = local time in tz) to julian days utc"""
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        index = index.tz_localize(tz)
+    delta = index.tz_convert("UTC") - pd.Timestamp(0, tz="UTC")
+    days = delta / pd.Timedelta(days=1)
+    return np.asarray(days, dtype=np.float64) + UNIX_EPOCH_JD
+
+
+def aspect_columns(names, lon, speed, orb: Optional[float] = None) -> dict:
+    """aspect angle, orb & applying per body pair : time x pair in one pass"""
+    i, j = np.triu_indices(len(names), k=1)
+    angle = angle_diff(lon[:, i], lon[:, j])
+    dev = np.abs(np.abs(angle)[..., None] - ASPECT_ANGLES)
+    within = dev <= aspect_orbs(orb)
+    nearest = np.argmin(np.where(within, dev, np.inf), axis=-1)
+    has = within.any(axis=-1)
+    orb_ = np.take_along_axis(dev, nearest[..., None], axis=-1)[..., 0]
+    signed = np.copysign(ASPECT_ANGLES[nearest], angle)
+    applying = (angle - signed) * (speed[:, j] - speed[:, i]) < 0
+    cols = {}
+    for p, (a, b) in enumerate(zip(i.tolist(), j.tolist())):
+        pair = f"{names[a]}-{names[b]}"
+        cols[f"angle {pair}"] = angle[:, p]
+        cols[f"aspect {pair}"] = np.where(
+            has[:, p], ASPECT_ANGLES[nearest[:, p]], np.nan
+        )
+        cols[f"orb {pair}"] = np.where(has[:, p], orb_[:, p], np.nan)
+        cols[f"applying {pair}"] = has[:, p] & applying[:, p]
+    return cols
+
+
+def cycle_columns(names, lon, members: Optional[Iterable[str]] = None) -> dict:
+    """cyclic index as in cyclicindex.total_cycle()"""
+    members = set(members or SLOW_ORDER)
+    ordered = [n for n in SLOW_ORDER if n in members and n in names]
+    idx = [names.index(n) for n in ordered]
+    if len(idx) < 2:
+        return {}
+    i, j = np.triu_indices(len(idx), k=1)
+    cols = np.array(idx)
+    total = np.abs(angle_diff(lon[:, cols[i]], lon[:, cols[j]])).sum(axis=1)
+    norm = np.mod(total, 360.0)
+    return {
+        "cycle total": total,
+        "cycle norm": norm,
+        "cycle phase": np.where(norm <= 180.0, 1, -1).astype(np.int8),
+    }
+
+
+def station_columns(
+    jds: np.ndarray, codes, names, flag: int, build: bool = False
+) -> dict:
+    """days since previous & until next station, nan outside index range
+    or if index is missing : built here only if build (terminal export)"""
+    index = stationindex.load_index(flag, build=build)
+    cols = {}
+    for code, name in zip(codes, names):
+        if index is None and code in stationindex.BODIES:
+            # same columns without index : run stationindex from terminal
+            cols[f"since station {name}"] = np.full(jds.size, np.nan)
+            cols[f"to station {name}"] = np.full(jds.size, np.nan)
+            continue
+        stations = index.get(code) if index else None
+        if stations is None or stations.size < 2:
+            continue
+        k = np.searchsorted(stations, jds)
+        ok = (k > 0) & (k < stations.size)
+        k = np.clip(k, 1, stations.size - 1)
+        cols[f"since station {name}"] = np.where(ok, jds - stations[k - 1], np.nan)
+        cols[f"to station {name}"] = np.where(ok, stations[k] - jds, np.nan)
+    return cols
+
+
+def dasa_columns(
+    jds: np.ndarray, natal: Tuple[float, float], systems: Iterable[str], levels: int
+) -> dict:
+    """running lords per dasa system & level for natal (moon lon, jd ut)"""
+    mo_lon, e1_jd = natal
+    cols = {}
+    for name in systems:
+        lords = active_lords(name, float(mo_lon), float(e1_jd), jds, levels)
+        categories = get_system(name).lords
+        for level in range(levels):
+            cols[f"dasa {name} {level + 1}"] = pd.Categorical.from_codes(
+                lords[:, level], categories=categories
+            )
+    return cols
+
+
+def astro_features(
+    index: pd.DatetimeIndex,
+    flag: int,
+    location: Optional[Tuple[float, float, float]] = None,
+    objects: Iterable[str] = DEFAULT_OBJECTS,
+    tz: str = "UTC",
+    use_mean_node: bool = False,
+    use_28_naks: bool = False,
+    cycle_members: Optional[Iterable[str]] = None,
+    orb: Optional[float] = None,
+    natal: Optional[Tuple[float, float]] = None,
+    dasa_systems: Iterable[str] = ("vimsottari", "yogini", "ashtottari"),
+    dasa_levels: int = 2,
+    lock=None,
+    build_stations: bool = False,
+) -> pd.DataFrame:
+    """astro state columns for every timestamp of index
+    lock (swe lock) is held per body & sweph step only, not for whole export"""
+    lock = lock or contextlib.nullcontext()
+    jds = index_to_jd(index, tz)
+    codes, names = codes_for(objects, use_mean_node)
+    shape = (jds.size, len(codes))
+    lon, lat, speed = np.empty(shape), np.empty(shape), np.empty(shape)
+    naks = np.empty(shape, dtype=np.int16)
+    for c, code in enumerate(codes):
+        with lock:
+            pos = calc_positions(jds, [code], flag, use_28_naks)
+        lon[:, c], lat[:, c] = pos["lon"], pos["lat"]
+        speed[:, c], naks[:, c] = pos["lon_speed"], pos["naksatra"]
+    cols = {"jd": jds}
+    for c, name in enumerate(names):
+        cols[f"lon {name}"] = lon[:, c]
+        cols[f"lat {name}"] = lat[:, c]
+        cols[f"speed {name}"] = speed[:, c]
+        cols[f"retro {name}"] = speed[:, c] < 0
+        cols[f"sign {name}"] = np.floor_divide(lon[:, c], 30).astype(np.int8)
+        cols[f"naksatra {name}"] = naks[:, c]
+    cols.update(aspect_columns(names, lon, speed, orb))
+    cols.update(cycle_columns(names, lon, cycle_members))
+    if location is not None:
+        with lock:
+            lords = hora_lords(jds, *location, flag=flag)
+        cols["hora"] = pd.Categorical.from_codes(lords, categories=ORDER)
+    with lock:
+        cols.update(station_columns(jds, codes, names, flag, build_stations))
+    if natal is not None:
+        cols.update(dasa_columns(jds, natal, dasa_systems, dasa_levels))
+    return pd.DataFrame(cols, index=index)
+
+
+def export_features(df: pd.DataFrame, path: str):
+    """write parquet or feather (by extension) : both need pyarrow"""
+    if path.endswith((".feather", ".arrow")):
+        df.reset_index().to_feather(path)
+    else:
+        df.to_parquet(path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        sys.exit(
+            "usage : astrofeatures in.csv out.parquet|out.feather [lon lat alt tz]"
+        )
+    src, dst = sys.argv[1], sys.argv[2]
+    location = (
+        tuple(float(v) for v in sys.argv[3:6]) if len(sys.argv) >= 6 else None
+    )
+    tz = sys.argv[6] if len(sys.argv) > 6 else "UTC"
+    swe.set_ephe_path(os.path.dirname(stationindex.INDEX_DIR))
+    data = pd.read_csv(src, parse_dates=["datetime"], index_col="datetime")
+    features = astro_features(
+        data.index,
+        swe.FLG_SWIEPH | swe.FLG_SPEED,
+        location,
+        tz=tz,
+        build_stations=True,
+    )
+    export_features(data.join(features), dst)
+    print(f"{len(features)} rows x {features.shape[1]} astro columns : {dst}")
+    swe.close()
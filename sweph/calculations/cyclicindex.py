@@ -52,6 +52,12 @@ def calculate_cycles(event: str):
     # calculate compound & custom cycle table for event
     app = Gtk.Application.get_default()
     notify = app.notify_manager
+    if event is None:
+        # settings changed : all events with positions
+        for ev in ("e1", "e2"):
+            if getattr(app, f"{ev}_positions", None):
+                calculate_cycles(ev)
+        return
     if event not in ("e1", "e2"):
         return
     pos = getattr(app, f"{event}_positions", None)
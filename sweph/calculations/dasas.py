@@ -0,0 +1,273 @@
+# sweph/calculations/dasas.py
+# ruff: noqa: E402
+# naksatra dasa systems as data (lord sequence, years & start rule) sharing
+# one lazily expanded period tree : periods running at any julian day are
+# found with 1 bisect per level ; batch lookups (ie every datagraph bar) use
+# np.searchsorted over precomputed period boundaries of each level
+import numpy as np
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict
+
+YEARLENGTH = 365.2425
+# system name -> lords (in sequence order), years per lord & start rule :
+# start[naksatra - 1] = index of lord running when moon enters naksatra ;
+# consecutive naksatras with same start lord form 1 group (ie 3 or 4 naks in
+# ashtottari) & elapsed part of 1st period = moon traversed part of its
+# group ; short systems repeat their sequence (cycles) to cover life span
+DASA_SYSTEMS: Dict[str, dict] = {
+    "vimsottari": {
+        "lords": ("ke", "ve", "su", "mo", "ma", "ra", "ju", "sa", "me"),
+        "years": (7, 20, 6, 10, 7, 18, 16, 19, 17),
+        "start": tuple(n % 9 for n in range(27)),
+        "cycles": 1,
+    },
+    # mangala, pingala, dhanya, bhramari, bhadrika, ulka, siddha, sankata :
+    # (naksatra + 3) % 8 counted from mangala, 0 = sankata
+    "yogini": {
+        "lords": ("mo", "su", "ju", "ma", "me", "sa", "ve", "ra"),
+        "years": (1, 2, 3, 4, 5, 6, 7, 8),
+        "start": tuple((n + 2) % 8 for n in range(1, 28)),
+        "cycles": 3,
+    },
+    # su from ardra (4 naks), mo (3), ma (4), me (3), sa (3 : abhijit is not
+    # used with 27 naksatras), ju (3), ra (4), ve (3)
+    "ashtottari": {
+        "lords": ("su", "mo", "ma", "me", "sa", "ju", "ra", "ve"),
+        "years": (6, 15, 8, 17, 10, 19, 12, 21),
+        "start": (
+            (6, 6, 7, 7, 7)
+            + (0,) * 4
+            + (1,) * 3
+            + (2,) * 4
+            + (3,) * 3
+            + (4,) * 3
+            + (5,) * 3
+            + (6,) * 2
+        ),
+        "cycles": 1,
+    },
+}
+
+
+def find_nakshatra(mo_deg):
+    # naksatra index & fraction from moon longitude
+    part = 360 / 27
+    idx = int(mo_deg // part) + 1
+    frac = (mo_deg % part) / part
+    return idx, frac
+
+
+class DasaSystem:
+    """lords, years & start rule of one dasa system"""
+
+    def __init__(self, name: str, data: dict):
+        self.name = name
+        self.lords = tuple(data["lords"])
+        self.years = np.asarray(data["years"], dtype=np.float64)
+        self.total = float(self.years.sum())
+        self.start = tuple(data["start"])
+        self.cycles = int(data.get("cycles", 1))
+        if len(self.start) != 27:
+            raise ValueError(f"dasas : {name} start rule needs 27 naksatras")
+        # balance data : position of naksatra in its group & group length
+        self.group_pos, self.group_len = self._groups()
+
+    def __repr__(self):
+        return f"dasa system : {self.name} {self.total:g} y x {self.cycles}"
+
+    def _groups(self):
+        # runs of equal start lord, wrapping from revati to asvini
+        start = self.start
+        if len(set(start)) == 1:
+            return (0,) * 27, (27,) * 27
+        first = next(n for n in range(27) if start[n] != start[n - 1])
+        pos = [0] * 27
+        size = [1] * 27
+        run = []
+        for k in range(27):
+            n = (first + k) % 27
+            if run and start[n] != start[run[0]]:
+                for i, m in enumerate(run):
+                    pos[m], size[m] = i, len(run)
+                run = []
+            run.append(n)
+        for i, m in enumerate(run):
+            pos[m], size[m] = i, len(run)
+        return tuple(pos), tuple(size)
+
+    def balance(self, mo_deg):
+        """lord index running at birth & its elapsed part (0 - 1) : moon
+        traversed part of its naksatra group"""
+        idx, frac = find_nakshatra(mo_deg)
+        n = idx - 1
+        return self.start[n], (self.group_pos[n] + frac) / self.group_len[n]
+
+    def seq(self, index: int):
+        """lord indices in sequence starting from lord index"""
+        n = len(self.lords)
+        return [(index + k) % n for k in range(n)]
+
+
+@lru_cache(maxsize=None)
+def get_system(name: str) -> DasaSystem:
+    if name not in DASA_SYSTEMS:
+        raise ValueError(f"dasas : unknown dasa system {name}")
+    return DasaSystem(name, DASA_SYSTEMS[name])
+
+
+class DasaPeriod:
+    """one dasa period (lord, start, end) : sub-periods are expanded on first
+    access only, so any number of levels costs nothing until it is viewed"""
+
+    __slots__ = (
+        "system",
+        "index",
+        "level",
+        "start",
+        "end",
+        "full_start",
+        "_children",
+        "_starts",
+    )
+
+    def __init__(self, system, index, level, full_start, end, birth_jd):
+        self.system = system
+        self.index = index
+        self.level = level
+        # period running at birth is shown from birth onwards, but divided
+        # into sub-periods from its full (theoretical) start
+        self.full_start = full_start
+        self.start = max(full_start, birth_jd)
+        self.end = end
+        self._children = None
+        self._starts = None
+
+    def __repr__(self):
+        return f"dasa : {self.level} {self.lord} {self.start:.3f} - {self.end:.3f}"
+
+    @property
+    def lord(self):
+        return self.system.lords[self.index]
+
+    @property
+    def years(self):
+        return (self.end - self.start) / YEARLENGTH
+
+    def children(self):
+        """sub-periods starting from own lord, proportional to lord years"""
+        if self._children is None:
+            system = self.system
+            # root holds all cycles of system, any other period 1 sequence
+            reps = system.cycles if self.level == 0 else 1
+            span = (self.end - self.full_start) / reps
+            seq = system.seq(self.index) * reps
+            children = []
+            cur = self.full_start
+            for k, index in enumerate(seq):
+                end = (
+                    self.end
+                    if k == len(seq) - 1
+                    else cur + span * float(system.years[index]) / system.total
+                )
+                # sub-periods elapsed before birth are dropped
+                if end > self.start:
+                    children.append(
+                        DasaPeriod(system, index, self.level + 1, cur, end, self.start)
+                    )
+                cur = end
+            self._children = children
+            self._starts = [c.start for c in children]
+        return self._children
+
+    def child_at(self, jd):
+        """sub-period running at jd, none outside this period"""
+        children = self.children()
+        i = bisect_right(self._starts, jd) - 1
+        if i >= 0 and jd < children[i].end:
+            return children[i]
+        return None
+
+
+@lru_cache(maxsize=32)
+def dasa_tree(name, mo_deg, e1_jd):
+    """root period of event spanning all system cycles : its children are
+    maha dasas, 1st one starting before birth by moon traversed part of its
+    naksatra group"""
+    system = get_system(name)
+    index, elapsed = system.balance(mo_deg)
+    full_start = e1_jd - elapsed * float(system.years[index]) * YEARLENGTH
+    end = full_start + system.total * system.cycles * YEARLENGTH
+    return DasaPeriod(system, index, 0, full_start, end, e1_jd)
+
+
+def active_chain(tree, jd, depth):
+    """periods running at jd, maha dasa first, up to depth levels"""
+    chain = []
+    node = tree
+    while node is not None and len(chain) < depth:
+        node = node.child_at(jd)
+        if node is not None:
+            chain.append(node)
+    return chain
+
+
+def visible_periods(tree, level, focus_jd=None):
+    """periods shown in table, depth-first, up to level
+    levels 3+ with focus : only periods running at focus jd for top levels
+    (level - 2), all periods of last 2 levels inside them"""
+    focus = level - 2 if focus_jd is not None and level >= 3 else 0
+    chain = active_chain(tree, focus_jd, focus) if focus else []
+
+    def walk(node):
+        depth = node.level + 1
+        for period in node.children():
+            if depth <= focus and (
+                len(chain) < depth or period is not chain[depth - 1]
+            ):
+                continue
+            yield period
+            if depth < level:
+                yield from walk(period)
+
+    return walk(tree)
+
+
+@lru_cache(maxsize=32)
+def level_bounds(name, mo_deg, e1_jd, level):
+    """start & end julian days and lord indices of all periods of level, in
+    time order : same division as tree, expanded level by level in numpy"""
+    system = get_system(name)
+    index, elapsed = system.balance(mo_deg)
+    full_start = e1_jd - elapsed * float(system.years[index]) * YEARLENGTH
+    n = len(system.lords)
+    part = system.years / system.total
+    starts = np.array([full_start])
+    ends = np.array([full_start + system.total * system.cycles * YEARLENGTH])
+    lords = np.array([index])
+    for depth in range(level):
+        reps = system.cycles if depth == 0 else 1
+        child = (lords[:, None] + np.arange(n * reps)) % n
+        span = (ends - starts)[:, None] / reps
+        cum = starts[:, None] + np.cumsum(span * part[child], axis=1)
+        cum[:, -1] = ends
+        first = np.concatenate([starts[:, None], cum[:, :-1]], axis=1)
+        keep = (cum > e1_jd).ravel()
+        starts = first.ravel()[keep]
+        ends = cum.ravel()[keep]
+        lords = child.ravel()[keep]
+    return np.maximum(starts, e1_jd), ends, lords
+
+
+def active_lords(name, mo_deg, e1_jd, jds, depth=2) -> np.ndarray:
+    """lord indices running at every jd : shape (jds, depth), -1 outside
+    system cycles ; o(log periods) per jd & level"""
+    jds = np.asarray(jds, dtype=np.float64)
+    out = np.full((jds.size, depth), -1, dtype=np.int8)
+    for level in range(1, depth + 1):
+        starts, ends, lords = level_bounds(name, mo_deg, e1_jd, level)
+        k = np.searchsorted(starts, jds, side="right") - 1
+        i = np.clip(k, 0, None)
+        ok = (k >= 0) & (jds < ends[i])
+        out[:, level - 1] = np.where(ok, lords[i], -1)
+    return out
@@ -0,0 +1,116 @@
+# sweph/calculations/engine.py
+# ruff: noqa: E402
+# batched position engine : all julian days x all bodies in one call
+# result is numpy structured array, one row per (jd, body)
+import numpy as np
+import swisseph as swe
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+from ui.helpers import _object_name_to_code as objcode
+from sweph.constants import NAKSATRAS27, MANSIONS28
+from sweph import ephestore
+
+POS_DTYPE = np.dtype([
+    ("jd", "f8"),
+    ("code", "i4"),
+    ("lon", "f8"),
+    ("lat", "f8"),
+    ("dist", "f8"),
+    ("lon_speed", "f8"),
+    ("lat_speed", "f8"),
+    ("dist_speed", "f8"),
+    ("naksatra", "i2"),
+    ("varga", "f8"),
+    ("ok", "?"),
+])
+
+
+def codes_for(objs: Iterable[str], use_mean_node: bool) -> Tuple[List[int], List[str]]:
+    """selected object names to sweph codes & short names"""
+    codes, names = [], []
+    for obj in objs or ():
+        code, name = objcode(obj, use_mean_node)
+        if code is None or code in codes:
+            continue
+        codes.append(code)
+        names.append(name)
+    return codes, names
+
+
+def naksatra_idx(lon: np.ndarray, use_28_naks: bool = False) -> np.ndarray:
+    """vectorized naksatra index (1-based) for longitudes"""
+    nak_num = 28 if use_28_naks else 27
+    span = 360 / nak_num
+    idx = np.floor_divide(np.nan_to_num(lon), span).astype(np.int16) + 1
+    return np.clip(idx, 1, nak_num)
+
+
+def naksatra_info(idx: int, use_28_naks: bool = False) -> Tuple[int, str, str]:
+    """naksatra index to (idx, name, ruler) as in calculate_naksatra()"""
+    naksatras = MANSIONS28 if use_28_naks else NAKSATRAS27
+    ruler, name = naksatras.get(int(idx), ("", ""))
+    return int(idx), name, ruler
+
+
+def varga_lon(lon: np.ndarray, division: Optional[int] = 9) -> np.ndarray:
+    """vectorized get_varga_lon()"""
+    lon = np.asarray(lon, dtype=np.float64)
+    if not division or division == 1:
+        return lon.copy()
+    part = 30 / division
+    sign = np.floor_divide(lon, 30)
+    seg = np.floor_divide(np.mod(lon, 30), part)
+    varga_sign = np.mod(sign * division + seg, 12)
+    return varga_sign * 30 + np.mod(lon, part) * division
+
+
+def calc_positions(
+    jds: Union[Sequence[float], float],
+    codes: Sequence[int],
+    flag: int,
+    use_28_naks: bool = False,
+    division: Optional[int] = 1,
+) -> np.ndarray:
+    """positions for all julian days x bodies : row order is jd-major"""
+    jds = np.atleast_1d(np.asarray(jds, dtype=np.float64))
+    codes = np.asarray(list(codes), dtype=np.int32)
+    out = np.zeros(jds.size * codes.size, dtype=POS_DTYPE)
+    if not out.size:
+        return out
+    out["jd"] = np.repeat(jds, codes.size)
+    out["code"] = np.tile(codes, jds.size)
+    # precomputed tables answer whole column at once, pyswisseph has no array
+    # interface : fill one raw block row by row for the rest, derive others
+    raw = np.full((jds.size, codes.size, 6), np.nan)
+    for c, code in enumerate(codes.tolist()):
+        table = ephestore.calc_array(jds, code, flag)
+        if table is not None:
+            raw[:, c] = table
+    raw = raw.reshape(out.size, 6)
+    calc_ut = swe.calc_ut
+    missing = np.nonzero(np.isnan(raw[:, 0]))[0]
+    for i, jd, code in zip(
+        missing.tolist(), out["jd"][missing].tolist(), out["code"][missing].tolist()
+    ):
+        try:
+            raw[i] = calc_ut(jd, code, flag)[0]
+        except swe.Error:
+            continue
+    out["lon"] = raw[:, 0]
+    out["lat"] = raw[:, 1]
+    out["dist"] = raw[:, 2]
+    out["lon_speed"] = raw[:, 3]
+    out["lat_speed"] = raw[:, 4]
+    out["dist_speed"] = raw[:, 5]
+    out["ok"] = ~np.isnan(raw[:, 0])
+    out["naksatra"] = naksatra_idx(out["lon"], use_28_naks)
+    out["varga"] = varga_lon(out["lon"], division)
+    return out
+
+
+def select(arr: np.ndarray, code: int, jd: Optional[float] = None) -> Optional[np.void]:
+    """single row for body (& julian day) or none"""
+    mask = (arr["code"] == code) & arr["ok"]
+    if jd is not None:
+        mask &= arr["jd"] == jd
+    rows = arr[mask]
+    return rows[0] if rows.size else None
@@ -1,12 +1,15 @@
 # sweph/calculations/hora.py
 # calculate sunrise & sunset & planetary hour / hora
 # planetary order : sa, ju, ma, su, ve, me, mo
+# sunrise / sunset are cached per (civil date, rounded location, flag)
 # ruff: noqa: E402
+import numpy as np
 import swisseph as swe
 import gi
 
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk  # type: ignore
+from functools import lru_cache
 from sweph.swetime import jd_to_custom_iso as jdtoiso
 
 # weekday number to name
@@ -21,62 +24,77 @@ WEEKDAY = {
 }
 # order of planetary hours
 ORDER = ["sa", "ju", "ma", "su", "ve", "me", "mo"]
+# days x locations kept in sunrise / sunset cache
+SUN_CACHE_SIZE = 1024
+# location rounding for cache key : 4 decimals = cca 11 m
+LOCATION_DIGITS = 4
 
 
-def get_current_hora(jd_ut, lon, lat, alt, flag):
-    # find current hora for given julian day utc
-    horas = get_day_horas(jd_ut, lon, lat, alt, flag=flag)
-    # print(f"hora : horas : {horas}")
-    if not horas:
-        return None
-    for hora in horas:
-        if hora.get("start_jd", 0.0) <= jd_ut < hora.get("end_jd", 0.0):
-            return hora["lord"]
-    return None
+def sunrise_weekday(srise, lon):
+    """weekday (monday = 0) of local date of sunrise : shifted by longitude
+    (local mean time), utc date is previous day east of cca 90 e"""
+    return swe.day_of_week(srise + lon / 360.0)
 
 
-def get_day_horas(jd_ut, lon, lat, alt, flag=0):
+def _location_key(lon, lat, alt):
+    # rounded location : nearby requests share cached sunrise / sunset
+    return (
+        round(float(lon), LOCATION_DIGITS),
+        round(float(lat), LOCATION_DIGITS),
+        round(float(alt or 0.0)),
+    )
+
+
+@lru_cache(maxsize=SUN_CACHE_SIZE)
+def _sun_times(jd_day, lon, lat, alt, flag):
+    # sunrise, sunset & next sunrise after start of civil day (jd_day)
+    _, data = swe.rise_trans(
+        jd_day,
+        swe.SUN,
+        swe.CALC_RISE,
+        (lon, lat, alt),
+        atpress=0.0,
+        attemp=0.0,
+        flags=flag,
+    )
+    srise = data[0]
+    # caluculate sunset
+    _, data = swe.rise_trans(
+        srise,
+        swe.SUN,
+        swe.CALC_SET,
+        (lon, lat, alt),
+        atpress=0.0,
+        attemp=0.0,
+        flags=flag,
+    )
+    sset = data[0]
+    # calculate next sunrise (+- 1 minute of current sunrise)
+    _, data = swe.rise_trans(
+        # search start @ 1 minute after sunset : should cover
+        # great deal of latitudes
+        srise + 0.9,  # (1.0 / 1440),
+        swe.SUN,
+        swe.CALC_RISE,
+        (lon, lat, alt),
+        atpress=0.0,
+        attemp=0.0,
+        flags=flag,
+    )
+    return srise, sset, data[0]
+
+
+def sun_times(jd_ut, lon, lat, alt, flag=0):
+    """sunrise, sunset & next sunrise of civil day of jd_ut : cached per
+    (date, rounded location, flag), none if calculation fails"""
     notify = Gtk.Application.get_default().notify_manager
-    # calculate list of all horas of the day
-    # take start of jd
-    Y, M, D, _ = swe.revjul(jd_ut)
-    jd_day = swe.julday(Y, M, D, 0.0)
+    key = _location_key(lon, lat, alt)
+    # take start of local (mean time) civil day of jd, in utc
+    shift = key[0] / 360.0
+    Y, M, D, _ = swe.revjul(jd_ut + shift)
+    jd_day = swe.julday(Y, M, D, 0.0) - shift
     try:
-        # calculate sunrise
-        _, data = swe.rise_trans(
-            jd_day,
-            swe.SUN,
-            swe.CALC_RISE,
-            (lon, lat, alt),
-            atpress=0.0,
-            attemp=0.0,
-            flags=flag,
-        )
-        srise = data[0]
-        # caluculate sunset
-        _, data = swe.rise_trans(
-            srise,
-            swe.SUN,
-            swe.CALC_SET,
-            (lon, lat, alt),
-            atpress=0.0,
-            attemp=0.0,
-            flags=flag,
-        )
-        sset = data[0]
-        # calculate next sunrise (+- 1 minute of current sunrise)
-        _, data = swe.rise_trans(
-            # search start @ 1 minute after sunset : should cover
-            # great deal of latitudes
-            srise + 0.9,  # (1.0 / 1440),
-            swe.SUN,
-            swe.CALC_RISE,
-            (lon, lat, alt),
-            atpress=0.0,
-            attemp=0.0,
-            flags=flag,
-        )
-        srise_next = data[0]
+        srise, sset, srise_next = _sun_times(jd_day, *key, flag)
     except Exception as e:
         notify.error(
             f"sunrise / set failed :\n\terror : {e}\nexiting ...",
@@ -85,22 +103,51 @@ def get_day_horas(jd_ut, lon, lat, alt, flag=0):
         )
         return None
     # validate
-    sunrise = jdtoiso(srise)
-    sunset = jdtoiso(sset)
-    sunrise_next = jdtoiso(srise_next)
     if not (srise < sset < srise_next):
         notify.error(
             f"invalid hora calculation :\n"
-            f"\tsunrise : {sunrise}\n"
-            f"\tsunset : {sunset}\n"
-            f"\tnext sunrise : {sunrise_next}\n"
+            f"\tsunrise : {jdtoiso(srise)}\n"
+            f"\tsunset : {jdtoiso(sset)}\n"
+            f"\tnext sunrise : {jdtoiso(srise_next)}\n"
             "exiting ...",
             source="hora",
             route=["terminal", "user"],
         )
         return None
+    return srise, sset, srise_next
+
+
+def sun_cache_info():
+    return _sun_times.cache_info()
+
+
+def get_current_hora(jd_ut, lon, lat, alt, flag):
+    # find current hora for given julian day utc
+    times = sun_times(jd_ut, lon, lat, alt, flag)
+    if not times:
+        return None
+    srise, sset, srise_next = times
+    if jd_ut < srise or jd_ut >= srise_next:
+        return None
+    if jd_ut < sset:
+        i = int((jd_ut - srise) / (sset - srise) * 12)
+    else:
+        i = 12 + int((jd_ut - sset) / (srise_next - sset) * 12)
+    lord_idx = ORDER.index(WEEKDAY[sunrise_weekday(srise, lon)][1])
+    return ORDER[(lord_idx + min(i, 23)) % 7]
+
+
+def get_day_horas(jd_ut, lon, lat, alt, flag=0):
+    # calculate list of all horas of the day
+    times = sun_times(jd_ut, lon, lat, alt, flag)
+    if not times:
+        return None
+    srise, sset, srise_next = times
+    sunrise = jdtoiso(srise)
+    sunset = jdtoiso(sset)
+    sunrise_next = jdtoiso(srise_next)
     # weekday from sunrise
-    wday = swe.day_of_week(srise)
+    wday = sunrise_weekday(srise, lon)
     weekday, weekday_lord = WEEKDAY[wday]
     lord_idx = ORDER.index(weekday_lord)
     # compute daylight & night length
@@ -135,6 +182,104 @@ def get_day_horas(jd_ut, lon, lat, alt, flag=0):
     return horas
 
 
+def sun_days(start_jd, end_jd, lon, lat, alt, flag=0):
+    """sunrise & sunset arrays covering range, days without sunrise skipped"""
+    rises, sets = [], []
+    jd = start_jd - 1.0
+    while jd < end_jd + 1.0:
+        res, data = swe.rise_trans(
+            jd, swe.SUN, swe.CALC_RISE, (lon, lat, alt), 0.0, 0.0, flags=flag
+        )
+        if res != 0:
+            # polar day / night : try next day
+            jd += 1.0
+            continue
+        srise = data[0]
+        res, data = swe.rise_trans(
+            srise, swe.SUN, swe.CALC_SET, (lon, lat, alt), 0.0, 0.0, flags=flag
+        )
+        if res == 0:
+            rises.append(srise)
+            sets.append(data[0])
+        jd = srise + 0.9
+    return np.array(rises), np.array(sets)
+
+
+def horas_range(start_jd, end_jd, lon, lat, alt, flag=0):
+    """horas of every sunrise day from start_jd to end_jd : arrays per day
+    (sunrise, sunset, sunrise_next, weekday lord index) & per hora (start,
+    end, lord index into ORDER : days x 24) ; next sunrise of each day is
+    sunrise of following day, so each day costs 2 rise / set solves
+    ok is false for days followed by polar day / night (no sunrise next)"""
+    rises, sets = sun_days(start_jd, end_jd + 1.0, lon, lat, alt, flag)
+    # days overlapping range : each needs sunrise of day after
+    keep = (rises[:-1] < end_jd) & (rises[1:] > start_jd)
+    srise = rises[:-1][keep]
+    sset = sets[:-1][keep]
+    srise_next = rises[1:][keep]
+    ok = (srise_next - srise) < 1.5
+    first = np.array(
+        [
+            ORDER.index(WEEKDAY[sunrise_weekday(r, lon)][1])
+            for r in srise.tolist()
+        ],
+        dtype=np.int64,
+    )
+    k = np.arange(12)
+    day_hour = ((sset - srise) / 12.0)[:, None]
+    night_hour = ((srise_next - sset) / 12.0)[:, None]
+    start = np.concatenate(
+        [srise[:, None] + k * day_hour, sset[:, None] + k * night_hour], axis=1
+    )
+    end = np.concatenate(
+        [srise[:, None] + (k + 1) * day_hour, sset[:, None] + (k + 1) * night_hour],
+        axis=1,
+    )
+    lord = ((first[:, None] + np.arange(24)) % 7).astype(np.int8)
+    return {
+        "sunrise": srise,
+        "sunset": sset,
+        "sunrise_next": srise_next,
+        "weekday": first,
+        "start": start,
+        "end": end,
+        "lord": lord,
+        "ok": ok,
+    }
+
+
+def hora_lords(jds, lon, lat, alt, flag=0):
+    """hora lord index into ORDER for every julian day, -1 if unknown"""
+    jds = np.asarray(jds, dtype=np.float64)
+    lords = np.full(jds.size, -1, dtype=np.int8)
+    if not jds.size:
+        return lords
+    rises, sets = sun_days(jds.min(), jds.max(), lon, lat, alt, flag)
+    if rises.size < 2:
+        return lords
+    i = np.searchsorted(rises, jds, side="right") - 1
+    ok = (i >= 0) & (i < rises.size - 1)
+    i = np.where(ok, i, 0)
+    rise, sset, rise_next = rises[i], sets[i], rises[i + 1]
+    # gap in sunrises = polar day / night in between
+    ok &= (rise_next - rise) < 1.5
+    day = jds < sset
+    hour = np.where(
+        day,
+        np.floor((jds - rise) / (sset - rise) * 12),
+        12 + np.floor((jds - sset) / (rise_next - sset) * 12),
+    )
+    hour = np.clip(hour, 0, 23).astype(np.int64)
+    first = np.array(
+        [
+            ORDER.index(WEEKDAY[sunrise_weekday(r, lon)][1])
+            for r in rises.tolist()
+        ]
+    )
+    lords[ok] = (first[i[ok]] + hour[ok]) % 7
+    return lords
+
+
 def calculate_hora(event: str):
     # calculate list of horas & current hora from sunrise, sunset, next sunrise
     app = Gtk.Application.get_default()
@@ -160,14 +305,10 @@ def calculate_hora(event: str):
         )
         return
     # msg += f"jdut : {jdtoiso(jd_ut)}\n"
-    if event == "e1":
-        horas = get_day_horas(jd_ut, lon, lat, alt, flag)
-        curr_hora = get_current_hora(jd_ut, lon, lat, alt, flag)
-        msg += f"{event} : currhora : {curr_hora}\n"
-    else:
-        horas = get_day_horas(jd_ut, lon, lat, alt, flag)
-        curr_hora = get_current_hora(jd_ut, lon, lat, alt, flag)
-        msg += f"{event} : currhora : {curr_hora}\n"
+    # both read cached sunrise / sunset : rise & set are solved once per day
+    horas = get_day_horas(jd_ut, lon, lat, alt, flag)
+    curr_hora = get_current_hora(jd_ut, lon, lat, alt, flag)
+    msg += f"{event} : currhora : {curr_hora}\n"
     notify.debug(
         msg,
         source="hora",
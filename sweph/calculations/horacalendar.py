@@ -0,0 +1,264 @@
+# sweph/calculations/horacalendar.py
+# ruff: noqa: E402
+# planetary hour almanac : hora tables (24 rows per day) over long date
+# ranges for many locations ; locations are solved in process pool (1 task
+# per location, rise / set via hora.horas_range) & tables are streamed to
+# csv or parquet as locations finish (rows of one location stay together)
+# days without sunrise (polar day / night) are flagged instead of failing
+# generate from terminal :
+# python -m sweph.calculations.horacalendar locations.csv 2026-01-01 2027-01-01
+#   out.csv|out.parquet [workers]
+# locations.csv columns : name, lon, lat [, alt] [, tz]
+import os
+import sys
+import numpy as np
+import pandas as pd
+import swisseph as swe
+from multiprocessing import get_context
+from typing import Callable, Iterable, List, Optional
+from sweph.calculations.hora import ORDER, WEEKDAY, horas_range
+
+UNIX_EPOCH_JD = 2440587.5
+# output columns, fixed for every location (parquet schema)
+COLUMNS = (
+    "location",
+    "date",
+    "weekday",
+    "hour",
+    "lord",
+    "start_jd",
+    "end_jd",
+    "start_utc",
+    "end_utc",
+    "start_local",
+    "end_local",
+    "polar",
+)
+
+
+def read_locations(path: str) -> List[dict]:
+    """locations csv : name, lon, lat & optional alt (m) & tz (iana name)"""
+    df = pd.read_csv(path)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    missing = {"name", "lon", "lat"} - set(df.columns)
+    if missing:
+        raise ValueError(f"locations : missing columns {sorted(missing)} : {path}")
+    locations = []
+    for row in df.to_dict("records"):
+        alt = row.get("alt")
+        tz = row.get("tz")
+        locations.append({
+            "name": str(row["name"]),
+            "lon": float(row["lon"]),
+            "lat": float(row["lat"]),
+            "alt": 0.0 if alt is None or pd.isna(alt) else float(alt),
+            "tz": None if tz is None or pd.isna(tz) else str(tz),
+        })
+    return locations
+
+
+def polar_kind(jds, lat: float, flag: int = 0) -> List[str]:
+    """polar day if sun declination keeps it above horizon at latitude, else
+    polar night (refraction ignored)"""
+    kinds = []
+    for jd in np.atleast_1d(jds).tolist():
+        pos, _ = swe.calc_ut(jd, swe.SUN, flag | swe.FLG_EQUATORIAL)
+        kinds.append("polar day" if pos[1] * lat > 0 else "polar night")
+    return kinds
+
+
+def _strings(index: pd.DatetimeIndex) -> np.ndarray:
+    # wall time strings (faster than strftime), empty for nat
+    text = np.datetime_as_string(index.tz_localize(None).to_numpy(), unit="s")
+    text = np.char.replace(text, "T", " ")
+    return np.where(text == "NaT", "", text).astype(object)
+
+
+def _times(jds: np.ndarray, tz: Optional[str]):
+    # julian days to utc & local time strings, empty where nan
+    utc = pd.to_datetime(
+        (jds - UNIX_EPOCH_JD) * 86400.0, unit="s", utc=True
+    ).round("s")
+    local = utc.tz_convert(tz) if tz else utc
+    return _strings(utc), _strings(local)
+
+
+def location_table(
+    location: dict, start_jd: float, end_jd: float, flag: int = 0
+) -> pd.DataFrame:
+    """hora table of location for local dates from date of start_jd up to
+    end_jd (0h ut of dates) plus flagged polar days : 24 rows per day, in
+    time order"""
+    lon, lat, alt = location["lon"], location["lat"], location.get("alt", 0.0)
+    tz = location.get("tz")
+    # local mean midnights in utc : sunrise of east longitudes falls on
+    # previous utc date
+    shift = lon / 360.0
+    first_day = np.floor(start_jd - 0.5) + 0.5 - shift
+    last_day = end_jd - shift
+    r = horas_range(first_day, last_day, lon, lat, alt, flag)
+    days = (r["sunrise"] >= first_day) & (r["sunrise"] < last_day)
+    rise = r["sunrise"][days]
+    start = r["start"][days]
+    end = r["end"][days]
+    lord = np.asarray(ORDER, dtype=object)[r["lord"][days]]
+    polar = np.full(rise.size, "", dtype=object)
+    # next sunrise more than a day away : polar day / night follows, night
+    # horas of this day are undefined
+    edge = ~r["ok"][days]
+    if edge.any():
+        start[edge, 12:] = np.nan
+        end[edge, 12:] = np.nan
+        lord[edge, 12:] = ""
+        follows = polar_kind(rise[edge] + 1.0, lat, flag)
+        polar[edge] = [f"{k} follows" for k in follows]
+    # civil (local mean time) days of range without sunrise
+    civil = np.arange(first_day, last_day, 1.0)
+    k = np.searchsorted(rise, civil)
+    has_rise = k < rise.size
+    has_rise[has_rise] = rise[k[has_rise]] < civil[has_rise] + 1.0
+    dark = civil[~has_rise]
+    day_jd = np.concatenate([rise, dark + 0.5])
+    n_dark = dark.size
+    start = np.concatenate([start, np.full((n_dark, 24), np.nan)])
+    end = np.concatenate([end, np.full((n_dark, 24), np.nan)])
+    lord = np.concatenate([lord, np.full((n_dark, 24), "", dtype=object)])
+    polar = np.concatenate(
+        [polar, np.asarray(polar_kind(dark + 0.5, lat, flag), dtype=object)]
+    )
+    order = np.argsort(day_jd, kind="stable")
+    day_jd = day_jd[order]
+    n = day_jd.size
+    # date & weekday from same local date of sunrise (or noon of polar day) :
+    # zone time if known, else local mean time
+    if tz:
+        _, date_local = _times(day_jd, tz)
+    else:
+        _, date_local = _times(day_jd + shift, None)
+    dates = [d[:10] for d in date_local]
+    weekday = [
+        WEEKDAY[int(d)][0] for d in pd.DatetimeIndex(dates).dayofweek
+    ]
+    start_utc, start_local = _times(start[order].ravel(), tz)
+    end_utc, end_local = _times(end[order].ravel(), tz)
+    return pd.DataFrame(
+        {
+            "location": location["name"],
+            "date": np.repeat(dates, 24),
+            "weekday": np.repeat(weekday, 24),
+            "hour": np.tile(np.arange(1, 25), n),
+            "lord": lord[order].ravel(),
+            "start_jd": start[order].ravel(),
+            "end_jd": end[order].ravel(),
+            "start_utc": start_utc,
+            "end_utc": end_utc,
+            "start_local": start_local,
+            "end_local": end_local,
+            "polar": np.repeat(polar[order], 24),
+        },
+        columns=COLUMNS,
+    )
+
+
+class _TableWriter:
+    """append tables to csv or parquet (by extension) : parquet needs pyarrow"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self.writer = None
+        self.rows = 0
+        if not self.parquet and os.path.exists(path):
+            os.remove(path)
+
+    def write(self, df: pd.DataFrame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table.cast(self.writer.schema))
+        else:
+            df.to_csv(self.path, mode="a", header=not self.rows, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def _init_worker(ephe_path: Optional[str]):
+    if ephe_path:
+        swe.set_ephe_path(ephe_path)
+
+
+def _solve(task):
+    location, start_jd, end_jd, flag = task
+    return location["name"], location_table(location, start_jd, end_jd, flag)
+
+
+def generate(
+    locations: Iterable[dict],
+    start_jd: float,
+    end_jd: float,
+    path: str,
+    flag: int = 0,
+    workers: Optional[int] = None,
+    ephe_path: Optional[str] = None,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> int:
+    """hora calendar of all locations written to path, return number of rows
+    locations are written in order of completion"""
+    tasks = [(loc, start_jd, end_jd, flag) for loc in locations]
+    out = _TableWriter(path)
+    try:
+        if workers == 1 or len(tasks) < 2:
+            _init_worker(ephe_path)
+            for name, df in map(_solve, tasks):
+                out.write(df)
+                if progress:
+                    progress(name, len(df))
+        else:
+            # spawn : workers must not inherit gtk / glib state of app
+            ctx = get_context("spawn")
+            with ctx.Pool(workers, _init_worker, (ephe_path,)) as pool:
+                for name, df in pool.imap_unordered(_solve, tasks):
+                    out.write(df)
+                    if progress:
+                        progress(name, len(df))
+    finally:
+        out.close()
+    return out.rows
+
+
+def date_to_jd(date: str) -> float:
+    """yyyy-mm-dd to julian day at 0h ut"""
+    y, m, d = (int(v) for v in date.split("-"))
+    return swe.julday(y, m, d, 0.0)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 5:
+        sys.exit(
+            "usage : horacalendar locations.csv yyyy-mm-dd yyyy-mm-dd "
+            "out.csv|out.parquet [workers]"
+        )
+    src, start, end, dst = sys.argv[1:5]
+    workers = int(sys.argv[5]) if len(sys.argv) > 5 else None
+    ephe = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ephe"
+    )
+    rows = generate(
+        read_locations(src),
+        date_to_jd(start),
+        date_to_jd(end),
+        dst,
+        swe.FLG_SWIEPH,
+        workers,
+        ephe,
+        lambda name, n: print(f"\t{name} : {n // 24} days"),
+    )
+    print(f"{rows} rows : {dst}")
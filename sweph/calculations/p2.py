@@ -6,7 +6,9 @@ import gi
 
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk  # type: ignore
-from ui.helpers import _object_name_to_code as objcode, _decimal_to_hms as dectohms
+from sweph.solver import Budget, find_crossing
+from ui.helpers import _decimal_to_hms as dectohms
+from sweph.calculations.engine import calc_positions, codes_for, select
 
 
 def tuple_to_iso(jd):
@@ -75,12 +77,26 @@ def calculate_p2(event: str):
     # )
     # previous solar return : search x days back range
     prev_jd = e2_jd - YEARLENGTH - 0.1
-    sr_prev_jd = swe.solcross_ut(e1_su, prev_jd, app.sweph_flag)
+    budget = Budget()
+    sr_prev_jd = find_crossing(
+        swe.SUN, e1_su, prev_jd, prev_jd + 400.0, app.sweph_flag, budget
+    )
     # next lunar return
     next_jd = e2_jd
-    sr_next_jd = swe.solcross_ut(e1_su, next_jd, app.sweph_flag)
+    sr_next_jd = find_crossing(
+        swe.SUN, e1_su, next_jd, next_jd + 400.0, app.sweph_flag, budget
+    )
+    if sr_prev_jd is None or sr_next_jd is None:
+        # search window did not bracket return : no progression
+        notify.error(
+            f"solar return not found around e2 : {budget.report()}",
+            source="p2",
+            route=["terminal"],
+        )
+        return
     # calculate lunar month length
     sr_year = sr_next_jd - sr_prev_jd
+    msg += f"solar return search : {budget.report()}\n"
     p2_diff = (age_years / sr_year) * sr_year
     p2_jd = e1_jd + p2_diff
     p2_date = tuple_to_iso(p2_jd)
@@ -89,11 +105,14 @@ def calculate_p2(event: str):
     # insert p2 date
     p2_data.append({"p2jdut": p2_jd})
     p2_data.append({"p2date": p2_date})
-    try:
-        result, e = swe.calc_ut(p2_jd, swe.SUN, app.sweph_flag)  # su lon
-    except Exception as e:
-        raise ValueError(f"p2 : sun position calculation failed\n\terror :\n\t{e}")
-    p2_su = result[0]
+    # one batch for sun & selected objects on p2 date
+    codes, names = codes_for(objs, use_mean_node)
+    batch_codes = [swe.SUN] + [c for c in codes if c != swe.SUN]
+    pos = calc_positions(p2_jd, batch_codes, app.sweph_flag)
+    su_row = select(pos, swe.SUN)
+    if su_row is None:
+        raise ValueError("p2 : sun position calculation failed")
+    p2_su = float(su_row["lon"])
     # msg += f"p2su : {p2_su}\n"
     # true asc & mc : experimental
     hsys = app.selected_house_sys
@@ -124,29 +143,20 @@ def calculate_p2(event: str):
     p2_data.append({"name": "asc", "lon": p2_asc})
     p2_data.append({"name": "mc", "lon": p2_mc})
     # find positions on p2 date
-    if objs:
-        for obj in objs:
-            code, name = objcode(obj, use_mean_node)
-            if code is None:
-                continue
-            # calc_ut() returns array of 6 floats [0] + error string [1]:
-            # longitude, latitude, distance, lon speed, lat speed, dist speed
-            try:
-                result = swe.calc_ut(p2_jd, code, app.sweph_flag)
-                # print(f"positions with speeds & flag used : {result}")
-                data = result[0] if isinstance(result, tuple) else result
-                # print(f"name : {name} | lon : {data[0]}")
-                p2_data.append({
-                    "name": name,
-                    "lon": data[0],
-                    "lon speed": data[3],
-                })
-            except swe.Error as e:
-                notify.error(
-                    f"p2 positions calculation failed\n\tdata {p2_data[code]}\n\tswe error :\n\t{e}",
-                    source="p2",
-                    route=["terminal"],
-                )
+    for code, name in zip(codes, names):
+        row = select(pos, code)
+        if row is None:
+            notify.error(
+                f"p2 positions calculation failed\n\tcode {code}",
+                source="p2",
+                route=["terminal"],
+            )
+            continue
+        p2_data.append({
+            "name": name,
+            "lon": float(row["lon"]),
+            "lon speed": float(row["lon_speed"]),
+        })
     for obj in p2_data:
         name = obj.get("name")
         if name in ("su", "mo", "asc", "mc", "p2jdut", "p2date"):
@@ -5,7 +5,9 @@ import gi
 
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk  # type: ignore
-from ui.helpers import _object_name_to_code as objcode, _decimal_to_hms as dectohms
+from sweph.solver import Budget, find_crossing
+from ui.helpers import _decimal_to_hms as dectohms
+from sweph.calculations.engine import calc_positions, codes_for, select
 
 
 def tuple_to_iso(jd):
@@ -89,12 +91,26 @@ def calculate_p3(event: str):
     # )
     # previous lunar return : search x days back range
     prev_jd = e2_jd - 27.5
-    lr_prev_jd = swe.mooncross_ut(e1_mo, prev_jd, app.sweph_flag)
+    budget = Budget()
+    lr_prev_jd = find_crossing(
+        swe.MOON, e1_mo, prev_jd, prev_jd + 30.0, app.sweph_flag, budget
+    )
     # next lunar return
     next_jd = e2_jd
-    lr_next_jd = swe.mooncross_ut(e1_mo, next_jd, app.sweph_flag)
+    lr_next_jd = find_crossing(
+        swe.MOON, e1_mo, next_jd, next_jd + 30.0, app.sweph_flag, budget
+    )
+    if lr_prev_jd is None or lr_next_jd is None:
+        # search window did not bracket return : no progression
+        notify.error(
+            f"lunar return not found around e2 : {budget.report()}",
+            source="p3",
+            route=["terminal"],
+        )
+        return
     # calculate lunar month length
     lr_month = lr_next_jd - lr_prev_jd
+    msg += f"lunar return search : {budget.report()}\n"
     p3_diff = (age_months / lr_month) * lr_month
     p3_jd = e1_jd + p3_diff
     p3_date = tuple_to_iso(p3_jd)
@@ -103,11 +119,14 @@ def calculate_p3(event: str):
     # insert p3 date
     p3_data.append({"p3jdut": p3_jd})
     p3_data.append({"p3date": p3_date})
-    try:
-        result, e = swe.calc_ut(p3_jd, swe.SUN, app.sweph_flag)  # su lon
-    except Exception as e:
-        raise ValueError(f"p3 : sun position calculation failed\n\terror :\n\t{e}")
-    p3_su = result[0]
+    # one batch for sun & selected objects on p3 date
+    codes, names = codes_for(objs, use_mean_node)
+    batch_codes = [swe.SUN] + [c for c in codes if c != swe.SUN]
+    pos = calc_positions(p3_jd, batch_codes, app.sweph_flag)
+    su_row = select(pos, swe.SUN)
+    if su_row is None:
+        raise ValueError("p3 : sun position calculation failed")
+    p3_su = float(su_row["lon"])
     # msg += f"p3su : {p3_su}\n"
     # true asc & mc : experimental
     hsys = app.selected_house_sys
@@ -138,29 +157,20 @@ def calculate_p3(event: str):
     p3_data.append({"name": "asc", "lon": p3_asc})
     p3_data.append({"name": "mc", "lon": p3_mc})
     # find positions on p3 date
-    if objs:
-        for obj in objs:
-            code, name = objcode(obj, use_mean_node)
-            if code is None:
-                continue
-            # calc_ut() returns array of 6 floats [0] + error string [1]:
-            # longitude, latitude, distance, lon speed, lat speed, dist speed
-            try:
-                result = swe.calc_ut(p3_jd, code, app.sweph_flag)
-                # print(f"positions with speeds & flag used : {result}")
-                data = result[0] if isinstance(result, tuple) else result
-                # print(f"name : {name} | lon : {data[0]}")
-                p3_data.append({
-                    "name": name,
-                    "lon": data[0],
-                    "lon speed": data[3],
-                })
-            except swe.Error as e:
-                notify.error(
-                    f"p3 positions calculation failed\n\tdata {p3_data[code]}\n\tswe error :\n\t{e}",
-                    source="p3",
-                    route=["terminal"],
-                )
+    for code, name in zip(codes, names):
+        row = select(pos, code)
+        if row is None:
+            notify.error(
+                f"p3 positions calculation failed\n\tcode {code}",
+                source="p3",
+                route=["terminal"],
+            )
+            continue
+        p3_data.append({
+            "name": name,
+            "lon": float(row["lon"]),
+            "lon speed": float(row["lon_speed"]),
+        })
     for obj in p3_data:
         name = obj.get("name")
         if name in ("su", "mo", "asc", "mc", "p3jdut", "p3date"):
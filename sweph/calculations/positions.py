@@ -7,8 +7,13 @@ gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk  # type: ignore
 from typing import List, Optional
 from ui.helpers import _object_name_to_code as objcode
-from sweph.calculations.naksatras import calculate_naksatra
-from sweph.calculations.varga import get_varga_lon
+from sweph.calculations.hora import calculate_hora
+from sweph.calculations.engine import (
+    calc_positions,
+    codes_for,
+    naksatra_info,
+    select,
+)
 
 
 def calculate_positions(event: Optional[str] = None) -> None:
@@ -55,39 +60,32 @@ def calculate_positions(event: Optional[str] = None) -> None:
         #     f"usemeannode : {use_mean_node} | swephflag : {app.sweph_flag} "
         #     f"| jdut : {jd_ut}\n"
         # )
-        # clear previous data
+        codes, names = codes_for(objs, use_mean_node)
+        # luminaries ride along in the same batch
+        batch_codes = codes + [c for c in (0, 1) if c not in codes]
+        pos = calc_positions(
+            jd_ut, batch_codes, app.sweph_flag, use_28_naks, division
+        )
+        if not pos["ok"].all():
+            notify.error(
+                f"positions calculation failed for : {event}\n\tcodes "
+                f"{pos['code'][~pos['ok']].tolist()}",
+                source="positions",
+                route=["terminal"],
+            )
         data = {}
-        for obj in objs:
-            code, name = objcode(obj, use_mean_node)
-            if code is None:
+        for code, name in zip(codes, names):
+            row = select(pos, code)
+            if row is None:
                 continue
-            # calc_ut() returns array of 6 floats [0] + error string [1]:
-            # longitude, latitude, distance, lon speed, lat speed, dist speed
-            try:
-                result = swe.calc_ut(jd_ut, code, app.sweph_flag)
-                # print(f"positions with speeds & flag used : {result}")
-                positions = result[0] if isinstance(result, tuple) else result
-                naksatra = calculate_naksatra(positions[0], use_28_naks)
-                # retro = retro_marker(code, positions[3])
-                varga = get_varga_lon(positions[0], division)
-                data[code] = {
-                    "name": name,
-                    "lon": positions[0],
-                    "lat": positions[1],
-                    # "dist": data[2],
-                    "lon speed": positions[3],
-                    # "lat speed": data[4],
-                    # "dist speed": data[5],
-                    "naksatra": naksatra,
-                    # "retro": retro,
-                    "varga": varga,
-                }
-            except swe.Error as e:
-                notify.error(
-                    f"positions calculation failed for : {event}\n\tdata {data[code]}\n\tswe error :\n\t{e}",
-                    source="positions",
-                    route=["terminal"],
-                )
+            data[code] = {
+                "name": name,
+                "lon": float(row["lon"]),
+                "lat": float(row["lat"]),
+                "lon speed": float(row["lon_speed"]),
+                "naksatra": naksatra_info(row["naksatra"], use_28_naks),
+                "varga": float(row["varga"]),
+            }
         msg += f"data : {data}\n"
         # key is object number as needed for / from sweph
         keys = [k for k in data.keys() if isinstance(k, int)]
@@ -97,38 +95,36 @@ def calculate_positions(event: Optional[str] = None) -> None:
         data_ordered["jd_ut"] = jd_ut
         for k in keys:
             data_ordered[k] = data[k]
+        # hora needs sweph (rise / set) : calculated here on worker, tables
+        # & chart only read it
+        horas = calculate_hora(event)
+        chart = app.e1_chart if event == "e1" else app.e2_chart
+        chart["hora"] = horas["current_hora"] if horas else "-"
+        setattr(app, f"{event}_horas", horas)
         if event == "e1":
             app.e1_positions = data_ordered
-            # msg += f"{event} [e1] :\n\t{data_ordered}"
             app.signal_manager._emit("positions_changed", event)
         elif event == "e2":
             app.e2_positions = data_ordered
-            # msg += f"{event} [e2] :\n\t{positions_ordered}"
             app.signal_manager._emit("positions_changed", event)
-        # msg += f"{str(data_ordered)[:200]}\n"
         # ensure luminaries are always calculated
         luminaries_data = {}
         luminaries_data["event"] = event
         luminaries_data["jd_ut"] = jd_ut
         for lumine in ("sun", "moon"):
             code, name = objcode(lumine, False)
-            if code is None:
-                continue
-            try:
-                result = swe.calc_ut(jd_ut, code, app.sweph_flag)
-                # print(f"positions with speeds & flag used : {result}")
-                data = result[0] if isinstance(result, tuple) else result
-                luminaries_data[code] = {
-                    "name": name,
-                    "lon": data[0],
-                }
-            except swe.Error as e:
+            row = select(pos, code)
+            if row is None:
                 notify.warning(
-                    f"swe.calc_ut() failed for : {event}\n\tlumine data {luminaries_data[code]}\n\tswe error :\n\t{e}",
+                    f"luminary missing for : {event}\n\tcode {code}",
                     source="positions",
                     route=["terminal"],
                 )
-                # todo return ?
+                continue
+            luminaries_data[code] = {
+                "name": name,
+                "lon": float(row["lon"]),
+            }
         if event == "e1":
             app.e1_lumies = luminaries_data
             # msg += f"lumies {event} [e1] :\n\t{app.e1_lumies}\n"
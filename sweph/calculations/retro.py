@@ -1,13 +1,16 @@
 # sweph/calculations/retro.py
 # ruff: noqa: E402, E701
-import swisseph as swe
+import math
 import gi
 
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk  # type: ignore
-from typing import List, Optional, Tuple, Dict
+from typing import List, Optional, Tuple, Dict, Set
 from ui.helpers import _object_name_to_code as objcode
 from sweph.swetime import jd_to_custom_iso as jdtoiso
+from sweph.calculations import stationindex
+from sweph import ephestore
+from sweph.solver import Budget, find_station
 
 
 station_speed = {  # stationary speed
@@ -32,6 +35,8 @@ retro_days = {  # average length of retro period
 }
 
 last_stations: Dict[int, Tuple[Optional[float], Optional[float]]] = {}
+# index flags already reported as not built
+index_missing: Set[int] = set()
 
 
 def retro_marker(body: int, speed: float) -> str:
@@ -127,73 +132,61 @@ def calculate_retro(event: str):
 def lon_speed(body: int, jd_ut: float) -> float:
     # calculate lon speed in degree/day
     app = Gtk.Application.get_default()
-    result = swe.calc_ut(jd_ut, body, app.sweph_flag)
+    result = ephestore.calc_ut(jd_ut, body, app.sweph_flag)
     # longitude speed
     return result[0][3]
 
 
-def refine_root(body: int, bracket: Tuple[float, float]) -> float:
-    # fast exact direction change calculation
-    a, b = bracket
-    fa = lon_speed(body, a)
-    fb = lon_speed(body, b)
-    # bisect
-    for _ in range(10):
-        m = 0.5 * (a + b)
-        fm = lon_speed(body, m)
-        if fa * fm <= 0:
-            b, fb = m, fm
-        else:
-            a, fa = m, fm
-
-    # secant
-    for _ in range(5):
-        denom = fb - fa
-        if denom == 0:
-            break
-        m = (a * fb - b * fa) / denom
-        if not (a < m < b):
-            break
-        fm = lon_speed(body, m)
-        if fa * fm <= 0:
-            b, fb = m, fm
-        else:
-            a, fa = m, fm
-    return 0.5 * (a + b)
-
-
-def find_closest_station(body: int, start_jd: float, step: float) -> Optional[float]:
-    # iterative search for nearest station
-    eps = 1e-7
-    t = start_jd + (eps * (1 if step > 0 else -1))
-    s0 = lon_speed(body, t)
-    max_iter = int(365.25 * 3 / abs(step))
-    for i in range(max_iter):
-        t += step
-        s = lon_speed(body, t)
-        # sign change = station
-        if s0 * s <= 0:
-            return refine_root(body, (t - step, t))
-        s0 = s
-    return None
+def find_closest_station(
+    body: int, start_jd: float, step: float, budget: Optional[Budget] = None
+) -> Optional[float]:
+    # nearest station before (step < 0) or after (step > 0) start, max 3 years
+    app = Gtk.Application.get_default()
+    end_jd = start_jd + math.copysign(365.25 * 3, step)
+    return find_station(body, start_jd, end_jd, app.sweph_flag, budget)
+
+
+def index_notice(app):
+    # station index is never built on lookup : tell once per flag how to
+    # build it, stations are searched meanwhile
+    key = stationindex.index_flag(app.sweph_flag)
+    if key in index_missing or stationindex.load_index(app.sweph_flag):
+        return
+    index_missing.add(key)
+    app.notify_manager.info(
+        f"station index for flag {key} not built : searching stations\n\t"
+        f"build with : python -m sweph.calculations.stationindex {key}",
+        source="retro",
+        route=["terminal"],
+    )
 
 
 def find_stations(body: int, jd: float) -> Tuple[Optional[float], Optional[float], str]:
     # find previous & next station, use cache to avoid recalculation
     jd = round(jd * 86400) / 86400
-    retro_length = retro_days.get(body, 180.0)
-    step = min(retro_length / 20.0, 0.5)
     curr_speed = lon_speed(body, jd)
     curr_dir = retro_marker(body, curr_speed)
-    # cached results first
+    # precomputed station index first
+    app = Gtk.Application.get_default()
+    s_prev, s_next = stationindex.lookup(body, jd, app.sweph_flag)
+    if s_prev is not None and s_next is not None:
+        return s_prev, s_next, curr_dir
+    index_notice(app)
+    # outside index range : cached results
     old_prev_s, old_next_s = last_stations.get(body, (None, None))
     if old_prev_s and old_next_s:
         if old_prev_s < jd < old_next_s:
             return old_prev_s, old_next_s, curr_dir
     # find previous & next station
-    s_prev = find_closest_station(body, jd, -step)
-    s_next = find_closest_station(body, jd, step)
+    budget = Budget()
+    s_prev = find_closest_station(body, jd, -1, budget)
+    s_next = find_closest_station(body, jd, 1, budget)
     last_stations[body] = (s_prev, s_next)
+    app.notify_manager.debug(
+        f"stations for {body} searched : {budget.report()}",
+        source="retro",
+        route=[""],
+    )
     return s_prev, s_next, curr_dir
 
 
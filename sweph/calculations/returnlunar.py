@@ -5,10 +5,20 @@ import gi
 
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk  # type: ignore
-from ui.helpers import _object_name_to_code as objcode
+from sweph.solver import Budget, find_crossing
+from sweph.calculations.engine import calc_positions, codes_for, select
 from sweph.swetime import jd_to_custom_iso as jdtoiso
 
 
+def lunar_return_missing(notify, event, budget):
+    # search window did not bracket return : chart is not updated
+    notify.error(
+        f"lunar return not found for : {event}\n\t{budget.report()}",
+        source="lunarreturn",
+        route=["terminal"],
+    )
+
+
 def calculate_lr(event: str):
     # tertiary direction calculation
     app = Gtk.Application.get_default()
@@ -68,10 +78,18 @@ def calculate_lr(event: str):
         app.lr_next_jd = None
     # previous lunar return : search x days back range
     prev_jd = e2_jd - MONTHLENGTH
-    lr_prev_jd = swe.mooncross_ut(e1_mo, prev_jd, app.sweph_flag)
+    budget = Budget()
+    lr_prev_jd = find_crossing(
+        swe.MOON, e1_mo, prev_jd, prev_jd + 30.0, app.sweph_flag, budget
+    )
     # next lunar return
     next_jd = e2_jd
-    lr_next_jd = swe.mooncross_ut(e1_mo, next_jd, app.sweph_flag)
+    lr_next_jd = find_crossing(
+        swe.MOON, e1_mo, next_jd, next_jd + 30.0, app.sweph_flag, budget
+    )
+    if lr_prev_jd is None or lr_next_jd is None:
+        lunar_return_missing(notify, event, budget)
+        return
     lr_month = lr_next_jd - lr_prev_jd
     # store values for checking while lr month is proper
     if (MONTHLENGTH - 1) < lr_month < (MONTHLENGTH + 1):
@@ -90,18 +108,38 @@ def calculate_lr(event: str):
                 # which could be bigger lr cycle > extend range by 1 day back
                 if e2_jd <= app.lr_prev_jd:
                     new_prev_jd = e2_jd - MONTHLENGTH - 1
-                    lr_prev_jd = swe.mooncross_ut(e1_mo, new_prev_jd, app.sweph_flag)
+                    lr_prev_jd = find_crossing(
+                        swe.MOON,
+                        e1_mo,
+                        new_prev_jd,
+                        new_prev_jd + 30.0,
+                        app.sweph_flag,
+                        budget,
+                    )
                     # new_next_jd = e2_jd - 1
-                    lr_next_jd = swe.mooncross_ut(e1_mo, e2_jd, app.sweph_flag)
+                    lr_next_jd = find_crossing(
+                        swe.MOON, e1_mo, e2_jd, e2_jd + 30.0, app.sweph_flag, budget
+                    )
                     # lr_next_jd = swe.mooncross_ut(e1_mo, new_next_jd, app.sweph_flag)
             # we are in bigger lr cycle
             if lr_month > 53.0:
                 if e2_jd < app.lr_next_jd:
                     new_prev_jd = e2_jd - 1
-                    lr_prev_jd = swe.mooncross_ut(e1_mo, new_prev_jd, app.sweph_flag)
+                    lr_prev_jd = find_crossing(
+                        swe.MOON,
+                        e1_mo,
+                        new_prev_jd,
+                        new_prev_jd + 30.0,
+                        app.sweph_flag,
+                        budget,
+                    )
+        if lr_prev_jd is None or lr_next_jd is None:
+            lunar_return_missing(notify, event, budget)
+            return
         # update stored values
         app.lr_prev_jd = lr_prev_jd
         app.lr_next_jd = lr_next_jd
+    msg += f"lunar return search : {budget.report()}\n"
     # current lunar return on chart
     lr_curr_jd = lr_prev_jd
     # debug data
@@ -125,25 +163,18 @@ def calculate_lr(event: str):
     use_mean_node = app.chart_settings["mean node"]
     # calculate positions on solar return julian day
     lun_ret_data: list[dict] = []
-    for obj in objs:
-        code, name = objcode(obj, use_mean_node)
-        if code is None:
-            continue
-        # calc_ut() returns array of 6 floats [0] + error string [1]:
-        # longitude, latitude, distance, lon speed, lat speed, dist speed
-        try:
-            result = swe.calc_ut(lr_curr_jd, code, app.sweph_flag)
-            # print(f"positions with speeds & flag used : {result}")
-            data = result[0] if isinstance(result, tuple) else result
-            lun_ret_data.append({"name": name, "lon": data[0]})
-            # msg += f"{name} : {data[0]}\n"
-        except swe.Error as e:
+    codes, names = codes_for(objs, use_mean_node)
+    pos = calc_positions(lr_curr_jd, codes, app.sweph_flag)
+    for code, name in zip(codes, names):
+        row = select(pos, code)
+        if row is None:
             notify.error(
-                f"lunar return positions calculation failed for : "
-                f"{event}\n\tdata {lun_ret_data[code]}\n\tswe error :\n\t{e}",
+                f"lunar return positions calculation failed for : {event}\n\tcode {code}",
                 source="lunarreturn",
                 route=["terminal"],
             )
+            continue
+        lun_ret_data.append({"name": name, "lon": float(row["lon"])})
     # also calculate houses
     hsys = app.selected_house_sys
     if lr_curr_jd and e1_sweph and hsys:
@@ -7,7 +7,9 @@ import gi
 
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk  # type: ignore
-from ui.helpers import _decimal_to_hms, _object_name_to_code as objcode
+from sweph.solver import Budget, find_crossing
+from ui.helpers import _decimal_to_hms
+from sweph.calculations.engine import calc_positions, codes_for, select
 # aum : return : Tsu / Tmo longitude equals Nsu / Nmo longitude
 
 
@@ -66,9 +68,21 @@ def calculate_sr(event: str):
                 if v.get("name") == "su":
                     e1_su = v.get("lon")
     msg += f"e1su : {e1_su} [crosscheck]\n"
+    budget = Budget()
     # search solar crossing
-    sol_ret_jd = swe.solcross_ut(e1_su, start_jd, app.sweph_flag)
+    sol_ret_jd = find_crossing(
+        swe.SUN, e1_su, start_jd, start_jd + 400.0, app.sweph_flag, budget
+    )
+    if sol_ret_jd is None:
+        # search window did not bracket return : chart is not updated
+        notify.error(
+            f"solar return not found for : {event}\n\t{budget.report()}",
+            source="sollunreturn",
+            route=["terminal"],
+        )
+        return
     solret = swe.revjul(sol_ret_jd, swe.GREG_CAL)
+    msg += f"solar return search : {budget.report()}\n"
     y, m, d, h = solret
     H, M, S = _decimal_to_hms(h)
     msg += f"solretjd : {sol_ret_jd} | sol return : {y}-{m:02}-{d:02} {H:02}:{M:02}:{S:02}\n"
@@ -77,24 +91,19 @@ def calculate_sr(event: str):
     use_mean_node = app.chart_settings["mean node"]
     # calculate positions on solar return julian day
     sol_ret_data: list[dict] = []
-    for obj in objs:
-        code, name = objcode(obj, use_mean_node)
-        if code is None:
-            continue
-        # calc_ut() returns array of 6 floats [0] + error string [1]:
-        # longitude, latitude, distance, lon speed, lat speed, dist speed
-        try:
-            result = swe.calc_ut(sol_ret_jd, code, app.sweph_flag)
-            # print(f"positions with speeds & flag used : {result}")
-            data = result[0] if isinstance(result, tuple) else result
-            sol_ret_data.append({"name": name, "lon": data[0]})
-            msg += f"{name} : {data[0]}\n"
-        except swe.Error as e:
+    codes, names = codes_for(objs, use_mean_node)
+    pos = calc_positions(sol_ret_jd, codes, app.sweph_flag)
+    for code, name in zip(codes, names):
+        row = select(pos, code)
+        if row is None:
             notify.error(
-                f"solar return positions calculation failed for : {event}\n\tdata {sol_ret_data[code]}\n\tswe error :\n\t{e}",
+                f"solar return positions calculation failed for : {event}\n\tcode {code}",
                 source="sollunreturn",
                 route=["terminal"],
             )
+            continue
+        sol_ret_data.append({"name": name, "lon": float(row["lon"])})
+        msg += f"{name} : {row['lon']}\n"
     # also calculate houses
     hsys = app.selected_house_sys
     # houses = {}
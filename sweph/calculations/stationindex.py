@@ -0,0 +1,137 @@
+# sweph/calculations/stationindex.py
+# ruff: noqa: E402
+# persistent retro station index for bodies 2 - 9 (me - pl)
+# stations are found once over configured year range & stored as sorted
+# julian days per body ; previous / next station lookup is binary search
+# build from terminal : python -m sweph.calculations.stationindex [flag] ;
+# until index exists stations are searched on the fly
+import os
+import sys
+import threading
+import numpy as np
+import swisseph as swe
+from typing import Dict, Optional, Tuple
+from user.settings import STATION_INDEX
+from sweph.solver import Budget, brent, speed_fn
+
+INDEX_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ephe", "stations"
+)
+BODIES = (2, 3, 4, 5, 6, 7, 8, 9)
+# scan step in days : well below shortest interval between 2 stations
+SCAN_STEP = {2: 2.5, 3: 5.0, 4: 5.0, 5: 5.0, 6: 5.0, 7: 5.0, 8: 5.0, 9: 5.0}
+# topocentric shift of stations is negligible : one index for all locations
+IGNORED_FLAGS = swe.FLG_TOPOCTR
+
+_indexes: Dict[int, Dict[int, np.ndarray]] = {}
+_lock = threading.Lock()
+
+
+def index_flag(flag: int) -> int:
+    return (flag | swe.FLG_SPEED) & ~IGNORED_FLAGS
+
+
+def index_range() -> Tuple[float, float]:
+    """configured range as julian days"""
+    start = int(STATION_INDEX.get("start year", 1800))
+    end = int(STATION_INDEX.get("end year", 2200))
+    return swe.julday(start, 1, 1, 0.0), swe.julday(end, 1, 1, 0.0)
+
+
+def index_path(flag: int) -> str:
+    start, end = (STATION_INDEX.get(k) for k in ("start year", "end year"))
+    return os.path.join(INDEX_DIR, f"stations_{index_flag(flag)}_{start}_{end}.npz")
+
+
+def _speed(body: int, jd: float, flag: int, budget: Budget) -> float:
+    budget.spend()
+    return swe.calc_ut(jd, body, flag)[0][3]
+
+
+def build_body(
+    body: int,
+    flag: int,
+    start_jd: float,
+    end_jd: float,
+    budget: Optional[Budget] = None,
+) -> np.ndarray:
+    """all stations (speed sign changes) of body within range"""
+    flag = index_flag(flag)
+    budget = budget or Budget()
+    step = SCAN_STEP.get(body, 2.5)
+    times = np.arange(start_jd, end_jd + step, step)
+    speeds = np.array([_speed(body, t, flag, budget) for t in times.tolist()])
+    # brackets where speed changes sign, refined by solver
+    direct = speeds > 0
+    idx = np.nonzero(direct[:-1] != direct[1:])[0]
+    f = speed_fn(body, flag, budget)
+    stations = [brent(f, times[i], times[i + 1], budget=budget) for i in idx.tolist()]
+    return np.asarray([s for s in stations if s is not None], dtype=np.float64)
+
+
+def build_index(flag: int, progress=None) -> Dict[int, np.ndarray]:
+    """build & save index for all bodies"""
+    start_jd, end_jd = index_range()
+    index = {}
+    for body in BODIES:
+        budget = Budget()
+        index[body] = build_body(body, flag, start_jd, end_jd, budget)
+        if progress:
+            progress(body, index[body].size, budget)
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    path = index_path(flag)
+    tmp = f"{path}.tmp.npz"
+    np.savez(tmp, **{f"b{body}": index[body] for body in BODIES})
+    os.replace(tmp, path)
+    return index
+
+
+def load_index(flag: int, build: bool = False) -> Optional[Dict[int, np.ndarray]]:
+    """index for flag from memory / disk, none if missing (unless build)
+    building takes seconds : app never builds on lookup, use terminal command"""
+    key = index_flag(flag)
+    with _lock:
+        if key in _indexes:
+            return _indexes[key]
+        path = index_path(flag)
+        index = None
+        if os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    index = {body: data[f"b{body}"] for body in BODIES}
+            except (OSError, KeyError, ValueError):
+                index = None
+        if index is None and build:
+            index = build_index(flag)
+        if index is not None:
+            _indexes[key] = index
+        return index
+
+
+def lookup(
+    body: int, jd: float, flag: int
+) -> Tuple[Optional[float], Optional[float]]:
+    """previous & next station around jd, none if outside index or index
+    is not built (caller falls back to station search)"""
+    index = load_index(flag)
+    if not index or body not in index:
+        return None, None
+    stations = index[body]
+    i = int(np.searchsorted(stations, jd))
+    if i == 0 or i >= stations.size:
+        return None, None
+    return float(stations[i - 1]), float(stations[i])
+
+
+if __name__ == "__main__":
+    flag = int(sys.argv[1]) if len(sys.argv) > 1 else swe.FLG_SWIEPH | swe.FLG_SPEED
+    swe.set_ephe_path(os.path.dirname(INDEX_DIR))
+    print(f"building station index for flag {index_flag(flag)} ...")
+    build_index(
+        flag,
+        lambda body, n, budget: print(
+            f"\tbody {body} : {n} stations | {budget.report()}"
+        ),
+    )
+    print(f"saved {index_path(flag)}")
+    swe.close()
@@ -0,0 +1,289 @@
+# sweph/calculations/timeline.py
+# ruff: noqa: E402
+# transit-to-natal aspect timeline : enter orb / exact / leave orb events
+# coarse grid per transiting body (stations inserted into grid, so
+# longitude is monotonic between grid points), all natal targets checked
+# for sign change in one pass, all brackets refined together (one array
+# position call per iteration)
+import contextlib
+import numpy as np
+import gi
+
+gi.require_version("Gtk", "4.0")
+from gi.repository import Gtk, GLib  # type: ignore
+from typing import Callable, Dict, List, Optional, Tuple
+from ui.fonts.glyphs import ASPECTS
+from sweph.calculations.engine import calc_positions, codes_for
+from sweph.calculations.aspects import aspect_orbs, ASPECT_ANGLES
+from sweph.solver import Budget, brent, speed_fn
+from ui.executor import SWE_LOCK
+from user.settings import TIMELINE
+
+# grid step in days per transiting body
+GRID_STEP = {0: 2.0, 1: 0.5, 2: 1.0, 3: 2.0, 4: 2.0, 10: 5.0, 11: 2.0}
+DEFAULT_STEP = 5.0
+KIND_ORDER = {"enter": 0, "exact": 1, "leave": 2}
+
+
+def timeline_span() -> float:
+    """search range in days when started from tables (user settings)"""
+    return max(1.0, float(TIMELINE.get("span days", 365.25)))
+
+
+def signed_aspects() -> List[Tuple[float, float]]:
+    """(signed aspect angle, orb) : 0 & 180 once, others both sides"""
+    orbs = aspect_orbs()
+    out = []
+    for angle, orb in zip(ASPECT_ANGLES.tolist(), orbs.tolist()):
+        out.append((angle, orb))
+        if 0.0 < angle < 180.0:
+            out.append((-angle, orb))
+    return out
+
+
+def natal_points(app) -> Tuple[List[str], np.ndarray]:
+    """e1 objects + asc & mc"""
+    names, lons = [], []
+    pos = getattr(app, "e1_positions", None) or {}
+    for k, v in pos.items():
+        if isinstance(k, int) and isinstance(v, dict):
+            names.append(v["name"])
+            lons.append(v["lon"])
+    houses = getattr(app, "e1_houses", None)
+    if houses and len(houses) > 1:
+        names += ["asc", "mc"]
+        lons += [houses[1][0], houses[1][1]]
+    return names, np.asarray(lons, dtype=np.float64)
+
+
+def _grid(body: int, start: float, end: float, flag: int, budget: Budget):
+    """sampled lon & speed, station times inserted"""
+    step = GRID_STEP.get(body, DEFAULT_STEP)
+    times = np.arange(start, end + step, step)
+    pos = calc_positions(times, [body], flag)
+    budget.spend(times.size)
+    speed = pos["lon_speed"]
+    flips = np.nonzero((speed[:-1] > 0) != (speed[1:] > 0))[0]
+    if flips.size:
+        f = speed_fn(body, flag, budget)
+        stations = [brent(f, times[i], times[i + 1], budget=budget) for i in flips]
+        stations = np.array([s for s in stations if s is not None])
+        if stations.size:
+            extra = calc_positions(stations, [body], flag)
+            budget.spend(stations.size)
+            times = np.concatenate([times, stations])
+            order = np.argsort(times)
+            times = times[order]
+            pos = np.concatenate([pos, extra])[order]
+    return times, pos["lon"], pos["lon_speed"]
+
+
+def _wrap(diff: np.ndarray) -> np.ndarray:
+    # angle difference to range -180..+180
+    diff = np.mod(diff, 360.0)
+    return np.where(diff > 180.0, diff - 360.0, diff)
+
+
+def _refine(
+    body: int,
+    flag: int,
+    targets: np.ndarray,
+    lo: np.ndarray,
+    hi: np.ndarray,
+    f_lo: np.ndarray,
+    f_hi: np.ndarray,
+    d_lo: np.ndarray,
+    d_hi: np.ndarray,
+    budget: Budget,
+    tol: float = 1e-6,
+    max_iter: int = 40,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """roots & lon speed at roots for all brackets at once (nan if none)
+    newton step (derivative is lon speed) kept inside bracket, else regula
+    falsi with illinois halving, else bisection : lon is monotonic inside"""
+    lo, hi = lo.astype(np.float64), hi.astype(np.float64)
+    f_lo, f_hi = f_lo.astype(np.float64), f_hi.astype(np.float64)
+    # start from end closer to zero
+    near = np.abs(f_lo) < np.abs(f_hi)
+    x = np.where(near, lo, hi)
+    fx = np.where(near, f_lo, f_hi)
+    dx = np.where(near, d_lo, d_hi).astype(np.float64)
+    roots = np.full(lo.size, np.nan)
+    rates = np.full(lo.size, np.nan)
+    done = fx == 0
+    roots[done], rates[done] = x[done], dx[done]
+    active = np.nonzero(~done)[0]
+    # side of last replaced end : illinois halves stale end value
+    side = np.zeros(lo.size, dtype=np.int8)
+    for _ in range(max_iter):
+        if not active.size or budget.exhausted:
+            break
+        a, b, fa, fb = lo[active], hi[active], f_lo[active], f_hi[active]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            nx = x[active] - fx[active] / dx[active]
+            falsi = b - fb * (b - a) / (fb - fa)
+        nx = np.where((nx > a) & (nx < b), nx, falsi)
+        nx = np.where((nx > a) & (nx < b), nx, 0.5 * (a + b))
+        step = np.abs(nx - x[active])
+        pos = calc_positions(nx, [body], flag)
+        budget.spend(nx.size)
+        f = _wrap(pos["lon"] - targets[active])
+        d = pos["lon_speed"]
+        # keep sign change inside bracket
+        left = f * fa > 0
+        s = side[active]
+        lo[active] = np.where(left, nx, a)
+        f_lo[active] = np.where(left, f, np.where(s == 1, 0.5 * fa, fa))
+        hi[active] = np.where(left, b, nx)
+        f_hi[active] = np.where(left, np.where(s == -1, 0.5 * fb, fb), f)
+        side[active] = np.where(left, -1, 1)
+        x[active], fx[active], dx[active] = nx, f, d
+        finished = (
+            (step < tol) | (f == 0) | (hi[active] - lo[active] < tol) | np.isnan(f)
+        )
+        found = active[finished & ~np.isnan(f)]
+        roots[found], rates[found] = x[found], dx[found]
+        active = active[~finished]
+    # out of iterations : best estimate
+    roots[active], rates[active] = x[active], dx[active]
+    return roots, rates
+
+
+def body_events(
+    body: int,
+    name: str,
+    start: float,
+    end: float,
+    flag: int,
+    point_names: List[str],
+    point_lons: np.ndarray,
+    budget: Optional[Budget] = None,
+) -> List[Dict]:
+    """all events of one transiting body against all natal points"""
+    budget = budget or Budget()
+    aspects = signed_aspects()
+    # targets : point x signed aspect x (exact, +orb, -orb)
+    targets, meta = [], []
+    for p, p_lon in enumerate(point_lons.tolist()):
+        for angle, orb in aspects:
+            for offset, kind in ((0.0, "exact"), (orb, "orb+"), (-orb, "orb-")):
+                targets.append((p_lon + angle + offset) % 360.0)
+                meta.append((p, angle, kind))
+    targets = np.asarray(targets)
+    times, lon, speed = _grid(body, start, end, flag, budget)
+    # signed distance to every target on whole grid : time x target
+    f = np.mod(lon[:, None] - targets[None, :], 360.0)
+    f = np.where(f > 180.0, f - 360.0, f)
+    # zero on grid point belongs to bracket starting there : counted once
+    cross = ((f[:-1] * f[1:] < 0) | (f[:-1] == 0)) & (np.abs(f[:-1] - f[1:]) < 180.0)
+    ii, kk = np.nonzero(cross)
+    roots, rates = _refine(
+        body,
+        flag,
+        targets[kk],
+        times[ii],
+        times[ii + 1],
+        f[ii, kk],
+        f[ii + 1, kk],
+        speed[ii],
+        speed[ii + 1],
+        budget,
+    )
+    events = []
+    for k, jd, rate in zip(kk.tolist(), roots.tolist(), rates.tolist()):
+        if np.isnan(jd) or not (start <= jd <= end):
+            continue
+        p, angle, kind = meta[k]
+        if kind != "exact":
+            # moving towards exact aspect = entering orb
+            towards = rate < 0 if kind == "orb+" else rate > 0
+            kind = "enter" if towards else "leave"
+        glyph, aspect = ASPECTS[int(abs(angle))]
+        events.append({
+            "jd": float(jd),
+            "kind": kind,
+            "transit": name,
+            "aspect": aspect,
+            "glyph": glyph,
+            "natal": point_names[p],
+        })
+    events.sort(key=lambda e: (e["jd"], KIND_ORDER[e["kind"]]))
+    return events
+
+
+def aspect_timeline(
+    start: float,
+    end: float,
+    bodies: List[Tuple[int, str]],
+    point_names: List[str],
+    point_lons: np.ndarray,
+    flag: int,
+    on_events: Optional[Callable[[List[Dict]], None]] = None,
+    is_current: Optional[Callable[[], bool]] = None,
+    budget: Optional[Budget] = None,
+    lock=None,
+) -> List[Dict]:
+    """events of all bodies, streamed per body through on_events
+    lock (swe lock) is held per body only : other sweph jobs run in between"""
+    budget = budget or Budget()
+    lock = lock or contextlib.nullcontext()
+    events = []
+    for body, name in bodies:
+        if is_current and not is_current():
+            break
+        with lock:
+            found = body_events(
+                body, name, start, end, flag, point_names, point_lons, budget
+            )
+        events += found
+        if on_events and found:
+            on_events(found)
+    events.sort(key=lambda e: (e["jd"], KIND_ORDER[e["kind"]]))
+    return events
+
+
+def calculate_timeline(
+    start: float,
+    end: float,
+    generation: int,
+    is_current: Callable[[], bool],
+):
+    """runs on batch lane : events go to tables via timeline_changed"""
+    app = Gtk.Application.get_default()
+    notify = app.notify_manager
+    point_names, point_lons = natal_points(app)
+    if not point_names:
+        notify.warning(
+            "missing event one data needed for timeline\n\texiting ...",
+            source="timeline",
+            route=["terminal", "user"],
+        )
+        return
+    use_mean_node = app.chart_settings.get("mean node", False)
+    codes, names = codes_for(app.selected_objects_e2, use_mean_node)
+    budget = Budget()
+
+    def stream(found):
+        GLib.idle_add(
+            app.signal_manager._emit, "timeline_changed", generation, found, False
+        )
+
+    events = aspect_timeline(
+        start,
+        end,
+        list(zip(codes, names)),
+        point_names,
+        point_lons,
+        app.sweph_flag,
+        on_events=stream,
+        is_current=is_current,
+        budget=budget,
+        lock=SWE_LOCK,
+    )
+    GLib.idle_add(app.signal_manager._emit, "timeline_changed", generation, [], True)
+    notify.debug(
+        f"timeline : {len(events)} events | {budget.report()}",
+        source="timeline",
+        route=[""],
+    )
+    return events
@@ -21,6 +21,10 @@ def calculate_varga(event: str, division: int = 9):
     # calculate planetary positions in varga chart
     app = Gtk.Application.get_default()
     notify = app.notify_manager
+    if event is None:
+        # settings changed : all events with data
+        events = ["e1"] + (["e2"] if app.e2_sweph.get("jd_ut") else [])
+        return [calculate_varga(ev, division) for ev in events]
     msg = f"event {event}\n"
     varga_data = []
     varga_data.append({"event": event})
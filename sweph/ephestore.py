@@ -0,0 +1,250 @@
+# sweph/ephestore.py
+# ruff: noqa: E402
+# precomputed ephemeris : chebyshev coefficients of lon, lat & dist per body,
+# flag set & ayanamsa, stored as memory-mapped .npy files in sweph/ephe/cheb
+# calc_ut() is drop-in for swe.calc_ut() : falls back to sweph outside covered
+# range, for flags / bodies without table, or if table fails precision check
+# generate from terminal : python -m sweph.ephestore [flag] [ayanamsa]
+import os
+import sys
+import threading
+import numpy as np
+import swisseph as swe
+from typing import Dict, Optional, Tuple
+from user.settings import EPHE_STORE
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ephe", "cheb")
+# segment length in days & chebyshev degree per body : su - pl, mean & true node
+SEGMENTS = {
+    0: (16.0, 11),
+    1: (4.0, 13),
+    2: (8.0, 13),
+    3: (16.0, 11),
+    4: (16.0, 11),
+    5: (32.0, 11),
+    6: (32.0, 11),
+    7: (32.0, 11),
+    8: (32.0, 11),
+    9: (32.0, 11),
+    10: (32.0, 9),
+    11: (4.0, 13),
+}
+# location dependent : never stored
+UNSUPPORTED_FLAGS = swe.FLG_TOPOCTR
+# row 0 of every table is header : start jd, segment days, max errors
+HEADER = ("start", "days", "err lon", "err lat", "err dist")
+
+# key -> (coefficients, start jd, segment days, segments) or none
+_stores: Dict[tuple, Optional[tuple]] = {}
+_lock = threading.Lock()
+# ayanamsa set by settings : none = unknown or custom, no tables
+_sid_mode: Optional[int] = None
+
+
+def set_sid_mode(mode: Optional[int]):
+    """ayanamsa for sidereal tables, call with swe.set_sid_mode()"""
+    global _sid_mode
+    _sid_mode = None if mode is None or mode == 255 else int(mode)
+
+
+def store_key(body: int, flag: int, sid_mode: Optional[int] = None):
+    """(flag, ayanamsa, body) or none if flag can not be stored"""
+    flag = flag | swe.FLG_SPEED
+    if flag & UNSUPPORTED_FLAGS or body not in SEGMENTS:
+        return None
+    if flag & swe.FLG_SIDEREAL:
+        sid = _sid_mode if sid_mode is None else sid_mode
+        if sid is None:
+            return None
+    else:
+        sid = -1
+    return flag, sid, body
+
+
+def store_path(key: tuple) -> str:
+    flag, sid, body = key
+    start, end = (EPHE_STORE.get(k) for k in ("start year", "end year"))
+    return os.path.join(STORE_DIR, f"cheb_{flag}_{sid}_{body}_{start}_{end}.npy")
+
+
+def load(key: Optional[tuple]) -> Optional[tuple]:
+    """memory-mapped table for key, none if missing or not precise enough"""
+    if key is None or not EPHE_STORE.get("enabled", True):
+        return None
+    table = _stores.get(key, False)
+    if table is not False:
+        return table
+    with _lock:
+        if key in _stores:
+            return _stores[key]
+        table = None
+        path = store_path(key)
+        if os.path.exists(path):
+            try:
+                table = np.load(path, mmap_mode="r")
+            except (OSError, ValueError):
+                table = None
+        if table is not None:
+            header = table[0, 0].tolist()
+            if max(header[2], header[3]) > EPHE_STORE.get("max error", 1e-6):
+                table = None
+            else:
+                # plain ndarray view of mapping : cheaper indexing than memmap
+                table = (np.asarray(table), header[0], header[1], table.shape[0] - 1)
+        _stores[key] = table
+        return table
+
+
+def _clenshaw(c, x):
+    """chebyshev series & its derivative at x in -1 .. 1 (scalar or array)"""
+    b1 = b2 = d1 = d2 = 0.0
+    x2 = 2.0 * x
+    for k in range(c.shape[-1] - 1, 0, -1):
+        ck = c[..., k]
+        b1, b2 = ck + x2 * b1 - b2, b1
+        # derivative : sum k * c[k] * u[k - 1](x)
+        d1, d2 = k * ck + x2 * d1 - d2, d1
+    return c[..., 0] + x * b1 - b2, d1
+
+
+def _clenshaw_py(c, x):
+    """scalar _clenshaw() on plain list : no numpy overhead per call"""
+    b1 = b2 = d1 = d2 = 0.0
+    x2 = 2.0 * x
+    for k in range(len(c) - 1, 0, -1):
+        ck = c[k]
+        b1, b2 = ck + x2 * b1 - b2, b1
+        d1, d2 = k * ck + x2 * d1 - d2, d1
+    return c[0] + x * b1 - b2, d1
+
+
+def _segment(start: float, days: float, n: int, jd):
+    """segment index & local x for julian day(s), index -1 if outside"""
+    pos = (np.asarray(jd, dtype=np.float64) - start) / days
+    idx = np.floor(pos).astype(np.int64)
+    x = 2.0 * (pos - idx) - 1.0
+    idx = np.where((idx >= 0) & (idx < n), idx + 1, -1)
+    return idx, x
+
+
+def calc_ut(jd: float, body: int, flag: int) -> Tuple[tuple, int]:
+    """swe.calc_ut() from table when covered, else from sweph"""
+    store = load(store_key(body, flag))
+    if store is not None:
+        table, start, days, n = store
+        pos = (jd - start) / days
+        idx = int(pos // 1)
+        if 0 <= idx < n:
+            x = 2.0 * (pos - idx) - 1.0
+            scale = 2.0 / days
+            (lon, slon), (lat, slat), (dist, sdist) = (
+                _clenshaw_py(row, x) for row in table[idx + 1].tolist()
+            )
+            return (
+                lon % 360.0,
+                lat,
+                dist,
+                slon * scale,
+                slat * scale,
+                sdist * scale,
+            ), flag | swe.FLG_SPEED
+    return swe.calc_ut(jd, body, flag)
+
+
+def calc_array(jds: np.ndarray, body: int, flag: int) -> Optional[np.ndarray]:
+    """(n, 6) positions for julian days, nan rows where table does not cover
+    none if there is no table for body & flag"""
+    store = load(store_key(body, flag))
+    if store is None:
+        return None
+    table, start, days, n = store
+    idx, x = _segment(start, days, n, jds)
+    out = np.full((idx.size, 6), np.nan)
+    ok = idx > 0
+    if ok.any():
+        value, deriv = _clenshaw(table[idx[ok]], x[ok][:, None])
+        out[ok, :3] = value
+        out[ok, 3:] = deriv * (2.0 / days)
+        out[ok, 0] %= 360.0
+    return out
+
+
+# --- generator
+def _sweph_block(jds: np.ndarray, body: int, flag: int) -> np.ndarray:
+    out = np.empty((jds.size, 3))
+    for i, jd in enumerate(jds.tolist()):
+        out[i] = swe.calc_ut(jd, body, flag)[0][:3]
+    return out
+
+
+def build_body(key: tuple, start_jd: float, end_jd: float) -> np.ndarray:
+    """fit chebyshev segments over range, header row holds max errors"""
+    flag, sid, body = key
+    days, deg = SEGMENTS[body]
+    n = int(np.ceil((end_jd - start_jd) / days))
+    starts = start_jd + days * np.arange(n)
+    # interpolate at chebyshev nodes, check at extrema (worst case points)
+    k = np.arange(deg + 1)
+    nodes = np.cos(np.pi * (k + 0.5) / (deg + 1))[::-1]
+    check = np.cos(np.pi * np.arange(deg + 2) / (deg + 1))[::-1]
+    vander = np.polynomial.chebyshev.chebvander(nodes, deg)
+    inv = np.linalg.inv(vander)
+    fit_jds = (starts[:, None] + (nodes[None, :] + 1.0) * days / 2).ravel()
+    check_jds = (starts[:, None] + (check[None, :] + 1.0) * days / 2).ravel()
+    fit = _sweph_block(fit_jds, body, flag).reshape(n, deg + 1, 3)
+    truth = _sweph_block(check_jds, body, flag).reshape(n, deg + 2, 3)
+    # longitude is fitted unwrapped within each segment
+    fit[:, :, 0] = np.unwrap(fit[:, :, 0], period=360.0, axis=1)
+    coefs = np.einsum("ij,sjc->sci", inv, fit)
+    value, _ = _clenshaw(coefs[:, :, None, :], check[None, None, :])
+    err = value.transpose(0, 2, 1) - truth
+    err[:, :, 0] = (err[:, :, 0] + 180.0) % 360.0 - 180.0
+    max_err = np.abs(err).max(axis=(0, 1))
+    table = np.zeros((n + 1, 3, deg + 1))
+    table[0, 0, : len(HEADER)] = (start_jd, days, *max_err.tolist())
+    table[1:] = coefs
+    return table
+
+
+def build_store(flag: int, sid_mode: Optional[int] = None, progress=None):
+    """build & save tables for all bodies"""
+    start = int(EPHE_STORE.get("start year", 1900))
+    end = int(EPHE_STORE.get("end year", 2100))
+    start_jd, end_jd = swe.julday(start, 1, 1, 0.0), swe.julday(end, 1, 1, 0.0)
+    os.makedirs(STORE_DIR, exist_ok=True)
+    for body in SEGMENTS:
+        key = store_key(body, flag, sid_mode)
+        if key is None:
+            return
+        table = build_body(key, start_jd, end_jd)
+        path = store_path(key)
+        tmp = f"{path}.tmp.npy"
+        np.save(tmp, table)
+        os.replace(tmp, path)
+        with _lock:
+            _stores.pop(key, None)
+        if progress:
+            progress(body, table)
+
+
+if __name__ == "__main__":
+    flag = int(sys.argv[1]) if len(sys.argv) > 1 else swe.FLG_SWIEPH | swe.FLG_SPEED
+    sid_mode = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    swe.set_ephe_path(os.path.dirname(STORE_DIR))
+    if flag & swe.FLG_SIDEREAL:
+        if sid_mode is None:
+            sys.exit("sidereal flag needs ayanamsa : ephestore [flag] [ayanamsa]")
+        swe.set_sid_mode(sid_mode)
+    if flag & UNSUPPORTED_FLAGS:
+        sys.exit(f"flag {flag} is location dependent : can not be stored")
+    print(f"building ephemeris tables for flag {flag | swe.FLG_SPEED} ...")
+    build_store(
+        flag,
+        sid_mode,
+        lambda body, table: print(
+            f"\tbody {body} : {table.shape[0] - 1} segments"
+            f" | max error lon {table[0, 0, 2]:.2e} lat {table[0, 0, 3]:.2e}"
+            f" dist {table[0, 0, 4]:.2e}"
+        ),
+    )
+    swe.close()
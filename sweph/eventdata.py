@@ -5,12 +5,19 @@ import gi
 
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk  # type: ignore
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
-from timezonefinder import TimezoneFinder
+from sweph import timezones
 from ui.helpers import _decimal_to_dms, _update_main_title
-from sweph.swetime import validate_datetime, naive_to_utc, utc_to_jd
-from sweph.calculations.hora import get_current_hora
+from sweph.swetime import (
+    jd_to_custom_iso,
+    validate_datetime,
+    naive_to_utc,
+    utc_to_jd,
+)
+
+UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+UNIX_EPOCH_JD = 2440587.5
 
 
 class EventData:
@@ -273,8 +280,7 @@ class EventData:
             if location != location_formatted:
                 entry.set_text(location_formatted)
             # get timezone from location
-            tzf = TimezoneFinder()
-            timezone_ = tzf.timezone_at(lat=lat, lng=lon)
+            timezone_ = timezones.zone_at(lat, lon)
             if timezone_:
                 self.timezone = timezone_
             else:
@@ -427,7 +433,6 @@ class EventData:
         dt_event_str = ""
         weekdays = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]  # monday = 0
         wday = "-"
-        hora = "-"
         if self.is_hotkey_now:
             # datetime set by hotkey time now utc : validation not needed
             """get utc from computer time"""
@@ -448,15 +453,8 @@ class EventData:
                     # get weekday
                     wday = weekdays[dt_event.weekday()]
                     dt_event_str = dt_event.strftime("%Y-%m-%d %H:%M:%S")
-                    tz_offset_ = dt_event.utcoffset()
-                    tz_offset_str = str(tz_offset_)
-                    # error : invalid literal ... -1 day, 20:00:00 [workaround]
-                    # parse timezone string to decimal hours
-                    parts = [p for p in tz_offset_str.split(",") if p]
-                    days = int(parts[0].split()[0]) if "day" in parts[0] else 0
-                    h, m, s = map(int, parts[-1].strip().split(":"))
-                    # convert to decimal hour
-                    self.tz_offset = days * 24 + h + m / 60 + s / 3600
+                    # decimal hours from cached transition table
+                    self.tz_offset = timezones.utc_offset_at(tz, dt_utc)
                     # msg += f"timenow : tz_offset : {self.tz_offset}"
                     # todo enable below ???
                     msg += (
@@ -511,6 +509,8 @@ class EventData:
                             source="eventdata",
                             route=["terminal"],
                         )
+                        # results of older e2 edits must not bring it back
+                        self.app.signal_manager.clear_event("e2")
                         self.app.signal_manager._emit("e2_cleared", "e2")
                         return
             # data changed
@@ -543,19 +543,11 @@ class EventData:
                 # python datetime only goes down to year 1
                 if Y >= 1:
                     if tz:
-                        dt_event = datetime(Y, M, D, h, m, s, tzinfo=ZoneInfo(tz))
+                        dt_event = datetime(Y, M, D, h, m, s)
                         # calculate weekday
                         wday = weekdays[dt_event.weekday()]
-                        tz_offset = dt_event.utcoffset()
-                        # as string for spliting
-                        tz_offset_str = str(tz_offset)
-                        # error : invalid literal ... -1 day, 20:00:00 [workaround]
-                        # parse timezone string to decimal hours
-                        parts = [p for p in tz_offset_str.split(",") if p]
-                        days_ = int(parts[0].split()[0]) if "day" in parts[0] else 0
-                        h_, m_, s_ = map(int, parts[-1].strip().split(":"))
-                        # convert to decimal hour
-                        self.tz_offset = days_ * 24 + h_ + m_ / 60 + s_ / 3600
+                        # decimal hours from cached transition table
+                        self.tz_offset = timezones.utc_offset(tz, dt_event)
                 else:
                     self.tz_offset = 0.0
                     wday = "-"
@@ -598,30 +590,20 @@ class EventData:
         time_short = time[:5]
         # save datetime data by event
         if datetime_name == "datetime one":
-            # calculate hora
-            lon = self.app.e1_sweph["lon"]
-            lat = self.app.e1_sweph["lat"]
-            alt = self.app.e1_sweph["alt"]
-            hora = get_current_hora(jd_ut, lon, lat, alt, self.app.sweph_flag)
+            # hora is calculated with positions on calculation worker
             self.app.e1_chart["datetime"] = dt_event_str
             self.app.e1_chart["date"] = date
             self.app.e1_chart["time"] = time
             self.app.e1_chart["time_short"] = time_short
             self.app.e1_chart["wday"] = wday
-            self.app.e1_chart["hora"] = hora
             self.app.e1_chart["offset"] = str(self.tz_offset)
             self.app.e1_sweph["jd_ut"] = jd_ut
         else:
-            lon = self.app.e1_sweph["lon"]
-            lat = self.app.e1_sweph["lat"]
-            alt = self.app.e1_sweph["alt"]
-            hora = get_current_hora(jd_ut, lon, lat, alt, self.app.sweph_flag)
             self.app.e2_chart["datetime"] = dt_event_str
             self.app.e2_chart["date"] = date
             self.app.e2_chart["time"] = time
             self.app.e2_chart["time_short"] = time_short
             self.app.e2_chart["wday"] = wday
-            self.app.e2_chart["hora"] = hora
             self.app.e2_chart["offset"] = str(self.tz_offset)
             self.app.e2_sweph["jd_ut"] = jd_ut
         msg += f"{datetime_name} updated\n\t{dt_event_str} | {wday} | jdut : {jd_ut}"
@@ -687,3 +669,38 @@ class EventData:
         change_time = getattr(self.app, "selected_change_time_str", "1 D")
         _update_main_title(self, change_time)
         return
+
+    def set_jd(self, jd_ut: float):
+        """fast path for play mode : set julian day utc directly & emit, no
+        entry parsing / validation ; hora follows with positions calculation"""
+        event = "e1" if self.date_time.get_name() == "datetime one" else "e2"
+        chart = self.app.e1_chart if event == "e1" else self.app.e2_chart
+        sweph = self.app.e1_sweph if event == "e1" else self.app.e2_sweph
+        tz = self.timezone or (
+            self.app.e1_chart.get("timezone") if event == "e2" else None
+        )
+        offset = 0.0
+        if tz:
+            try:
+                dt_utc = UNIX_EPOCH + timedelta(days=jd_ut - UNIX_EPOCH_JD)
+                offset = timezones.utc_offset_at(tz, dt_utc)
+            except (OverflowError, ValueError):
+                # outside python datetime range : fixed utc offset
+                offset = 0.0
+        self.tz_offset = offset
+        jd_local = jd_ut + offset / 24.0
+        dt_event_str = jd_to_custom_iso(jd_local)
+        date, time = dt_event_str.rsplit(" ", 1)
+        chart["datetime"] = dt_event_str
+        chart["date"] = date
+        chart["time"] = time
+        chart["time_short"] = time[:5]
+        # monday = 0 as in on_datetime_change()
+        chart["wday"] = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")[
+            int(jd_local + 0.5) % 7
+        ]
+        chart["offset"] = str(offset)
+        sweph["jd_ut"] = jd_ut
+        self.old_date_time = dt_event_str
+        self.date_time.set_text(dt_event_str)
+        self.app.signal_manager._emit("event_changed", event)
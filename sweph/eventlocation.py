@@ -1,10 +1,234 @@
 # sweph/eventlocation.py
 # ruff: noqa: E402
+import bisect
+import difflib
+import heapq
+import os
 import sqlite3
+import threading
 import gi
 
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk  # type: ignore
+from typing import Dict, List, Optional, Tuple
+from sweph import timezones
+
+# todo hardcoded
+ATLAS_DB = "user/atlas/atlas.db"
+# max cities offered for selection
+CITY_LIMIT = 200
+# one read-only connection per thread, opened on first use & kept open
+_local = threading.local()
+
+# name, lat, lon, elevation, timezone id (from atlas, no extra lookup)
+City = Tuple[str, float, float, int, Optional[str]]
+# timezone id of city row : timezones._idx is primary key
+TZ_JOIN = "LEFT JOIN Timezones AS t ON t._idx = g.timezone"
+
+
+def atlas_connection(path: str = ATLAS_DB) -> sqlite3.Connection:
+    """pooled read-only connection : atlas is never written by app"""
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        if not os.path.exists(path):
+            raise sqlite3.OperationalError(f"atlas not found : {path}")
+        conn = sqlite3.connect(
+            f"file:{os.path.abspath(path)}?mode=ro&immutable=1", uri=True
+        )
+        conn.execute("PRAGMA mmap_size = 268435456")
+        conn.execute("PRAGMA query_only = 1")
+        conns[path] = conn
+    return conn
+
+
+def atlas_features(path: str = ATLAS_DB) -> Dict[str, object]:
+    """what this atlas has : fts index, population column, country ids"""
+    conn = atlas_connection(path)
+    cache = getattr(_local, "features", None)
+    if cache is None:
+        cache = _local.features = {}
+    features = cache.setdefault(path, {})
+    if not features:
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master")}
+        columns = {r[1] for r in conn.execute("PRAGMA table_info(GeoNames)")}
+        features["fts"] = "GeoNamesFTS" in tables
+        features["population"] = "population" in columns
+        features["countries"] = dict(
+            conn.execute("SELECT iso3, _idx FROM CountryInfo").fetchall()
+        )
+    return features
+
+
+def _like_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_cities(
+    city: str, iso3: str, limit: int = CITY_LIMIT, path: str = ATLAS_DB
+) -> List[City]:
+    """cities of country matching name : exact, prefix, substring, fuzzy
+    best matches & most populated first"""
+    city = city.strip()
+    conn = atlas_connection(path)
+    features = atlas_features(path)
+    country = features["countries"].get(iso3)
+    if not city or country is None:
+        return []
+    pop = "g.population" if features["population"] else "0"
+    order = f"""g.name = :city COLLATE NOCASE DESC,
+        g.name LIKE :prefix ESCAPE '\\' DESC, {pop} DESC, g.name"""
+    args = {
+        "city": city,
+        "prefix": f"{_like_escape(city)}%",
+        "substr": f"%{_like_escape(city)}%",
+        "country": country,
+        "limit": limit,
+    }
+    if features["fts"] and len(city) >= 3:
+        # trigram index : substring match in name or ascii name
+        args["match"] = '"' + city.replace('"', '""') + '"'
+        sql = f"""SELECT g.name, g.latitude, g.longitude, g.elevation,
+            t.timezoneid
+            FROM GeoNamesFTS JOIN GeoNames AS g ON g._idx = GeoNamesFTS.rowid
+            {TZ_JOIN}
+            WHERE GeoNamesFTS MATCH :match AND g.country = :country
+            ORDER BY {order} LIMIT :limit"""
+    elif len(city) < 3:
+        sql = f"""SELECT g.name, g.latitude, g.longitude, g.elevation,
+            t.timezoneid
+            FROM GeoNames AS g {TZ_JOIN}
+            WHERE g.country = :country AND g.name LIKE :prefix ESCAPE '\\'
+            ORDER BY {order} LIMIT :limit"""
+    else:
+        # atlas without fts index : scan of one country only
+        sql = f"""SELECT g.name, g.latitude, g.longitude, g.elevation,
+            t.timezoneid
+            FROM GeoNames AS g {TZ_JOIN}
+            WHERE g.country = :country AND g.name LIKE :substr ESCAPE '\\'
+            ORDER BY {order} LIMIT :limit"""
+    cities = conn.execute(sql, args).fetchall()
+    if not cities:
+        cities = fuzzy_cities(conn, city, country, pop, limit)
+    return cities
+
+
+def fuzzy_cities(
+    conn: sqlite3.Connection, city: str, country: int, pop: str, limit: int
+) -> List[City]:
+    """typo tolerant : names of country with same first letter, ranked by
+    similarity then population"""
+    rows = conn.execute(
+        f"""SELECT g.name, g.latitude, g.longitude, g.elevation,
+        t.timezoneid, {pop}
+        FROM GeoNames AS g {TZ_JOIN}
+        WHERE g.country = ? AND g.name LIKE ? ESCAPE '\\'""",
+        (country, f"{_like_escape(city[0])}%"),
+    ).fetchall()
+    lower = city.lower()
+    scored = []
+    for row in rows:
+        matcher = difflib.SequenceMatcher(None, lower, row[0].lower())
+        if matcher.real_quick_ratio() < 0.6 or matcher.quick_ratio() < 0.6:
+            continue
+        ratio = matcher.ratio()
+        if ratio >= 0.6:
+            scored.append((-ratio, -row[5], row[0], row[:5]))
+    scored.sort()
+    return [r[3] for r in scored[:limit]]
+
+
+class CityIndex:
+    """prefix index of one country : sorted lower-case names & ascii names,
+    prefix range found by bisect, most populated hits first"""
+
+    def __init__(self, rows):
+        # rows : (name, asciiname, lat, lon, elevation, timezone, population)
+        self.cities: List[City] = [r[0:1] + r[2:6] for r in rows]
+        self.population = [r[6] or 0 for r in rows]
+        pairs = set()
+        for i, r in enumerate(rows):
+            pairs.add((r[0].lower(), i))
+            if r[1]:
+                pairs.add((r[1].lower(), i))
+        pairs = sorted(pairs)
+        self.keys = [k for k, _ in pairs]
+        self.ids = [i for _, i in pairs]
+
+    def complete(self, prefix: str, limit: int = 50) -> List[City]:
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\uffff", lo)
+        ids = set(self.ids[lo:hi])
+        if len(ids) > limit:
+            ids = heapq.nlargest(limit, ids, key=self.population.__getitem__)
+        else:
+            ids = sorted(ids, key=lambda i: -self.population[i])
+        return [self.cities[i] for i in ids]
+
+
+# (atlas path, iso3) -> city index, built once per country on first use
+_city_indexes: Dict[Tuple[str, str], CityIndex] = {}
+
+
+def city_index(iso3: str, path: str = ATLAS_DB) -> Optional[CityIndex]:
+    """cached index, none if not built yet"""
+    return _city_indexes.get((path, iso3))
+
+
+def build_city_index(iso3: str, path: str = ATLAS_DB) -> Optional[CityIndex]:
+    """load all places of country once : run on calculation worker"""
+    index = _city_indexes.get((path, iso3))
+    if index is not None:
+        return index
+    conn = atlas_connection(path)
+    features = atlas_features(path)
+    country = features["countries"].get(iso3)
+    if country is None:
+        return None
+    pop = "g.population" if features["population"] else "0"
+    rows = conn.execute(
+        f"""SELECT g.name, g.asciiname, g.latitude, g.longitude, g.elevation,
+        t.timezoneid, {pop}
+        FROM GeoNames AS g {TZ_JOIN} WHERE g.country = ?""",
+        (country,),
+    ).fetchall()
+    index = CityIndex(rows)
+    _city_indexes[(path, iso3)] = index
+    return index
+
+
+def city_str(city: City) -> str:
+    return f"{city[0]}, {city[1]}, {city[2]}, {city[3]}, {city[4] or '?'}"
+
+
+def city_list_view(cities: List[str], on_pick) -> Tuple[Gtk.ListView, Gtk.StringList]:
+    """virtualized list of city strings : rows are created for visible items
+    only, on_pick(city string) on click / enter"""
+    model = Gtk.StringList.new(cities)
+    factory = Gtk.SignalListItemFactory()
+
+    def setup(factory_, item):
+        label = Gtk.Label(xalign=0)
+        label.set_margin_start(7)
+        label.set_margin_end(7)
+        item.set_child(label)
+
+    def bind(factory_, item):
+        item.get_child().set_text(item.get_item().get_string())
+
+    factory.connect("setup", setup)
+    factory.connect("bind", bind)
+    selection = Gtk.SingleSelection.new(model)
+    selection.set_autoselect(False)
+    view = Gtk.ListView.new(selection, factory)
+    view.set_single_click_activate(True)
+    view.connect("activate", lambda view_, pos: on_pick(model.get_string(pos)))
+    return view, model
 
 
 class EventLocation:
@@ -17,6 +241,13 @@ class EventLocation:
         self.country_map = {}
         self.selected_city = ""
         self.entry = None
+        # type-ahead completion
+        self.completion = None
+        self.completion_model = None
+        self.country_dropdown = None
+        self.completing = False
+        # countries whose index can not be built (ie atlas missing)
+        self.no_index = set()
 
     def set_location_callback(self, callback):
         self.location_callback = callback
@@ -51,25 +282,10 @@ class EventLocation:
         iso3 = self.country_map.get(country)
 
         try:
-            # todo hardcoded
-            conn = sqlite3.connect("user/atlas/atlas.db")
-            cursor = conn.cursor()
-
-            cursor.execute(
-                """
-                SELECT name, latitude, longitude, elevation
-                FROM GeoNames
-                WHERE country = (SELECT _idx FROM CountryInfo where iso3 = ?)
-                AND LOWER(name) LIKE LOWER(?)
-                """,
-                (iso3, f"%{city}%"),
-            )
-
-            cities = cursor.fetchall()
-            conn.close()
-            self.check_cities(sorted(cities))
+            cities = search_cities(city, iso3)
+            self.check_cities(cities)
 
-        except Exception as e:
+        except sqlite3.Error as e:
             self.notify.error(
                 f"atlas db error\n\t{e}",
                 source="eventlocation",
@@ -85,10 +301,9 @@ class EventLocation:
             return
 
         elif len(cities) == 1:
-            city, lat, lon, alt = cities[0]
-            city_str = f"{city}, {lat}, {lon}, {alt}"
-            self.selected_city = city_str
-            self.update_entries(city_str)
+            selected = city_str(cities[0])
+            self.selected_city = selected
+            self.update_entries(selected)
 
         elif len(cities) > 1:
             self.show_city_dialog(cities)
@@ -103,7 +318,18 @@ class EventLocation:
             lat, lon, alt = parts[1:4]
 
             if self.entry:
+                # entry text is set by program : no new suggestions
+                self.completing = True
                 self.entry.set_text(city_name)
+                self.completing = False
+
+            # atlas knows city timezone (carried in city row) : no need to
+            # guess from coordinates
+            if len(parts) >= 5:
+                try:
+                    timezones.prefer(float(lat), float(lon), parts[4])
+                except ValueError:
+                    pass
 
             if self.location_callback:
                 self.location_callback(lat, lon, alt)
@@ -111,7 +337,8 @@ class EventLocation:
     def show_city_dialog(self, found_cities):
         """present list of found cities for user to select one (modal)"""
         dialog = Gtk.Dialog(
-            title="select city : name | latitude | longitude | altitude [- = s / w ]",
+            title="select city : name | latitude | longitude | altitude | timezone"
+            " [- = s / w ]",
             modal=True,
         )
         dialog.set_transient_for(self.parent)
@@ -124,32 +351,102 @@ class EventLocation:
         scw.set_propagate_natural_height(True)
         content.append(scw)
 
-        listbox = Gtk.ListBox()
-        listbox.set_selection_mode(Gtk.SelectionMode.SINGLE)
-
-        def pick_city(listbox_, row):
-            if row and (label := row.get_child()):
-                if isinstance(label, Gtk.Label):
-                    selected = label.get_text()
-                    self.selected_city = selected
-                    self.update_entries(selected)
-                    dialog.close()
-
-        listbox.connect("row-activated", pick_city)
-
-        margin_h = 7
-        for city in found_cities:
-            row = Gtk.ListBoxRow()
-            city_str = f"{city[0]}, {city[1]}, {city[2]}, {city[3]}"
-            label = Gtk.Label(label=city_str)
-            label.set_margin_start(margin_h)
-            label.set_margin_end(margin_h)
-            row.set_child(label)
-            listbox.append(row)
-
-        scw.set_child(listbox)
+        scw.set_max_content_height(600)
+
+        def pick_city(selected):
+            self.selected_city = selected
+            self.update_entries(selected)
+            dialog.close()
+
+        view, _ = city_list_view([city_str(c) for c in found_cities], pick_city)
+        scw.set_child(view)
         dialog.present()
 
+    def attach_completion(self, ent_city, ddn_country):
+        """as-you-type suggestions from country prefix index"""
+        self.entry = ent_city
+        self.country_dropdown = ddn_country
+        popover = Gtk.Popover()
+        popover.set_parent(ent_city)
+        popover.set_position(Gtk.PositionType.BOTTOM)
+        popover.set_has_arrow(False)
+        # keep keyboard focus in entry while typing
+        popover.set_autohide(False)
+        popover.set_can_focus(False)
+        scw = Gtk.ScrolledWindow()
+        scw.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scw.set_propagate_natural_height(True)
+        scw.set_max_content_height(300)
+        view, model = city_list_view([], self.pick_completion)
+        scw.set_child(view)
+        popover.set_child(scw)
+        self.completion = popover
+        self.completion_model = model
+        ent_city.connect("changed", self.on_city_changed)
+        ent_city.connect("activate", lambda entry: popover.popdown())
+        focus = Gtk.EventControllerFocus.new()
+        focus.connect("leave", lambda ctrl: popover.popdown())
+        ent_city.add_controller(focus)
+        ddn_country.connect("notify::selected", lambda *args: popover.popdown())
+
+    def selected_iso3(self) -> Optional[str]:
+        ddn = self.country_dropdown
+        country = ddn.get_model().get_string(ddn.get_selected())
+        return self.country_map.get(country)
+
+    def on_city_changed(self, entry):
+        if self.completing or not entry.has_focus():
+            return
+        text = entry.get_text().strip()
+        iso3 = self.selected_iso3()
+        if not text or not iso3 or iso3 in self.no_index:
+            self.completion.popdown()
+            return
+        index = city_index(iso3)
+        if index is None:
+            # first keystroke for country : build index on batch lane
+            self.app.executor.submit(
+                "city index",
+                self.build_index,
+                (iso3,),
+                lambda index_: self.index_built(index_, iso3),
+                lane="batch",
+            )
+            return
+        self.show_completion(index, iso3)
+
+    def show_completion(self, index, iso3):
+        if index is None or iso3 != self.selected_iso3():
+            return
+        cities = index.complete(self.entry.get_text())
+        model = self.completion_model
+        model.splice(0, model.get_n_items(), [city_str(c) for c in cities])
+        if cities:
+            self.completion.popup()
+        else:
+            self.completion.popdown()
+
+    def pick_completion(self, selected):
+        self.completion.popdown()
+        self.selected_city = selected
+        self.update_entries(selected)
+
+    def build_index(self, iso3):
+        try:
+            return build_city_index(iso3)
+        except sqlite3.Error as e:
+            self.notify.error(
+                f"atlas db error\n\t{e}",
+                source="eventlocation",
+            )
+            return None
+
+    def index_built(self, index, iso3):
+        if index is None:
+            self.no_index.add(iso3)
+            return
+        self.show_completion(index, iso3)
+
     def get_selected_city(self, entry, dropdown):
         self.get_city_from_atlas(entry, dropdown)
         return self.selected_city
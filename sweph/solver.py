@@ -0,0 +1,245 @@
+# sweph/solver.py
+# ruff: noqa: E402
+# generic event solver : time when some ephemeris function crosses zero
+# scan with adaptive step from body speed envelope, then brent with newton
+# steps ; every calc_ut call is counted against a per-call budget
+import swisseph as swe
+from typing import Callable, Iterator, Optional, Tuple
+from sweph import ephestore
+
+# max |lon speed| in degree / day : bounds how fast a longitude can move
+MAX_SPEED = {
+    0: 1.02,
+    1: 15.4,
+    2: 2.25,
+    3: 1.27,
+    4: 0.80,
+    5: 0.25,
+    6: 0.13,
+    7: 0.07,
+    8: 0.04,
+    9: 0.04,
+    10: 0.06,
+    11: 0.25,
+}
+# max |lon acceleration| in degree / day^2 : bounds how fast speed can change
+MAX_ACCEL = {
+    2: 0.25,
+    3: 0.08,
+    4: 0.03,
+    5: 0.006,
+    6: 0.004,
+    7: 0.0015,
+    8: 0.001,
+    9: 0.001,
+}
+MIN_STEP = 0.05
+# finite difference interval for speed derivative (days)
+FD_STEP = 0.01
+
+# f(jd) -> (value, derivative or none)
+Func = Callable[[float], Tuple[float, Optional[float]]]
+
+
+class Budget:
+    """count ephemeris evaluations spent by one solver call"""
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit
+        self.evals = 0
+        self.exhausted = False
+
+    def spend(self, n: int = 1) -> bool:
+        self.evals += n
+        if self.limit is not None and self.evals > self.limit:
+            self.exhausted = True
+        return not self.exhausted
+
+    def report(self) -> str:
+        limit = f" / {self.limit}" if self.limit is not None else ""
+        state = " [exhausted]" if self.exhausted else ""
+        return f"{self.evals}{limit} evals{state}"
+
+
+def angle_diff(a: float, b: float) -> float:
+    # shortest angle from a to b, range -180..+180
+    diff = (b - a) % 360.0
+    if diff > 180.0:
+        diff -= 360.0
+    return diff
+
+
+def calc(jd: float, body: int, flag: int, budget: Budget):
+    budget.spend()
+    return ephestore.calc_ut(jd, body, flag | swe.FLG_SPEED)[0]
+
+
+# --- functions to solve
+def speed_fn(body: int, flag: int, budget: Budget) -> Func:
+    """lon speed : zero at station ; derivative by finite difference"""
+
+    def f(jd):
+        v = calc(jd, body, flag, budget)[3]
+        v2 = calc(jd + FD_STEP, body, flag, budget)[3]
+        return v, (v2 - v) / FD_STEP
+
+    return f
+
+
+def lon_fn(body: int, target: float, flag: int, budget: Budget) -> Func:
+    """longitude minus target : zero at return / ingress ; derivative is speed"""
+
+    def f(jd):
+        r = calc(jd, body, flag, budget)
+        return angle_diff(target, r[0]), r[3]
+
+    return f
+
+
+# --- core
+def brent(
+    f: Func,
+    a: float,
+    b: float,
+    fa: Optional[Tuple[float, Optional[float]]] = None,
+    fb: Optional[Tuple[float, Optional[float]]] = None,
+    tol: float = 1e-6,
+    budget: Optional[Budget] = None,
+    max_iter: int = 60,
+) -> Optional[float]:
+    """root inside bracket [a, b] : brent, newton step when derivative known"""
+    fa, da = fa or f(a)
+    fb, db = fb or f(b)
+    if fa * fb > 0:
+        return None
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+    c, fc, dc = a, fa, da
+    d = e = b - a
+    for _ in range(max_iter):
+        if budget is not None and budget.exhausted:
+            break
+        if fb * fc > 0:
+            c, fc, dc = a, fa, da
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+            da, db, dc = db, dc, db
+        tol1 = 2e-16 * abs(b) + 0.5 * tol
+        xm = 0.5 * (c - b)
+        if abs(xm) <= tol1 or fb == 0:
+            return b
+        # newton from best point if it stays well inside bracket
+        step = None
+        if db:
+            newton = -fb / db
+            if abs(newton) < abs(xm) and (newton * xm) > 0:
+                step = newton
+        if step is None and abs(e) >= tol1 and abs(fa) > abs(fb):
+            # inverse quadratic interpolation / secant
+            s = fb / fa
+            if a == c:
+                p = 2.0 * xm * s
+                q = 1.0 - s
+            else:
+                q = fa / fc
+                r = fb / fc
+                p = s * (2.0 * xm * q * (q - r) - (b - a) * (r - 1.0))
+                q = (q - 1.0) * (r - 1.0) * (s - 1.0)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2.0 * p < min(3.0 * xm * q - abs(tol1 * q), abs(e * q)):
+                step = p / q
+        if step is None:
+            step = xm
+            e = xm
+        else:
+            e = d
+        d = step
+        a, fa, da = b, fb, db
+        b += d if abs(d) > tol1 else (tol1 if xm > 0 else -tol1)
+        fb, db = f(b)
+    return b
+
+
+def scan(
+    f: Func,
+    start: float,
+    end: float,
+    step_fn: Callable[[float, Optional[float]], float],
+    wrap: bool = False,
+    budget: Optional[Budget] = None,
+) -> Iterator[Tuple[float, float, tuple, tuple]]:
+    """yield brackets (a, b, f(a), f(b)) with sign change, forward or backward"""
+    sign = 1.0 if end >= start else -1.0
+    t = start
+    ft = f(t)
+    while (end - t) * sign > 0:
+        if budget is not None and budget.exhausted:
+            return
+        step = max(step_fn(*ft), MIN_STEP)
+        nt = t + sign * min(step, abs(end - t))
+        fn = f(nt)
+        if ft[0] * fn[0] <= 0:
+            # angle functions jump at +-180 : not a root
+            if not wrap or abs(ft[0] - fn[0]) < 180.0:
+                yield (t, nt, ft, fn) if sign > 0 else (nt, t, fn, ft)
+        t, ft = nt, fn
+
+
+def lon_step(body: int, max_step: float = 30.0):
+    """can not reach zero before |value| / max speed"""
+    max_speed = MAX_SPEED.get(body, 1.0)
+
+    def step(value, deriv):
+        return min(abs(value) / max_speed, max_step)
+
+    return step
+
+
+def station_step(body: int, max_step: float = 20.0):
+    """speed can not change sign before |speed| / max acceleration"""
+    max_accel = MAX_ACCEL.get(body, 0.25)
+
+    def step(value, deriv):
+        return min(abs(value) / max_accel, max_step)
+
+    return step
+
+
+# --- events
+def find_station(
+    body: int,
+    start: float,
+    end: float,
+    flag: int,
+    budget: Optional[Budget] = None,
+    tol: float = 1e-6,
+) -> Optional[float]:
+    """first station from start towards end (end may be before start)"""
+    budget = budget or Budget()
+    f = speed_fn(body, flag, budget)
+    for a, b, fa, fb in scan(f, start, end, station_step(body), budget=budget):
+        return brent(f, a, b, fa, fb, tol, budget)
+    return None
+
+
+def find_crossing(
+    body: int,
+    target: float,
+    start: float,
+    end: float,
+    flag: int,
+    budget: Optional[Budget] = None,
+    tol: float = 1e-7,
+) -> Optional[float]:
+    """first time body longitude equals target : returns & ingresses"""
+    budget = budget or Budget()
+    f = lon_fn(body, target % 360.0, flag, budget)
+    for a, b, fa, fb in scan(f, start, end, lon_step(body), wrap=True, budget=budget):
+        return brent(f, a, b, fa, fb, tol, budget)
+    return None
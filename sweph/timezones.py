@@ -0,0 +1,220 @@
+# sweph/timezones.py
+# ruff: noqa: E402
+# timezone resolver : one timezonefinder (loaded on background thread at
+# startup), lru cache on rounded lat / lon, atlas timezone preferred for
+# picked cities ; utc offsets from cached transition tables by bisect
+# transition tables come from compiled tzif files (zoneinfo data), only
+# years past last stored transition (posix rule) are probed
+import bisect
+import os
+import struct
+import threading
+import zoneinfo
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+# lat / lon rounding for cache key : 3 decimals = cca 100 m
+ROUND = 3
+# atlas timezone applies to locations within this distance (degrees) of city
+PREFER_TOLERANCE = 0.01
+# transition tables cover this utc range, outside zoneinfo is asked directly
+TABLE_START = datetime(1850, 1, 1, tzinfo=timezone.utc)
+TABLE_END = datetime(2150, 1, 1, tzinfo=timezone.utc)
+# sampling step when probing transitions : no zone changes offset twice a day
+SCAN_STEP = 86400
+# sampling step past last tzif transition : posix rule has 2 changes a year
+RULE_STEP = 7 * 86400
+
+_finder = None
+_ready = threading.Event()
+_lock = threading.Lock()
+_started = False
+# (lat, lon, timezone id) of cities picked from atlas
+_preferred: List[Tuple[float, float, str]] = []
+# zone -> (local switch seconds, utc transition seconds, offsets in seconds)
+_tables: Dict[str, Tuple[List[int], List[int], List[int]]] = {}
+
+
+def _load():
+    global _finder
+    try:
+        from timezonefinder import TimezoneFinder
+
+        _finder = TimezoneFinder(in_memory=True)
+    finally:
+        _ready.set()
+
+
+def start():
+    """load timezonefinder on background thread : call once at startup"""
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_load, name="tz-finder", daemon=True).start()
+
+
+def prefer(lat: float, lon: float, zone: Optional[str]):
+    """timezone stored in atlas for city at lat / lon"""
+    if not zone or zone == "?":
+        return
+    _preferred.insert(0, (lat, lon, zone))
+    del _preferred[16:]
+
+
+@lru_cache(maxsize=4096)
+def _zone_at(lat: float, lon: float) -> Optional[str]:
+    start()
+    _ready.wait()
+    if _finder is None:
+        return None
+    return _finder.timezone_at(lat=lat, lng=lon)
+
+
+def zone_at(lat: float, lon: float) -> Optional[str]:
+    """timezone id for location : atlas city first, then timezonefinder"""
+    for p_lat, p_lon, zone in _preferred:
+        near = abs(p_lat - lat) < PREFER_TOLERANCE
+        if near and abs(p_lon - lon) < PREFER_TOLERANCE:
+            return zone
+    return _zone_at(round(lat, ROUND), round(lon, ROUND))
+
+
+def _offset(zone: ZoneInfo, ts: int) -> int:
+    dt = datetime.fromtimestamp(ts, timezone.utc).astimezone(zone)
+    return int(dt.utcoffset().total_seconds())
+
+
+def _tzif_path(tz: str) -> Optional[str]:
+    # compiled zone file : system zoneinfo, then tzdata package
+    for base in zoneinfo.TZPATH:
+        path = os.path.join(base, tz)
+        if os.path.isfile(path):
+            return path
+    try:
+        from importlib.resources import files
+
+        path = files("tzdata").joinpath("zoneinfo", *tz.split("/"))
+        return str(path) if path.is_file() else None
+    except (ImportError, ModuleNotFoundError, TypeError):
+        return None
+
+
+def read_tzif(path: str) -> Optional[Tuple[List[int], List[int], int]]:
+    """utc transition seconds, offset after each & offset before 1st one
+    from tzif file (64-bit data of version 2+), none if not readable"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    def header(pos):
+        if data[pos : pos + 4] != b"TZif":
+            raise ValueError("not tzif")
+        counts = struct.unpack(">6l", data[pos + 20 : pos + 44])
+        return data[pos + 4 : pos + 5], counts
+
+    try:
+        version, counts = header(0)
+        size, pos = 4, 44
+        if version >= b"2":
+            # skip 32-bit block
+            isut, isstd, leap, time, types, chars = counts
+            pos += time * 5 + types * 6 + chars + leap * 8 + isstd + isut
+            version, counts = header(pos)
+            size, pos = 8, pos + 44
+        _, _, _, time, types, _ = counts
+        fmt = f">{time}{'q' if size == 8 else 'l'}"
+        utc = list(struct.unpack(fmt, data[pos : pos + time * size]))
+        pos += time * size
+        idx = data[pos : pos + time]
+        pos += time
+        offsets = [
+            struct.unpack(">lBB", data[pos + 6 * i : pos + 6 * i + 6])[0]
+            for i in range(types)
+        ]
+    except (ValueError, struct.error):
+        return None
+    if not offsets:
+        return None
+    return utc, [offsets[i] for i in idx], offsets[0]
+
+
+def _scan(zone: ZoneInfo, start_ts, end_ts, step, utc, offsets):
+    # probe offsets every step, bisect transition second within step
+    ts = start_ts
+    while ts < end_ts:
+        nxt = min(ts + step, end_ts)
+        off = _offset(zone, nxt)
+        if off != offsets[-1]:
+            lo, hi = ts, nxt
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if _offset(zone, mid) == offsets[-1]:
+                    lo = mid
+                else:
+                    hi = mid
+            utc.append(hi)
+            offsets.append(off)
+        ts = nxt
+
+
+def transitions(tz: str) -> Tuple[List[int], List[int], List[int]]:
+    """cached transition table : offsets[i] is valid after utc[i - 1]"""
+    table = _tables.get(tz)
+    if table is not None:
+        return table
+    zone = ZoneInfo(tz)
+    start_ts = int(TABLE_START.timestamp())
+    end_ts = int(TABLE_END.timestamp())
+    path = _tzif_path(tz)
+    tzif = read_tzif(path) if path else None
+    if tzif is None:
+        # no readable zone file : probe whole range day by day
+        utc, offsets = [], [_offset(zone, start_ts)]
+        _scan(zone, start_ts, end_ts, SCAN_STEP, utc, offsets)
+    else:
+        times, after, first = tzif
+        k = bisect.bisect_right(times, start_ts)
+        utc, offsets = [], [after[k - 1] if k else first]
+        for t, off in zip(times[k:], after[k:]):
+            if t >= end_ts:
+                break
+            # dst flag / abbreviation only changes : same offset
+            if off != offsets[-1]:
+                utc.append(t)
+                offsets.append(off)
+        # past last stored transition zone follows its posix rule
+        last = max(times[-1] if times else start_ts, start_ts)
+        if last < end_ts:
+            _scan(zone, last, end_ts, RULE_STEP, utc, offsets)
+    # local time switches to new offset after gap / ambiguous hour (as fold=0)
+    local = [t + max(offsets[i], offsets[i + 1]) for i, t in enumerate(utc)]
+    table = (local, utc, offsets)
+    _tables[tz] = table
+    return table
+
+
+def _in_table(dt: datetime) -> bool:
+    return TABLE_START.replace(tzinfo=None) < dt < TABLE_END.replace(tzinfo=None)
+
+
+def utc_offset(tz: str, dt: datetime) -> float:
+    """utc offset in hours for naive local datetime in tz"""
+    if not _in_table(dt):
+        return dt.replace(tzinfo=ZoneInfo(tz)).utcoffset() / timedelta(hours=1)
+    local, _, offsets = transitions(tz)
+    ts = int((dt - datetime(1970, 1, 1)).total_seconds())
+    return offsets[bisect.bisect_right(local, ts)] / 3600
+
+
+def utc_offset_at(tz: str, dt_utc: datetime) -> float:
+    """utc offset in hours at aware utc datetime"""
+    if not _in_table(dt_utc.replace(tzinfo=None)):
+        return dt_utc.astimezone(ZoneInfo(tz)).utcoffset() / timedelta(hours=1)
+    _, utc, offsets = transitions(tz)
+    return offsets[bisect.bisect_right(utc, int(dt_utc.timestamp()))] / 3600
@@ -0,0 +1,82 @@
+# ruff: noqa: E402
+import unittest
+import sys
+import os
+import numpy as np
+from unittest.mock import patch
+
+# add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from sweph.calculations.aspects import ASPECT_ANGLES, aspect_grid
+
+
+def index(angle):
+    return int(np.flatnonzero(ASPECT_ANGLES == angle)[0])
+
+
+def one(lon1, speed1, lon2, speed2, **kwargs):
+    # single pair : 1 x 1 grid cell
+    return aspect_grid([lon1], [speed1], [lon2], [speed2], **kwargs)[0, 0]
+
+
+class TestAspectGrid(unittest.TestCase):
+    """aspect, orb & applying per cell"""
+
+    @patch.dict(
+        "sweph.calculations.aspects.ASPECT_ORBS",
+        {0: 8.0, 60: 3.0, 90: 6.0, 120: 6.0, 180: 8.0},
+    )
+    def test_orb_per_aspect(self):
+        # 5° off sextile is outside its 3° orb, 5° off square is within 6°
+        self.assertEqual(one(0.0, 0.0, 65.0, 0.0)["aspect"], -1)
+        cell = one(0.0, 0.0, 95.0, 0.0)
+        self.assertEqual(cell["aspect"], index(90))
+        self.assertAlmostEqual(cell["orb"], 5.0)
+        self.assertEqual(one(10.0, 0.0, 2.5, 0.0)["aspect"], index(0))
+        self.assertEqual(one(0.0, 0.0, 57.5, 0.0)["aspect"], index(60))
+        self.assertTrue(np.isnan(one(0.0, 0.0, 65.0, 0.0)["orb"]))
+
+    def test_single_orb(self):
+        orbs = np.full(ASPECT_ANGLES.size, 0.5)
+        self.assertEqual(one(0.0, 0.0, 121.0, 0.0, orbs=orbs)["aspect"], -1)
+        self.assertEqual(one(0.0, 0.0, 120.4, 0.0, orbs=orbs)["aspect"], index(120))
+
+    def test_applying_across_aries(self):
+        # conjunction across 0° : body 2 at 0.5° moving back is applying
+        self.assertTrue(one(359.5, 0.0, 0.5, -1.0)["applying"])
+        self.assertFalse(one(359.5, 0.0, 0.5, 1.0)["applying"])
+        # body 1 at 0.5° moving ahead, body 2 behind at 359.5°
+        cell = one(0.5, 1.0, 359.5, 0.0)
+        self.assertAlmostEqual(cell["angle"], -1.0)
+        self.assertFalse(cell["applying"])
+        self.assertTrue(one(0.5, -1.0, 359.5, 0.0)["applying"])
+
+    def test_applying_opposition(self):
+        # -179° : moving towards -180° is applying
+        cell = one(179.5, 0.0, 0.5, -1.0)
+        self.assertEqual(cell["aspect"], index(180))
+        self.assertTrue(cell["applying"])
+        self.assertFalse(one(179.5, 0.0, 0.5, 1.0)["applying"])
+        # no aspect : never applying
+        self.assertFalse(one(0.0, 0.0, 40.0, -1.0)["applying"])
+
+    def test_same_diagonal(self):
+        lon = np.array([10.0, 11.0, 100.0])
+        speed = np.array([1.0, 0.5, 0.1])
+        grid = aspect_grid(lon, speed, lon, speed, same=True)
+        self.assertEqual(grid.shape, (3, 3))
+        self.assertTrue((np.diag(grid["aspect"]) == -1).all())
+        self.assertTrue(np.isnan(np.diag(grid["angle"])).all())
+        self.assertFalse(np.diag(grid["applying"]).any())
+        # off diagonal cells are kept & mirrored
+        self.assertEqual(grid["aspect"][0, 1], index(0))
+        self.assertEqual(grid["aspect"][1, 0], index(0))
+        self.assertEqual(grid["aspect"][0, 2], index(90))
+        self.assertAlmostEqual(grid["angle"][1, 0], -grid["angle"][0, 1])
+        # without same : body with itself is conjunct
+        grid = aspect_grid(lon, speed, lon, speed)
+        self.assertTrue((np.diag(grid["aspect"]) == index(0)).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
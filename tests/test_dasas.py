@@ -0,0 +1,97 @@
+# ruff: noqa: E402
+import unittest
+import sys
+import os
+import numpy as np
+
+# add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from sweph.calculations.dasas import (
+    DASA_SYSTEMS,
+    YEARLENGTH,
+    active_chain,
+    active_lords,
+    dasa_tree,
+    get_system,
+    level_bounds,
+)
+
+BIRTH = 2451545.0
+NAK = 360 / 27
+# moon at start, inside & at end of naksatras, incl ashtottari groups
+MOONS = (0.0, 30.0, 5 * NAK + 1.0, 8 * NAK + 7.5, 200.0, 359.9)
+
+
+class TestDasaParity(unittest.TestCase):
+    """tree (table) & batch (datagraph) lookups give same periods"""
+
+    def test_active_chain_vs_active_lords(self):
+        rng = np.random.default_rng(7)
+        for name in DASA_SYSTEMS:
+            system = get_system(name)
+            life = system.total * system.cycles * YEARLENGTH
+            for mo_deg in MOONS:
+                tree = dasa_tree(name, mo_deg, BIRTH)
+                jds = BIRTH + rng.uniform(0.0, life, 300)
+                lords = active_lords(name, mo_deg, BIRTH, jds, depth=3)
+                for jd, row in zip(jds.tolist(), lords.tolist()):
+                    chain = [p.index for p in active_chain(tree, jd, 3)]
+                    self.assertEqual(row[: len(chain)], chain, (name, mo_deg, jd))
+
+    def test_level_bounds_vs_tree(self):
+        for name in DASA_SYSTEMS:
+            for mo_deg in MOONS:
+                tree = dasa_tree(name, mo_deg, BIRTH)
+                maha = tree.children()
+                starts, ends, lords = level_bounds(name, mo_deg, BIRTH, 1)
+                np.testing.assert_allclose(starts, [p.start for p in maha])
+                np.testing.assert_allclose(ends, [p.end for p in maha])
+                self.assertEqual(lords.tolist(), [p.index for p in maha])
+                # 2nd level : all sub-periods of all maha dasas in order
+                subs = [s for p in maha for s in p.children()]
+                starts, ends, lords = level_bounds(name, mo_deg, BIRTH, 2)
+                np.testing.assert_allclose(starts, [s.start for s in subs])
+                self.assertEqual(lords.tolist(), [s.index for s in subs])
+
+    def test_outside_cycles(self):
+        name = "vimsottari"
+        system = get_system(name)
+        jds = [BIRTH - 1.0, BIRTH + system.total * YEARLENGTH * 1.01]
+        lords = active_lords(name, 30.0, BIRTH, jds, depth=2)
+        self.assertTrue((lords == -1).all())
+
+
+class TestDasaBalance(unittest.TestCase):
+    """elapsed part of 1st maha dasa at birth"""
+
+    def elapsed(self, name, mo_deg):
+        tree = dasa_tree(name, mo_deg, BIRTH)
+        first = tree.children()[0]
+        years = get_system(name).years[first.index]
+        return first.lord, (BIRTH - first.full_start) / (years * YEARLENGTH)
+
+    def test_vimsottari_naksatra(self):
+        # krittika (3rd naksatra) : su, quarter traversed
+        lord, part = self.elapsed("vimsottari", 2 * NAK + NAK / 4)
+        self.assertEqual(lord, "su")
+        self.assertAlmostEqual(part, 0.25)
+
+    def test_ashtottari_group(self):
+        # ardra - ashlesha : su for 4 naksatras
+        lord, part = self.elapsed("ashtottari", 5 * NAK)
+        self.assertEqual(lord, "su")
+        self.assertAlmostEqual(part, 0.0)
+        lord, part = self.elapsed("ashtottari", 7 * NAK + NAK / 2)
+        self.assertEqual(lord, "su")
+        self.assertAlmostEqual(part, 2.5 / 4)
+        # ra group wraps : uttara bhadrapada, revati, asvini, bharani
+        lord, part = self.elapsed("ashtottari", 26 * NAK + NAK / 2)
+        self.assertEqual(lord, "ra")
+        self.assertAlmostEqual(part, 1.5 / 4)
+        lord, part = self.elapsed("ashtottari", NAK + NAK / 2)
+        self.assertEqual(lord, "ra")
+        self.assertAlmostEqual(part, 3.5 / 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+# ruff: noqa: E402
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+from unittest.mock import patch
+
+# add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from sweph import ephestore
+
+SWE = "sweph.ephestore.swe.calc_ut"
+FLAG = ephestore.swe.FLG_SWIEPH | ephestore.swe.FLG_SPEED
+# 10 segments of 16 days for sun
+START, END = 2451545.0, 2451545.0 + 160.0
+
+
+def fake_pos(jd):
+    # smooth synthetic body : lon passes 360° inside range
+    lon = 300.0 + 1.0 * (jd - START) + 2.0 * np.sin((jd - START) / 7.0)
+    slon = 1.0 + 2.0 / 7.0 * np.cos((jd - START) / 7.0)
+    lat = 0.5 * np.cos((jd - START) / 11.0)
+    slat = -0.5 / 11.0 * np.sin((jd - START) / 11.0)
+    return lon % 360.0, lat, 1.0, slon, slat, 0.0
+
+
+def fake_calc_ut(jd, body, flag):
+    return fake_pos(jd), flag
+
+
+class StoreCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        patches = [
+            patch("sweph.ephestore.STORE_DIR", self.tmp.name),
+            patch.dict("sweph.ephestore._stores", clear=True),
+            patch("sweph.ephestore._sid_mode", None),
+            patch(SWE, side_effect=fake_calc_ut),
+        ]
+        self.mock_swe = [p.start() for p in patches][-1]
+        for p in patches:
+            self.addCleanup(p.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def save(self, key, table):
+        np.save(ephestore.store_path(key), table)
+
+
+class TestFit(StoreCase):
+    """chebyshev tables against sweph"""
+
+    def setUp(self):
+        super().setUp()
+        self.key = ephestore.store_key(0, FLAG)
+        self.table = ephestore.build_body(self.key, START, END)
+        self.save(self.key, self.table)
+        self.mock_swe.reset_mock()
+
+    def test_header(self):
+        start, days, err_lon, err_lat, _ = self.table[0, 0, :5].tolist()
+        self.assertEqual((start, days), (START, 16.0))
+        self.assertEqual(self.table.shape, (11, 3, 12))
+        self.assertLess(max(err_lon, err_lat), 1e-9)
+
+    def test_calc_ut_from_table(self):
+        for jd in np.linspace(START + 0.01, END - 0.01, 37).tolist():
+            got, flag = ephestore.calc_ut(jd, 0, FLAG)
+            np.testing.assert_allclose(got, fake_pos(jd), atol=1e-8)
+            self.assertTrue(flag & ephestore.swe.FLG_SPEED)
+        self.mock_swe.assert_not_called()
+
+    def test_calc_array(self):
+        jds = np.array([START - 1.0, START + 3.3, END - 0.5, END + 1.0])
+        out = ephestore.calc_array(jds, 0, FLAG)
+        self.assertTrue(np.isnan(out[[0, 3]]).all())
+        np.testing.assert_allclose(out[1], fake_pos(jds[1]), atol=1e-8)
+        np.testing.assert_allclose(out[2], fake_pos(jds[2]), atol=1e-8)
+        self.mock_swe.assert_not_called()
+
+    def test_outside_range_falls_back(self):
+        for jd in (START - 0.5, END + 0.5):
+            got, _ = ephestore.calc_ut(jd, 0, FLAG)
+            self.assertEqual(got, fake_pos(jd))
+        self.assertEqual(self.mock_swe.call_count, 2)
+
+    def test_precision_gate(self):
+        ephestore._stores.clear()
+        with patch.dict(ephestore.EPHE_STORE, {"max error": 1e-12}):
+            self.assertIsNone(ephestore.load(self.key))
+            ephestore.calc_ut(START + 1.0, 0, FLAG)
+        self.mock_swe.assert_called_once()
+        self.assertIsNone(ephestore.calc_array(np.array([START + 1.0]), 0, FLAG))
+
+
+class TestUnsupported(StoreCase):
+    """flags & bodies without table go to sweph"""
+
+    def test_topocentric(self):
+        flag = FLAG | ephestore.swe.FLG_TOPOCTR
+        self.assertIsNone(ephestore.store_key(0, flag))
+        ephestore.calc_ut(START + 1.0, 0, flag)
+        self.mock_swe.assert_called_once_with(START + 1.0, 0, flag)
+
+    def test_sidereal(self):
+        flag = FLAG | ephestore.swe.FLG_SIDEREAL
+        # unknown or custom ayanamsa : no table
+        self.assertIsNone(ephestore.store_key(0, flag))
+        ephestore.calc_ut(START + 1.0, 0, flag)
+        self.mock_swe.assert_called_once()
+        ephestore.set_sid_mode(255)
+        self.assertIsNone(ephestore.store_key(0, flag))
+        # table per ayanamsa : other ayanamsa is not used
+        key = ephestore.store_key(0, flag, sid_mode=1)
+        self.save(key, ephestore.build_body(key, START, END))
+        with patch("sweph.ephestore._sid_mode", 3):
+            self.assertIsNone(ephestore.load(ephestore.store_key(0, flag)))
+        with patch("sweph.ephestore._sid_mode", 1):
+            self.assertIsNotNone(ephestore.load(ephestore.store_key(0, flag)))
+
+    def test_body_without_table(self):
+        self.assertIsNone(ephestore.store_key(15, FLAG))
+        self.assertIsNone(ephestore.calc_array(np.array([START]), 15, FLAG))
+
+
+if __name__ == "__main__":
+    unittest.main()
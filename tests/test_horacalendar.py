@@ -0,0 +1,119 @@
+# ruff: noqa: E402
+import unittest
+import sys
+import os
+import math
+from unittest.mock import patch
+
+# add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from sweph.calculations import horacalendar
+
+# 2026-01-01 0h ut (thursday)
+JAN_1 = 2461041.5
+JUN_8 = JAN_1 + 158
+
+
+class FakeSun:
+    """sunrise 06:00 & sunset 18:00 local mean time ; no sunrise inside
+    polar window (julian days)"""
+
+    def __init__(self, polar=None):
+        self.polar = polar
+
+    def rise_trans(self, jd, body, rsmi, geopos, *args, **kwargs):
+        shift = geopos[0] / 360.0
+        hour = 0.25 if rsmi == horacalendar.swe.CALC_RISE else 0.75
+        t = math.floor(jd + shift - 0.5) + 0.5 + hour - shift
+        while t <= jd:
+            t += 1.0
+        if self.polar and self.polar[0] <= t < self.polar[1]:
+            return -2, (0.0,) * 10
+        return 0, (t,) + (0.0,) * 9
+
+    def calc_ut(self, jd, body, flag):
+        # june declination : polar day in north
+        return (80.0, 23.0, 1.0, 0.0, 0.0, 0.0), flag
+
+
+def patched(sun):
+    return (
+        patch("sweph.calculations.hora.swe.rise_trans", sun.rise_trans),
+        patch("sweph.calculations.horacalendar.swe.calc_ut", sun.calc_ut),
+    )
+
+
+class TestLocationTable(unittest.TestCase):
+    """hora table dates & weekdays from local date"""
+
+    def table(self, location, start, end, sun=None):
+        rise, calc = patched(sun or FakeSun())
+        with rise, calc:
+            return horacalendar.location_table(location, start, end)
+
+    def days(self, df):
+        return df.iloc[::24]
+
+    def test_east_longitude_zone_time(self):
+        # sunrise is 20:41 ut of previous date : date & weekday stay local
+        tokyo = {"name": "tokyo", "lon": 139.7, "lat": 35.7, "tz": "Asia/Tokyo"}
+        df = self.table(tokyo, JAN_1, JAN_1 + 3)
+        days = self.days(df)
+        self.assertEqual(len(df), 3 * 24)
+        self.assertEqual(
+            days["date"].tolist(), ["2026-01-01", "2026-01-02", "2026-01-03"]
+        )
+        self.assertEqual(days["weekday"].tolist(), ["thu", "fri", "sat"])
+        self.assertEqual(days["lord"].tolist(), ["ju", "ve", "sa"])
+        self.assertEqual(days["start_local"].iloc[0], "2026-01-01 05:41:12")
+        self.assertEqual(days["start_utc"].iloc[0], "2025-12-31 20:41:12")
+
+    def test_east_longitude_mean_time(self):
+        fiji = {"name": "fiji", "lon": 178.4, "lat": -18.1}
+        days = self.days(self.table(fiji, JAN_1, JAN_1 + 2))
+        self.assertEqual(days["date"].tolist(), ["2026-01-01", "2026-01-02"])
+        self.assertEqual(days["weekday"].tolist(), ["thu", "fri"])
+        self.assertEqual(days["lord"].tolist(), ["ju", "ve"])
+
+    def test_west_longitude(self):
+        nyc = {"name": "nyc", "lon": -74.0, "lat": 40.7, "tz": "America/New_York"}
+        days = self.days(self.table(nyc, JAN_1, JAN_1 + 2))
+        self.assertEqual(days["date"].tolist(), ["2026-01-01", "2026-01-02"])
+        self.assertEqual(days["lord"].tolist(), ["ju", "ve"])
+
+    def test_polar_day(self):
+        # no sunrise on 2026-06-10 - 06-12 (local mean dates)
+        lon = 15.6
+        shift = lon / 360.0
+        polar = (JUN_8 + 2 - shift, JUN_8 + 5 - shift)
+        svalbard = {"name": "svalbard", "lon": lon, "lat": 78.2}
+        df = self.table(svalbard, JUN_8, JUN_8 + 8, FakeSun(polar))
+        days = self.days(df)
+        # every civil day once, in order
+        self.assertEqual(len(df), 8 * 24)
+        self.assertEqual(
+            days["date"].tolist(), [f"2026-06-{d:02}" for d in range(8, 16)]
+        )
+        self.assertEqual(
+            days["weekday"].tolist(),
+            ["mon", "tue", "wed", "thu", "fri", "sat", "sun", "mon"],
+        )
+        self.assertEqual(
+            days["polar"].tolist(),
+            ["", "polar day follows", "polar day", "polar day", "polar day"]
+            + [""] * 3,
+        )
+        # day before polar day : night horas undefined
+        before = df.iloc[24:48]
+        self.assertTrue((before["lord"].iloc[:12] != "").all())
+        self.assertTrue((before["lord"].iloc[12:] == "").all())
+        # polar days : no horas at all
+        dark = df.iloc[48:120]
+        self.assertTrue((dark["lord"] == "").all())
+        self.assertTrue(dark["start_jd"].isna().all())
+        # after polar day : lords continue from weekday
+        self.assertEqual(days["lord"].iloc[5], "sa")
+
+
+if __name__ == "__main__":
+    unittest.main()
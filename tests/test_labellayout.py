@@ -0,0 +1,82 @@
+# ruff: noqa: E402
+import unittest
+import sys
+import os
+import random
+
+# add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from ui.mainpanes.chart.labellayout import gap_for, spread
+
+
+def circular_gaps(lons):
+    # gaps between neighbours around circle, in sorted order
+    a = sorted(x % 360.0 for x in lons)
+    return [b - a_ for a_, b in zip(a, a[1:])] + [a[0] + 360.0 - a[-1]]
+
+
+def shift(a, b):
+    # shortest move from a to b, degrees
+    return (b - a + 180.0) % 360.0 - 180.0
+
+
+class TestSpread(unittest.TestCase):
+    """label spreading along ring"""
+
+    def test_apart_labels_stay(self):
+        lons = [10.0, 100.0, 200.0]
+        self.assertEqual(spread(lons, 5.0), tuple(lons))
+
+    def test_cluster_keeps_order_and_centre(self):
+        placed = spread([50.0, 51.0, 52.0], 4.0)
+        for a, b in [(0, 1), (1, 2)]:
+            self.assertAlmostEqual(placed[b] - placed[a], 4.0, places=9)
+        self.assertAlmostEqual(sum(placed) / 3, 51.0, places=9)
+
+    def test_cluster_across_aries(self):
+        # stellium around 0° : spread across circle cut, not around it
+        lons = [359.0, 0.0, 1.0]
+        placed = spread(lons, 5.0)
+        self.assertAlmostEqual(shift(359.0, placed[0]), -4.0, places=9)
+        self.assertAlmostEqual(shift(0.0, placed[1]), 0.0, places=9)
+        self.assertAlmostEqual(shift(1.0, placed[2]), 4.0, places=9)
+        self.assertGreaterEqual(min(circular_gaps(placed)), 5.0 - 1e-9)
+        for p in placed:
+            self.assertTrue(0.0 <= p < 360.0)
+
+    def test_over_full_ring(self):
+        # 10 labels needing 50° each do not fit : equal gaps around circle
+        lons = [float(i) for i in range(10)]
+        placed = spread(lons, 50.0)
+        for gap in circular_gaps(placed):
+            self.assertAlmostEqual(gap, 36.0, places=9)
+        # input order is kept around circle
+        order = sorted(range(10), key=lambda i: placed[i])
+        start = order.index(0)
+        self.assertEqual(order[start:] + order[:start], list(range(10)))
+
+    def test_dense_ring_fits(self):
+        # 4 labels at 96 % fill : cluster grows across widest arc, gap is kept
+        lons = [355.65, 356.64, 117.02, 229.51]
+        placed = spread(lons, 86.4)
+        self.assertGreaterEqual(min(circular_gaps(placed)), 86.4 - 1e-9)
+        order = sorted(range(4), key=lambda i: placed[i])
+        start = order.index(0)
+        self.assertEqual(order[start:] + order[:start], [0, 1, 2, 3])
+
+    def test_dense_ring_random(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            n = rng.randint(3, 20)
+            gap = round(rng.uniform(0.7, 0.99) * 360.0 / n, 6)
+            lons = [rng.uniform(0.0, 360.0) for _ in range(n)]
+            placed = spread(lons, gap)
+            self.assertGreaterEqual(min(circular_gaps(placed)), gap - 1e-9)
+
+    def test_gap_for(self):
+        self.assertEqual(gap_for(10.0, 0.0), 0.0)
+        self.assertAlmostEqual(gap_for(10.0, 100.0), 5.729578, places=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# ruff: noqa: E402
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from ui.signalmanager import SignalManager
+
+
+class TestPending(unittest.TestCase):
+    """coalescing of queued node runs"""
+
+    def setUp(self):
+        self.sm = SignalManager(app=MagicMock())
+        self.dirty = {}
+
+    def add(self, *args_list):
+        for args in args_list:
+            self.sm._add_pending(self.dirty, "calculate_cycles", args)
+        return self.dirty["calculate_cycles"]
+
+    def test_all_events_absorbs_single(self):
+        pending = self.add(("e1",), ("e2",), (None,))
+        self.assertEqual(pending, [(None,)])
+        self.assertEqual(self.sm.coalesced, 2)
+
+    def test_single_joins_all_events(self):
+        pending = self.add((None,), ("e1",), ("e2",), (None,))
+        self.assertEqual(pending, [(None,)])
+        self.assertEqual(self.sm.coalesced, 3)
+
+    def test_other_args_kept(self):
+        pending = self.add(("e1",), ("e1",), ("e1", 9), (None,))
+        self.assertEqual(pending, [("e1", 9), (None,)])
+        self.assertEqual(self.sm.coalesced, 2)
+
+
+class TestClearEvent(unittest.TestCase):
+    """deleted event : queued runs dropped, running batch skips it"""
+
+    def setUp(self):
+        self.sm = SignalManager(app=MagicMock())
+        self.ran = []
+
+    def connect(self, clear_on=None):
+        sm, ran = self.sm, self.ran
+
+        def calculate_houses(event):
+            ran.append(("houses", event))
+            if event == clear_on:
+                # e2 is deleted while batch runs
+                sm.clear_event("e2")
+
+        def calculate_positions(event):
+            ran.append(("positions", event))
+
+        sm._connect("event_changed", calculate_houses)
+        sm._connect("event_changed", calculate_positions)
+
+    def test_queued_runs_dropped(self):
+        self.connect()
+        self.sm._mark_dirty("calculate_positions", ("e2",))
+        self.sm._mark_dirty("calculate_positions", ("e1",))
+        self.sm._mark_dirty("calculate_houses", ("e2",))
+        self.sm.clear_event("e2")
+        self.assertEqual(self.sm.dirty, {"calculate_positions": [("e1",)]})
+
+    def test_running_batch_skips_cleared(self):
+        self.connect(clear_on="e1")
+        self.sm._mark_dirty("calculate_houses", ("e1",))
+        self.sm._mark_dirty("calculate_positions", ("e2",))
+        self.sm._mark_dirty("calculate_positions", ("e1",))
+        self.sm._run_nodes()
+        self.assertEqual(self.ran, [("houses", "e1"), ("positions", "e1")])
+        # later edit of e2 runs again
+        self.sm._mark_dirty("calculate_positions", ("e2",))
+        self.sm._run_nodes()
+        self.assertEqual(self.ran[-1], ("positions", "e2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# ruff: noqa: E402
+import unittest
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+# add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from sweph import solver
+from sweph.calculations import returnsolar
+
+# synthetic sun : 1° a day from 0° at jd 0
+SPEED = 1.0
+
+
+def fake_calc(jd, body, flag, budget):
+    budget.spend()
+    return ((jd * SPEED) % 360.0, 0.0, 1.0, SPEED, 0.0, 0.0)
+
+
+@patch("sweph.solver.calc", fake_calc)
+class TestFindCrossing(unittest.TestCase):
+    """crossing search inside / outside search window"""
+
+    def test_crossing_inside_window(self):
+        jd = solver.find_crossing(0, 100.0, 0.0, 365.0, 0)
+        self.assertAlmostEqual(jd, 100.0, places=5)
+
+    def test_crossing_not_bracketed(self):
+        # 100° is reached at jd 100 : window ends before
+        budget = solver.Budget()
+        self.assertIsNone(solver.find_crossing(0, 100.0, 0.0, 50.0, 0, budget))
+        self.assertGreater(budget.evals, 0)
+
+    def test_backward_window(self):
+        jd = solver.find_crossing(0, 100.0, 200.0, 0.0, 0)
+        self.assertAlmostEqual(jd, 100.0, places=5)
+        self.assertIsNone(solver.find_crossing(0, 100.0, 200.0, 150.0, 0))
+
+
+class TestReturnNotFound(unittest.TestCase):
+    """solar return without crossing in window : error, chart not updated"""
+
+    def setUp(self):
+        self.app = MagicMock()
+        self.app.e1_sweph = {"jd_ut": 2451545.0, "lat": 46.0, "lon": 14.5}
+        self.app.e2_sweph = {"jd_ut": 2460000.0}
+        self.app.e1_positions = {"jd_ut": 2451545.0, 0: {"name": "su", "lon": 280.0}}
+        self.app.selected_year_period = (365.2425, "gregorian")
+        self.app.selected_month_period = (27.321661, "sidereal")
+
+    @patch("sweph.calculations.returnsolar.calc_positions")
+    @patch("sweph.calculations.returnsolar.swe")
+    @patch("sweph.calculations.returnsolar.find_crossing", return_value=None)
+    @patch("sweph.calculations.returnsolar.Gtk")
+    def test_solar_return_missing(
+        self, mock_gtk, mock_find, mock_swe, mock_calc_positions
+    ):
+        mock_gtk.Application.get_default.return_value = self.app
+        returnsolar.calculate_sr("e2")
+        self.assertTrue(mock_find.called)
+        self.app.notify_manager.error.assert_called_once()
+        msg = self.app.notify_manager.error.call_args[0][0]
+        self.assertIn("solar return not found", msg)
+        mock_swe.revjul.assert_not_called()
+        mock_calc_positions.assert_not_called()
+        self.app.signal_manager._emit.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
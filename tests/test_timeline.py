@@ -0,0 +1,89 @@
+# ruff: noqa: E402
+import unittest
+import sys
+import os
+import numpy as np
+from unittest.mock import patch
+
+# add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from sweph.calculations import timeline
+from sweph.calculations.engine import POS_DTYPE
+from sweph.solver import Budget
+
+# synthetic body : slow forward motion with retrograde loop every 100 days
+# stations near day 28.2 (20.66°) & 71.8 (9.34°)
+BODY = 2
+W = 2 * np.pi / 100.0
+
+
+def lon(jd):
+    return np.mod(10.0 + 0.1 * jd + 8.0 * np.sin(W * jd), 360.0)
+
+
+def speed(jd):
+    return 0.1 + 8.0 * W * np.cos(W * jd)
+
+
+def fake_positions(jds, codes, flag, *args):
+    jds = np.atleast_1d(np.asarray(jds, dtype=np.float64))
+    out = np.zeros(jds.size, dtype=POS_DTYPE)
+    out["jd"], out["code"] = jds, codes[0]
+    out["lon"], out["lon_speed"] = lon(jds), speed(jds)
+    out["ok"] = True
+    return out
+
+
+def fake_calc(jd, body, flag, budget):
+    budget.spend()
+    return (float(lon(jd)), 0.0, 1.0, float(speed(jd)), 0.0, 0.0)
+
+
+@patch("sweph.solver.calc", fake_calc)
+@patch("sweph.calculations.timeline.calc_positions", fake_positions)
+class TestBodyEvents(unittest.TestCase):
+    """enter / exact / leave from batch refined brackets"""
+
+    def events(self, points, start=0.0, end=120.0):
+        names = [f"p{i}" for i in range(len(points))]
+        budget = Budget()
+        found = timeline.body_events(
+            BODY, "me", start, end, 0, names, np.asarray(points), budget
+        )
+        return found, budget
+
+    def test_retrograde_triple_pass(self):
+        # conjunction with 15° : direct, retrograde & direct again
+        # retrograde exact falls on grid point (day 50) : found once
+        found, budget = self.events([15.0])
+        kinds = [e["kind"] for e in found]
+        self.assertEqual(kinds, ["enter", "exact", "leave"] * 3)
+        self.assertTrue(all(e["aspect"] == "conjunction" for e in found))
+        jds = [e["jd"] for e in found]
+        self.assertEqual(jds, sorted(jds))
+        targets = [13.5, 15.0, 16.5, 16.5, 15.0, 13.5, 13.5, 15.0, 16.5]
+        for jd, target in zip(jds, targets):
+            self.assertAlmostEqual(float(lon(jd)), target, places=6)
+        # middle pass is retrograde
+        self.assertTrue(28.2 < jds[3] < jds[5] < 71.8)
+        self.assertLess(speed(jds[4]), 0)
+        self.assertGreater(budget.evals, 0)
+
+    def test_orb_touched_not_crossed(self):
+        # 21.5° : orb+ edge 20.0 reached before first station, exact never
+        found, _ = self.events([21.5], end=60.0)
+        self.assertEqual([e["kind"] for e in found], ["enter", "leave"])
+        self.assertLess(found[0]["jd"], 28.2)
+        self.assertGreater(found[1]["jd"], 28.2)
+
+    def test_events_inside_window(self):
+        # day 10 at 15.7° (past exact), day 60 at 11.3°
+        found, _ = self.events([15.0], start=10.0, end=60.0)
+        self.assertEqual(
+            [e["kind"] for e in found], ["leave", "enter", "exact", "leave"]
+        )
+        self.assertTrue(all(10.0 <= e["jd"] <= 60.0 for e in found))
+
+
+if __name__ == "__main__":
+    unittest.main()
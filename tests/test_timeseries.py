@@ -0,0 +1,124 @@
+# ruff: noqa: E402
+import unittest
+import sys
+import os
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+# add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from ui.mainpanes import timeseries
+
+
+def write_csv(path, rows, start="2020-01-01 00:00:00"):
+    times = pd.date_range(start, periods=rows, freq="min")
+    df = pd.DataFrame({
+        "DateTime": times.strftime("%Y-%m-%d %H:%M:%S"),
+        "open": np.arange(rows, dtype=np.float64),
+        "close": np.arange(rows, dtype=np.float64) + 0.5,
+        "note": ["x"] * rows,
+    })
+    df.to_csv(path, index=False)
+    return times
+
+
+class TestTimeSeries(unittest.TestCase):
+    """csv > columnar cache, chunk boundaries & stale cache"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv = os.path.join(self.tmp.name, "eurusd.csv")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_chunk_boundaries(self):
+        # 10 rows in chunks of 3 : last chunk is partial
+        times = write_csv(self.csv, 10)
+        seen = []
+        timeseries.convert(self.csv, chunk_rows=3, progress=seen.append)
+        self.assertEqual(seen, [3, 6, 9, 10])
+        self.assertTrue(timeseries.is_cached(self.csv))
+        series = timeseries.open_series(self.csv)
+        self.assertEqual(len(series), 10)
+        # text column is skipped, numeric columns kept
+        self.assertEqual(list(series.columns), ["open", "close"])
+        np.testing.assert_array_equal(
+            series.column("open", 0, 10), np.arange(10, dtype=np.float64)
+        )
+        self.assertTrue((series.index(0, 10) == times).all())
+        # rows across chunk boundary
+        frame = series.frame(2, 5)
+        self.assertEqual(frame["close"].tolist(), [2.5, 3.5, 4.5])
+        self.assertEqual(series.timestamp(3), times[3])
+        self.assertEqual(series.searchsorted(times[6]), 6)
+        self.assertEqual(series.searchsorted(times[6] + pd.Timedelta("30s")), 7)
+
+    def test_unsorted_across_chunks(self):
+        # sorted inside each chunk, but 2nd chunk starts earlier
+        times = pd.date_range("2020-01-01", periods=6, freq="min")
+        order = [3, 4, 5, 0, 1, 2]
+        pd.DataFrame({
+            "datetime": times[order].strftime("%Y-%m-%d %H:%M:%S"),
+            "open": np.arange(6.0),
+        }).to_csv(self.csv, index=False)
+        with self.assertRaises(ValueError):
+            timeseries.convert(self.csv, chunk_rows=3)
+        self.assertFalse(timeseries.is_cached(self.csv))
+
+    def test_concurrent_conversions(self):
+        # same file converted twice at once : no shared temp dir
+        write_csv(self.csv, 2000)
+        errors = []
+
+        def run():
+            try:
+                timeseries.convert(self.csv, chunk_rows=100)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertTrue(timeseries.is_cached(self.csv))
+        self.assertEqual(len(timeseries.open_series(self.csv)), 2000)
+        cache = os.path.dirname(timeseries.cache_dir(self.csv))
+        self.assertEqual(os.listdir(cache), ["eurusd"])
+
+    def test_failed_conversion_leaves_no_temp(self):
+        pd.DataFrame({"open": [1.0, 2.0]}).to_csv(self.csv, index=False)
+        with self.assertRaises(ValueError):
+            timeseries.convert(self.csv)
+        cache = os.path.dirname(timeseries.cache_dir(self.csv))
+        self.assertEqual(os.listdir(cache), [])
+
+    def test_stale_cache(self):
+        write_csv(self.csv, 5)
+        self.assertEqual(len(timeseries.open_series(self.csv)), 5)
+        # csv replaced : size / modification time differ, cache is rebuilt
+        write_csv(self.csv, 8)
+        stamp = os.stat(self.csv).st_mtime_ns + 10**9
+        os.utime(self.csv, ns=(stamp, stamp))
+        self.assertFalse(timeseries.is_cached(self.csv))
+        series = timeseries.open_series(self.csv)
+        self.assertEqual(len(series), 8)
+        self.assertTrue(timeseries.is_cached(self.csv))
+
+    def test_list_instruments_skips_cache(self):
+        write_csv(self.csv, 3)
+        timeseries.convert(self.csv)
+        os.makedirs(os.path.join(self.tmp.name, "fx"))
+        write_csv(os.path.join(self.tmp.name, "fx", "gbpusd.csv"), 3)
+        self.assertEqual(
+            timeseries.list_instruments(self.tmp.name),
+            ["eurusd.csv", os.path.join("fx", "gbpusd.csv")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
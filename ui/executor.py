@@ -0,0 +1,106 @@
+# ui/executor.py
+# ruff: noqa: E402
+# background calculations : one worker thread per lane, sweph calls serialized
+# results come back on gtk main loop via glib.idle_add, tagged with
+# generation : result of superseded request is discarded
+import threading
+import gi
+
+gi.require_version("Gtk", "4.0")
+from gi.repository import Gtk, GLib  # type: ignore
+from typing import Callable, Dict, Optional, Tuple
+
+# pyswisseph keeps global state (topo, sidereal mode, file handles) :
+# any thread calling swe must hold this lock
+SWE_LOCK = threading.RLock()
+# lane name -> whole job runs under swe lock
+# calc : short jobs (signal graph, chart datasets, retro tables)
+# batch : long jobs (timeline, feature export, city index) take swe lock
+# per chunk themselves, so graph recomputes run in between
+LANES: Dict[str, bool] = {"calc": True, "batch": False}
+
+
+class CalcExecutor:
+    def __init__(self, app=None):
+        self.app = app or Gtk.Application.get_default()
+        self.generations: Dict[str, int] = {}
+        # at most one waiting job per key & lane : newer submit replaces older
+        self.pending: Dict[
+            str, Dict[str, Tuple[int, Callable, tuple, Optional[Callable]]]
+        ] = {lane: {} for lane in LANES}
+        self.cond = threading.Condition()
+        self.running = True
+        self.threads: Dict[str, threading.Thread] = {}
+        for lane in LANES:
+            thread = threading.Thread(
+                target=self._run, args=(lane,), name=f"{lane}-worker", daemon=True
+            )
+            self.threads[lane] = thread
+            thread.start()
+
+    def submit(
+        self,
+        key: str,
+        fn: Callable,
+        args: tuple = (),
+        on_done: Optional[Callable] = None,
+        lane: str = "calc",
+    ) -> int:
+        """queue fn(*args) under key on lane, return its generation"""
+        with self.cond:
+            gen = self.generations.get(key, 0) + 1
+            self.generations[key] = gen
+            self.pending[lane][key] = (gen, fn, args, on_done)
+            self.cond.notify_all()
+        return gen
+
+    def is_current(self, key: str, gen: int) -> bool:
+        return self.generations.get(key) == gen
+
+    def in_worker(self) -> bool:
+        return threading.current_thread() in self.threads.values()
+
+    def shutdown(self):
+        with self.cond:
+            self.running = False
+            for pending in self.pending.values():
+                pending.clear()
+            self.cond.notify_all()
+        for thread in self.threads.values():
+            thread.join(timeout=2.0)
+
+    def _run(self, lane: str):
+        pending = self.pending[lane]
+        while True:
+            with self.cond:
+                while self.running and not pending:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                key = next(iter(pending))
+                gen, fn, args, on_done = pending.pop(key)
+            if not self.is_current(key, gen):
+                continue
+            try:
+                if LANES[lane]:
+                    with SWE_LOCK:
+                        result = fn(*args)
+                else:
+                    result = fn(*args)
+            except Exception as e:
+                notify = getattr(self.app, "notify_manager", None)
+                if notify:
+                    notify.error(
+                        f"job {key} failed\n\terror :\n\t{e}",
+                        source="executor",
+                        route=["terminal"],
+                    )
+                continue
+            if on_done:
+                GLib.idle_add(self._deliver, key, gen, on_done, result)
+
+    def _deliver(self, key, gen, on_done, result):
+        # main thread : drop result if newer request exists
+        if self.is_current(key, gen):
+            on_done(result)
+        return False
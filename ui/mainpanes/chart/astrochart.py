@@ -5,12 +5,9 @@ import gi
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk  # type: ignore
 from math import radians
-from sweph.calculations.retro import calculate_retro
-from sweph.calculations.lots import calculate_lots
-from sweph.calculations.eclipses import calculate_eclipses
-from sweph.calculations.lunation import calculate_lunation
-from sweph.calculations.varga import calculate_varga
-from ui.mainpanes.chart.astroobject import AstroObject
+from ui.mainpanes.chart.astroobject import objects_for
+from ui.mainpanes.chart.rendermodel import ChartModel
+from ui.mainpanes.chart.layers import LayerCache
 from ui.mainpanes.chart.rings import (
     Info,
     Event,
@@ -49,6 +46,10 @@ class AstroChart(Gtk.Box):
         self.extra_info = {}
         self.stars = {}
         self.lun_ret_data = []
+        # derived data (retro, lots, eclipses ...) : draw only reads it
+        self.model = ChartModel(self.drawing_area.queue_draw)
+        # cached surface per ring : redrawn only when its inputs change
+        self.layers = LayerCache()
         # subscribe to signals
         signal = self.app.signal_manager
         signal._connect("event_changed", self.event_changed)
@@ -160,18 +161,6 @@ class AstroChart(Gtk.Box):
         # size of application pane(s)
         base = min(width, height) * 0.5
         font_scale = base / 300.0
-        # sort by scale : smaller in front of larger rings
-        guests = {}
-        if self.positions and isinstance(self.positions, dict):
-            guests = sorted(
-                [
-                    self.create_astro_object(obj)
-                    for obj in self.positions.values()
-                    if isinstance(obj, dict) and "lon" in obj
-                ],
-                key=lambda o: o.scale,
-                reverse=True,
-            )
         # construct extra info
         self.extra_info["zod"] = "sid" if self.app.is_sidereal else "tro"
         self.extra_info["aynm"] = (
@@ -237,183 +226,266 @@ class AstroChart(Gtk.Box):
             radius_dict[ring] = max_radius * (max_inner * portion)
         # msg += f"\tradiusdict : {radius_dict}"
         # --- rotate block : if fixed asc > rotate rings
+        # rotation is rendered into layers (not applied to cached bitmaps)
+        rotation = None
         if self.chart_settings.get("fixed asc", False) and self.ascmc:
-            asc_angle = radians(self.ascmc[0])
-            cr.save()
-            cr.translate(cx, cy)
-            cr.rotate(asc_angle)
-            cr.translate(-cx, -cy)
+            rotation = radians(self.ascmc[0])
+        # inputs shared by all layers
+        common = (tuple(radius_dict.items()), font_scale)
+        drawn = []
+
+        def layer(name, inputs, make_ring, rotate=True):
+            """composite ring layer, ring is built & drawn only if inputs changed"""
+
+            def render(lcr):
+                if rotate and rotation is not None:
+                    lcr.translate(cx, cy)
+                    lcr.rotate(rotation)
+                    lcr.translate(-cx, -cy)
+                ring = make_ring()
+                if ring is not None:
+                    ring.draw(lcr)
+
+            drawn.append(name)
+            key = common + (rotation if rotate else None,) + inputs
+            self.layers.paint(cr, name, key, width, height, render)
+
         # --- outer rings : transit
         if "transit" in outer_rings:
-            ring_transit = Transit(
-                radius=radius_dict.get("transit", max_radius),
-                cx=cx,
-                cy=cy,
-                font_size=min(int(12 * font_scale), 14),
-                transit_data=self.transit_data,
-                retro=calculate_retro("e2"),
-                radius_dict=radius_dict,
+            transit_data = getattr(self, "transit_data", None)
+            retro = self.model.get("retro e2")
+            layer(
+                "transit",
+                (transit_data, retro),
+                lambda: Transit(
+                    radius=radius_dict.get("transit", max_radius),
+                    cx=cx,
+                    cy=cy,
+                    font_size=min(int(12 * font_scale), 14),
+                    transit_data=transit_data,
+                    retro=retro,
+                    radius_dict=radius_dict,
+                ),
             )
-            ring_transit.draw(cr)
         # --- varga
         if "varga" in outer_rings:
-            try:
-                division = int(self.chart_settings.get("harmonic ring", "").strip())
-                varga_data = calculate_varga("e2", division)
-            except Exception:
-                division = None
+            varga_data = self.model.get("varga e2")
             if varga_data:
-                ring_varga = Varga(
-                    radius=radius_dict.get("varga", max_radius),
+                layer(
+                    "varga",
+                    (varga_data,),
+                    lambda: Varga(
+                        radius=radius_dict.get("varga", max_radius),
+                        cx=cx,
+                        cy=cy,
+                        font_size=int(12 * font_scale),
+                        varga_data=varga_data,
+                        radius_dict=radius_dict,
+                    ),
+                )
+        # --- lunar return
+        if "lunar return" in outer_rings:
+            layer(
+                "lunar return",
+                (self.lun_ret_data,),
+                lambda: LunarReturn(
+                    radius=radius_dict.get("lunar return", max_radius),
                     cx=cx,
                     cy=cy,
                     font_size=int(12 * font_scale),
-                    varga_data=varga_data,
+                    lun_ret_data=self.lun_ret_data,
                     radius_dict=radius_dict,
-                )
-                ring_varga.draw(cr)
-        # --- lunar return
-        if "lunar return" in outer_rings:
-            ring_lunar = LunarReturn(
-                radius=radius_dict.get("lunar return", max_radius),
-                cx=cx,
-                cy=cy,
-                font_size=int(12 * font_scale),
-                lun_ret_data=self.lun_ret_data,
-                radius_dict=radius_dict,
+                ),
             )
-            ring_lunar.draw(cr)
         # --- solar return
         if "solar return" in outer_rings:
-            ring_solar = SolarReturn(
-                radius=radius_dict.get("solar return", max_radius),
-                cx=cx,
-                cy=cy,
-                font_size=int(12 * font_scale),
-                sol_ret_data=self.sol_ret_data,
-                radius_dict=radius_dict,
+            sol_ret_data = getattr(self, "sol_ret_data", None)
+            layer(
+                "solar return",
+                (sol_ret_data,),
+                lambda: SolarReturn(
+                    radius=radius_dict.get("solar return", max_radius),
+                    cx=cx,
+                    cy=cy,
+                    font_size=int(12 * font_scale),
+                    sol_ret_data=sol_ret_data,
+                    radius_dict=radius_dict,
+                ),
             )
-            ring_solar.draw(cr)
         # --- tertiary progressions
         if "p3 progress" in outer_rings:
-            ring_p3 = P3Progress(
-                radius=radius_dict.get("p3 progress", max_radius),
-                cx=cx,
-                cy=cy,
-                font_size=int(12 * font_scale),
-                p3_pos=self.p3_pos,
-                retro=calculate_retro("p3"),
-                radius_dict=radius_dict,
+            p3_pos = getattr(self, "p3_pos", None)
+            retro = self.model.get("retro p3")
+            layer(
+                "p3 progress",
+                (p3_pos, retro),
+                lambda: P3Progress(
+                    radius=radius_dict.get("p3 progress", max_radius),
+                    cx=cx,
+                    cy=cy,
+                    font_size=int(12 * font_scale),
+                    p3_pos=p3_pos,
+                    retro=retro,
+                    radius_dict=radius_dict,
+                ),
             )
-            ring_p3.draw(cr)
         # --- secondary progressions
         if "p2 progress" in outer_rings:
-            ring_p2 = P2Progress(
-                radius=radius_dict.get("p2 progress", max_radius),
-                cx=cx,
-                cy=cy,
-                font_size=int(12 * font_scale),
-                p2_pos=self.p2_pos,
-                retro=calculate_retro("p2"),
-                radius_dict=radius_dict,
+            p2_pos = getattr(self, "p2_pos", None)
+            retro = self.model.get("retro p2")
+            layer(
+                "p2 progress",
+                (p2_pos, retro),
+                lambda: P2Progress(
+                    radius=radius_dict.get("p2 progress", max_radius),
+                    cx=cx,
+                    cy=cy,
+                    font_size=int(12 * font_scale),
+                    p2_pos=p2_pos,
+                    retro=retro,
+                    radius_dict=radius_dict,
+                ),
             )
-            ring_p2.draw(cr)
         # --- primary progressions
         if "p1 progress" in outer_rings:
-            ring_p1 = P1Progress(
-                radius=radius_dict.get("p1 progress", max_radius),
-                cx=cx,
-                cy=cy,
-                font_size=int(12 * font_scale),
-                chart_settings=self.chart_settings,
-                p1_pos=self.p1_pos,
-                radius_dict=radius_dict,
+            p1_pos = getattr(self, "p1_pos", None)
+            layer(
+                "p1 progress",
+                (p1_pos, dict(self.chart_settings)),
+                lambda: P1Progress(
+                    radius=radius_dict.get("p1 progress", max_radius),
+                    cx=cx,
+                    cy=cy,
+                    font_size=int(12 * font_scale),
+                    chart_settings=self.chart_settings,
+                    p1_pos=p1_pos,
+                    radius_dict=radius_dict,
+                ),
             )
-            ring_p1.draw(cr)
         # --- optional rings : harmonic
         if "harmonic" in outer_rings:
             try:
                 division = int(self.chart_settings.get("harmonic ring", "").strip())
-                varga_data = calculate_varga("e1", division)
-            except Exception:
+            except ValueError:
                 division = None
+            varga_data = self.model.get("varga e1")
             if division:
-                ring_harmonic = Harmonic(
-                    self.notify,
-                    radius=radius_dict.get("harmonic", max_radius),
-                    cx=cx,
-                    cy=cy,
-                    division=division,
-                    varga_data=varga_data,
-                    radius_dict=radius_dict,
-                    font_size=int(12 * font_scale),
+                layer(
+                    "harmonic",
+                    (division, varga_data),
+                    lambda: Harmonic(
+                        self.notify,
+                        radius=radius_dict.get("harmonic", max_radius),
+                        cx=cx,
+                        cy=cy,
+                        division=division,
+                        varga_data=varga_data,
+                        radius_dict=radius_dict,
+                        font_size=int(12 * font_scale),
+                    ),
                 )
-                ring_harmonic.draw(cr)
         # --- naksatras
         if "naksatras" in outer_rings:
             naks_num = 28 if self.chart_settings.get("28 naksatras", False) else 27
             first_nak = int(self.chart_settings.get("1st naksatra", 1))
-            ring_naksatras = Naksatras(
-                radius=radius_dict.get("naksatras", ""),
-                cx=cx,
-                cy=cy,
-                font_size=int(12 * font_scale),
-                naks_num=naks_num,
-                first_nak=first_nak,
-                radius_dict=radius_dict,
+            layer(
+                "naksatras",
+                (naks_num, first_nak),
+                lambda: Naksatras(
+                    radius=radius_dict.get("naksatras", ""),
+                    cx=cx,
+                    cy=cy,
+                    font_size=int(12 * font_scale),
+                    naks_num=naks_num,
+                    first_nak=first_nak,
+                    radius_dict=radius_dict,
+                ),
             )
-            ring_naksatras.draw(cr)
         # --- outer rings end
         # --- mandatory inner rings
         # chart rings
-        ring_signs = Signs(
-            radius=radius_dict.get("signs", 0.0),
-            cx=cx,
-            cy=cy,
-            font_size=int(radius_dict.get("signs", 0.0) * 0.07),
-            stars=self.stars,
-            radius_dict=radius_dict,
+        layer(
+            "signs",
+            (self.stars,),
+            lambda: Signs(
+                radius=radius_dict.get("signs", 0.0),
+                cx=cx,
+                cy=cy,
+                font_size=int(radius_dict.get("signs", 0.0) * 0.07),
+                stars=self.stars,
+                radius_dict=radius_dict,
+            ),
         )
-        ring_signs.draw(cr)
-        ring_event = Event(
-            radius=radius_dict.get("event", 0.0),
-            cx=cx,
-            cy=cy,
-            font_size=int(radius_dict.get("event", 0.0) * 0.08),
-            guests=guests,
-            cusps=self.cusps if self.cusps else [],
-            ascmc=self.ascmc if self.ascmc else [],
-            chart_settings=self.chart_settings,
-            retro=calculate_retro("e1"),
-            lots=calculate_lots("e1"),
-            eclipses=calculate_eclipses("e1"),
-            lunation=calculate_lunation("e1"),
-            radius_dict=radius_dict,
+        event_inputs = (
+            self.positions,
+            self.cusps,
+            self.ascmc,
+            dict(self.chart_settings),
+            self.model.get("retro e1"),
+            self.model.get("lots e1"),
+            self.model.get("eclipses e1"),
+            self.model.get("lunation e1"),
+        )
+        layer(
+            "event",
+            event_inputs,
+            lambda: Event(
+                radius=radius_dict.get("event", 0.0),
+                cx=cx,
+                cy=cy,
+                font_size=int(radius_dict.get("event", 0.0) * 0.08),
+                guests=self.guests(),
+                cusps=self.cusps if self.cusps else [],
+                ascmc=self.ascmc if self.ascmc else [],
+                chart_settings=self.chart_settings,
+                retro=event_inputs[4],
+                lots=event_inputs[5],
+                eclipses=event_inputs[6],
+                lunation=event_inputs[7],
+                radius_dict=radius_dict,
+            ),
         )
-        ring_event.draw(cr)
-        # restore context if chart rotation was applied
-        if self.chart_settings.get("fixed asc", False) and self.ascmc:
-            cr.restore()
         # --- rotate block end
         # draw info ring last > no text rotation
-        ring_info = Info(
-            self.notify,
-            radius=radius_dict.get("info", 0.0),
-            cx=cx,
-            cy=cy,
-            font_size=int(radius_dict.get("info", 0.0) * 0.17),
-            chart_settings=self.chart_settings,
-            # radius_dict=radius_dict,
-            event_data=self.e1_chart_info,
-            extra_info=self.extra_info,
-            radius_dict=radius_dict,
+        layer(
+            "info",
+            (
+                dict(self.e1_chart_info),
+                dict(self.extra_info),
+                dict(self.chart_settings),
+            ),
+            lambda: Info(
+                self.notify,
+                radius=radius_dict.get("info", 0.0),
+                cx=cx,
+                cy=cy,
+                font_size=int(radius_dict.get("info", 0.0) * 0.17),
+                chart_settings=self.chart_settings,
+                # radius_dict=radius_dict,
+                event_data=self.e1_chart_info,
+                extra_info=self.extra_info,
+                radius_dict=radius_dict,
+            ),
+            rotate=False,
         )
-        ring_info.draw(cr)
+        self.layers.retain(drawn)
         self.notify.debug(
             msg,
             source="astrochart",
             route=[""],
         )
 
-    def create_astro_object(self, obj):
-        return AstroObject(obj)
+    def guests(self):
+        """event 1 objects, sorted by scale : smaller in front of larger rings"""
+        if not self.positions or not isinstance(self.positions, dict):
+            return []
+        # persistent objects, updated in place
+        objects = objects_for(
+            "event e1",
+            [
+                obj
+                for obj in self.positions.values()
+                if isinstance(obj, dict) and "lon" in obj
+            ],
+        )
+        return sorted(objects, key=lambda o: o.scale, reverse=True)
@@ -1,24 +1,40 @@
 # ui/mainpanes/chart/astroobject.py
+from functools import lru_cache
+from typing import Dict, List
 from user.settings import OBJECTS
 from math import pi, radians, cos, sin
 
 
+@lru_cache(maxsize=None)
+def _style(name: str):
+    """(color, scale) for object name, defaults if not in settings"""
+    for obj in OBJECTS.values():
+        if obj[0].lower() == name:
+            return obj[4], obj[5]
+    return (0.1, 0.1, 0.1, 0.5), 1.0
+
+
 class AstroObject:
+    # marker radius factor
+    size = 0.7
+
     def __init__(self, data):
-        self.data = data
-        # print(f"astrochart : objects : {data}")
-        self.size = 0.7
-        name = self.data.get("name", "su").lower()
+        self.data = {}
+        self.name = None
         # default color & scale
         self.color = (0.1, 0.1, 0.1, 0.5)
         # leave below for proper event ring objects scaling
         self.scale = 1.0
+        self.update(data)
 
-        for obj in OBJECTS.values():
-            if obj[0].lower() == name:
-                self.color = obj[4]
-                self.scale = obj[5]
-                break
+    def update(self, data):
+        """new data for same object : style is resolved only if name changed"""
+        self.data = data
+        # print(f"astrochart : objects : {data}")
+        name = self.data.get("name", "su").lower()
+        if name != self.name:
+            self.name = name
+            self.color, self.scale = _style(name)
 
     def __repr__(self):
         # use this to access data with print(...)
@@ -26,12 +42,16 @@ class AstroObject:
         lon = self.data.get("lon", "/")
         return f"astroobject : {name} - {lon}"
 
-    def draw(self, cr, cx, cy, radius, obj_scale=1.0, scale=None, color=None):
-        # allow for custom color & scale
+    def draw(
+        self, cr, cx, cy, radius, obj_scale=1.0, scale=None, color=None, lon=None
+    ):
+        # allow for custom color & scale, & position moved by label layout
         draw_color = color if color is not None else self.color
         draw_scale = scale if scale is not None else self.scale
+        if lon is None:
+            lon = self.data.get("lon", 0)
         # compute angle & draw in ccw direction, start at left (aries)
-        angle = pi - radians(self.data.get("lon", 0))
+        angle = pi - radians(lon)
         # determine radius by scale
         obj_size = self.size * draw_scale * obj_scale
         x = cx + radius * cos(angle)
@@ -40,3 +60,27 @@ class AstroObject:
         cr.arc(x, y, obj_size, 0, 2 * pi)
         cr.set_source_rgba(*draw_color)
         cr.fill()
+
+
+# persistent objects per ring : ring key -> object key -> astro object
+_pools: Dict[str, Dict[tuple, AstroObject]] = {}
+
+
+def objects_for(ring: str, items: List[dict]) -> List[AstroObject]:
+    """astro objects for ring data, existing instances are updated in place"""
+    pool = _pools.setdefault(ring, {})
+    objects = []
+    seen = set()
+    for i, data in enumerate(items):
+        key = (data.get("name"), i)
+        obj = pool.get(key)
+        if obj is None:
+            obj = pool[key] = AstroObject(data)
+        else:
+            obj.update(data)
+        seen.add(key)
+        objects.append(obj)
+    if len(pool) > len(seen):
+        for key in [k for k in pool if k not in seen]:
+            del pool[key]
+    return objects
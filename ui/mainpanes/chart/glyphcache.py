@@ -0,0 +1,68 @@
+# ui/mainpanes/chart/glyphcache.py
+# ruff: noqa: E402
+# glyph & text layout cache : font face created once, text extents & glyph
+# outlines (cairo paths) cached per (font, size, text) ; rings fill cached
+# outlines instead of selecting font & laying out text on every draw
+import cairo
+from functools import lru_cache
+from typing import Tuple
+
+FONT = "VictorMonoLightAstro"
+_scratch = None
+
+
+def _context() -> cairo.Context:
+    """1x1 context used for measuring & outlining text (main thread only)"""
+    global _scratch
+    if _scratch is None:
+        _scratch = cairo.Context(cairo.ImageSurface(cairo.FORMAT_ARGB32, 1, 1))
+    return _scratch
+
+
+@lru_cache(maxsize=None)
+def font_face(family: str = FONT) -> cairo.ToyFontFace:
+    return cairo.ToyFontFace(
+        family, cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_NORMAL
+    )
+
+
+@lru_cache(maxsize=4096)
+def _layout(family: str, size: float, text: str) -> Tuple[tuple, cairo.Path]:
+    """extents & outline of text at origin (baseline start)"""
+    cr = _context()
+    cr.set_font_face(font_face(family))
+    cr.set_font_size(size)
+    extents = tuple(cr.text_extents(text))
+    cr.new_path()
+    cr.move_to(0, 0)
+    cr.text_path(text)
+    path = cr.copy_path()
+    cr.new_path()
+    return extents, path
+
+
+def text_extents(text: str, size: float, family: str = FONT) -> tuple:
+    """(x bearing, y bearing, width, height, x advance, y advance)"""
+    return _layout(family, float(size), text)[0]
+
+
+def show_text(cr, text: str, size: float, x: float, y: float, family: str = FONT):
+    """fill cached outline of text with baseline start at x, y (user space)
+    source colour is taken from context"""
+    path = _layout(family, float(size), text)[1]
+    cr.save()
+    cr.translate(x, y)
+    cr.new_path()
+    cr.append_path(path)
+    cr.fill()
+    cr.restore()
+
+
+def show_centered(cr, text: str, size: float, x: float, y: float, family: str = FONT):
+    """text centred on x, y by its ink extents"""
+    xb, yb, w, h, _, _ = _layout(family, float(size), text)[0]
+    show_text(cr, text, size, x - (w / 2 + xb), y - (h / 2 + yb), family)
+
+
+def cache_info():
+    return _layout.cache_info()
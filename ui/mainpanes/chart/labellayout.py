@@ -0,0 +1,77 @@
+# ui/mainpanes/chart/labellayout.py
+# ruff: noqa: E402
+# collision-free placement of labels / markers along a ring : labels keep
+# their order & at least min gap (degrees) between neighbours, while staying
+# as close as possible to their true longitude
+# labels are sorted once, circle is cut at an empty arc (widest first), then
+# one sweep pools adjacent overlapping clusters (pool adjacent violators) :
+# this is exact rest position of springs pulling every label to its longitude
+# under hard spacing constraint, in o(n log n) per cut tried ; results are
+# cached per (longitudes, gap), so layout is redone only when positions change
+from functools import lru_cache
+from math import degrees
+from typing import Sequence, Tuple
+
+
+def gap_for(size: float, radius: float) -> float:
+    """angular gap in degrees for label of size (pixels) at radius"""
+    if radius <= 0:
+        return 0.0
+    return degrees(size / radius)
+
+
+def _pav(seq, gap: float):
+    """positions p[i] = q[i] + i * gap with q non-decreasing, nearest to seq"""
+    blocks = []  # [sum, count]
+    for i, x in enumerate(seq):
+        blocks.append([x - i * gap, 1])
+        while len(blocks) > 1 and (
+            blocks[-2][0] * blocks[-1][1] > blocks[-1][0] * blocks[-2][1]
+        ):
+            s, c = blocks.pop()
+            blocks[-1][0] += s
+            blocks[-1][1] += c
+    pos = []
+    for s, c in blocks:
+        pos += [s / c] * c
+    return [q + i * gap for i, q in enumerate(pos)]
+
+
+@lru_cache(maxsize=128)
+def _spread(lons: Tuple[float, ...], gap: float) -> Tuple[float, ...]:
+    n = len(lons)
+    if n < 2 or gap <= 0:
+        return lons
+    gap = min(gap, 360.0 / n)
+    order = sorted(range(n), key=lambda i: lons[i] % 360.0)
+    a = [lons[i] % 360.0 for i in order]
+    # cut circle after an empty arc, widest first : some neighbours keep more
+    # than gap in optimal layout (unless ring is full), cut there solves ring
+    # exactly ; cut is right if layout does not grow across it
+    arcs = [a[k + 1] - a[k] for k in range(n - 1)] + [a[0] + 360.0 - a[-1]]
+    cuts = sorted(range(n), key=lambda k: -arcs[k])
+    for k in cuts:
+        cut = (k + 1) % n
+        seq = a[cut:] + [x + 360.0 for x in a[:cut]]
+        pos = _pav(seq, gap)
+        span = pos[-1] - pos[0]
+        if span <= 360.0 - gap + 1e-9:
+            break
+    else:
+        # rounding only : squeeze last layout around its centre
+        mid = (pos[-1] + pos[0]) / 2
+        f = (360.0 - gap) / span
+        pos = [mid + (p - mid) * f for p in pos]
+    out = [0.0] * n
+    for j, p in enumerate(pos):
+        out[order[(cut + j) % n]] = p % 360.0
+    return tuple(out)
+
+
+def spread(lons: Sequence[float], gap: float) -> Tuple[float, ...]:
+    """label longitudes moved apart by at least gap degrees (input order)"""
+    return _spread(tuple(float(x) for x in lons), round(float(gap), 6))
+
+
+def cache_info():
+    return _spread.cache_info()
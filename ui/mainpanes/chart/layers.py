@@ -0,0 +1,81 @@
+# ui/mainpanes/chart/layers.py
+# ruff: noqa: E402
+# layered chart renderer : every ring is drawn into its own cached image
+# surface, keyed on its inputs (size, settings, data) ; per frame layers are
+# only composited, a layer is redrawn when its inputs differ from last frame
+import cairo
+from typing import Callable, Dict, Iterable, Tuple
+
+
+def _same(a: tuple, b: tuple) -> bool:
+    try:
+        return bool(a == b)
+    except ValueError:
+        # array inputs : ambiguous truth value, treat as changed
+        return False
+
+
+class LayerCache:
+    """cached argb surface per ring layer"""
+
+    def __init__(self):
+        # name -> (inputs, surface)
+        self.layers: Dict[str, Tuple[tuple, cairo.ImageSurface]] = {}
+        # redraw counters, for debugging
+        self.rendered = 0
+        self.reused = 0
+
+    @staticmethod
+    def _device_scale(cr) -> Tuple[float, float]:
+        try:
+            return cr.get_target().get_device_scale()
+        except (AttributeError, cairo.Error):
+            return 1.0, 1.0
+
+    def paint(
+        self,
+        cr,
+        name: str,
+        inputs: tuple,
+        width: int,
+        height: int,
+        render: Callable,
+    ):
+        """composite layer, render(layer_cr) first if inputs changed
+        inputs are compared with == : pass copies of dicts mutated in place"""
+        sx, sy = self._device_scale(cr)
+        key = (width, height, sx, sy, inputs)
+        entry = self.layers.get(name)
+        if entry is None or not _same(entry[0], key):
+            surface = None
+            if entry is not None and entry[0][:4] == key[:4]:
+                surface = entry[1]
+            else:
+                surface = cairo.ImageSurface(
+                    cairo.FORMAT_ARGB32,
+                    max(1, int(width * sx)),
+                    max(1, int(height * sy)),
+                )
+                surface.set_device_scale(sx, sy)
+            lcr = cairo.Context(surface)
+            lcr.set_operator(cairo.OPERATOR_CLEAR)
+            lcr.paint()
+            lcr.set_operator(cairo.OPERATOR_OVER)
+            render(lcr)
+            surface.flush()
+            self.layers[name] = (key, surface)
+            self.rendered += 1
+        else:
+            surface = entry[1]
+            self.reused += 1
+        cr.set_source_surface(surface, 0, 0)
+        cr.paint()
+
+    def retain(self, names: Iterable[str]):
+        """drop layers not drawn in current frame (ring switched off)"""
+        keep = set(names)
+        for name in [n for n in self.layers if n not in keep]:
+            del self.layers[name]
+
+    def clear(self):
+        self.layers.clear()
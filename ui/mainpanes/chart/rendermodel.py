@@ -0,0 +1,169 @@
+# ui/mainpanes/chart/rendermodel.py
+# ruff: noqa: E402
+# derived chart data (retro, lots, eclipses, lunation, varga) : computed on
+# calculation worker when inputs change, draw() only reads cached results
+import gi
+
+gi.require_version("Gtk", "4.0")
+from gi.repository import Gtk  # type: ignore
+from typing import Callable, Dict, Optional
+from sweph.calculations.retro import calculate_retro
+from sweph.calculations.lots import calculate_lots
+from sweph.calculations.eclipses import calculate_eclipses
+from sweph.calculations.lunation import calculate_lunation
+from sweph.calculations.varga import calculate_varga
+
+
+def _division(app) -> Optional[int]:
+    try:
+        return int(app.chart_settings.get("harmonic ring", "").strip())
+    except (ValueError, AttributeError):
+        return None
+
+
+def _e2_ring(app, ring: str) -> bool:
+    return bool(getattr(app, "e2_active", False) and app.chart_settings.get(ring))
+
+
+# dataset : (source event, calculation, is needed by chart, invalidating signals)
+DATASETS = {
+    "retro e1": (
+        "e1",
+        lambda app: calculate_retro("e1"),
+        lambda app: True,
+        ("positions_changed",),
+    ),
+    "lots e1": (
+        "e1",
+        lambda app: calculate_lots("e1"),
+        lambda app: True,
+        ("positions_changed", "houses_changed"),
+    ),
+    "eclipses e1": (
+        "e1",
+        lambda app: calculate_eclipses("e1"),
+        lambda app: True,
+        ("event_changed", "settings_changed"),
+    ),
+    "lunation e1": (
+        "e1",
+        lambda app: calculate_lunation("e1"),
+        lambda app: True,
+        ("event_changed", "settings_changed"),
+    ),
+    "retro e2": (
+        "e2",
+        lambda app: calculate_retro("e2"),
+        lambda app: _e2_ring(app, "transit"),
+        ("positions_changed",),
+    ),
+    "retro p2": (
+        "p2",
+        lambda app: calculate_retro("p2"),
+        lambda app: _e2_ring(app, "p2 progress"),
+        ("p2_changed",),
+    ),
+    "retro p3": (
+        "p3",
+        lambda app: calculate_retro("p3"),
+        lambda app: _e2_ring(app, "p3 progress"),
+        ("p3_changed",),
+    ),
+    "varga e1": (
+        "e1",
+        lambda app: calculate_varga("e1", _division(app)),
+        lambda app: bool(_division(app)),
+        ("positions_changed", "houses_changed"),
+    ),
+    "varga e2": (
+        "e2",
+        lambda app: calculate_varga("e2", _division(app)),
+        lambda app: _e2_ring(app, "varga") and bool(_division(app)),
+        ("positions_changed", "houses_changed"),
+    ),
+}
+
+
+class ChartModel:
+    """cache of derived chart datasets, keyed on their inputs"""
+
+    def __init__(self, on_update: Callable[[], None]):
+        self.app = Gtk.Application.get_default()
+        self.on_update = on_update
+        self.data: Dict[str, object] = {}
+        self.keys: Dict[str, tuple] = {}
+        signal = self.app.signal_manager
+        signals = {s for ds in DATASETS.values() for s in ds[3]}
+        signals |= {"settings_changed", "e2_cleared"}
+        for name in sorted(signals):
+            signal._connect(name, self._make_handler(name))
+
+    def get(self, name: str):
+        return self.data.get(name)
+
+    def _make_handler(self, signal_name):
+        def handler(*args):
+            self.invalidate(signal_name)
+
+        return handler
+
+    def invalidate(self, signal_name: str):
+        """recompute datasets whose inputs changed"""
+        if signal_name in ("settings_changed", "e2_cleared"):
+            # positions etc are recalculated next : refresh on their signals
+            self.keys.clear()
+        if signal_name == "e2_cleared":
+            for name, ds in DATASETS.items():
+                if ds[0] != "e1":
+                    self.data.pop(name, None)
+        for name, (event, calc, needed, signals) in DATASETS.items():
+            if signal_name not in signals:
+                continue
+            key = self._inputs_key(event) if needed(self.app) else None
+            if key is None:
+                self.data.pop(name, None)
+                self.keys.pop(name, None)
+                continue
+            if self.keys.get(name) == key:
+                continue
+            self.keys[name] = key
+            self.app.executor.submit(
+                f"chart {name}", calc, (self.app,), self._make_done(name)
+            )
+
+    def _make_done(self, name):
+        def done(result):
+            self.data[name] = result
+            self.on_update()
+
+        return done
+
+    def _inputs_key(self, event: str) -> Optional[tuple]:
+        """everything a dataset depends on, none if source data is missing"""
+        app = self.app
+        if event == "p2":
+            pos = getattr(app, "p2_pos", None) or []
+            jd = next((d["p2jdut"] for d in pos if "p2jdut" in d), None)
+            sweph = getattr(app, "e2_sweph", {}) or {}
+        elif event == "p3":
+            pos = getattr(app, "p3_pos", None) or []
+            jd = next((d["p3jdut"] for d in pos if "p3jdut" in d), None)
+            sweph = getattr(app, "e2_sweph", {}) or {}
+        else:
+            sweph = getattr(app, f"{event}_sweph", {}) or {}
+            jd = sweph.get("jd_ut")
+        if jd is None:
+            return None
+        ev = "e1" if event == "e1" else "e2"
+        return (
+            jd,
+            sweph.get("lat"),
+            sweph.get("lon"),
+            sweph.get("alt"),
+            getattr(app, "sweph_flag", None),
+            getattr(app, "selected_house_sys", None),
+            tuple(sorted(getattr(app, f"selected_objects_{ev}", None) or ())),
+            tuple(sorted(getattr(app, f"selected_lots_{ev}", None) or ())),
+            tuple(sorted(getattr(app, f"selected_prenatal_{ev}", None) or ())),
+            tuple(sorted((k, str(v)) for k, v in app.chart_settings.items())),
+        )
@@ -1,7 +1,6 @@
 # ui/mainpanes/chart/rings.py : by copilot = v2
 # ui/fonts/victor/victormonolightastro.ttf
 # ruff: noqa: E402
-import cairo
 import gi
 
 gi.require_version("Gtk", "4.0")
@@ -15,7 +14,14 @@ from ui.fonts.glyphs import (
     get_lunation_glyph,
 )
 from sweph.constants import TERMS
-from ui.mainpanes.chart.astroobject import AstroObject
+from ui.mainpanes.chart.astroobject import AstroObject, objects_for
+from ui.mainpanes.chart.labellayout import gap_for, spread
+from ui.mainpanes.chart.glyphcache import (
+    font_face,
+    show_centered,
+    show_text,
+    text_extents,
+)
 
 
 class RingBase:
@@ -41,6 +47,17 @@ class RingBase:
         outer_ring = self.get_outer_ring(self.radius_dict)
         return 0.03 * outer_ring
 
+    def draw_leader(self, cr, lon, x, y):
+        """thin line from true longitude on ring border to moved object"""
+        angle = pi - radians(lon)
+        cr.move_to(
+            self.cx + self.radius * cos(angle), self.cy + self.radius * sin(angle)
+        )
+        cr.line_to(x, y)
+        cr.set_source_rgba(1, 1, 1, 0.3)
+        cr.set_line_width(0.5)
+        cr.stroke()
+
     def draw_triangle(self, cr, size):
         cr.move_to(0, size)
         cr.line_to(size, -size / 2)
@@ -64,23 +81,22 @@ class RingBase:
         shape_func(cr, size)
         cr.restore()
 
+    # font size of last set_custom_font(), used by cached text drawing
+    text_size = 16
+
     def set_custom_font(self, cr, font_size=16):
-        cr.select_font_face(
-            "VictorMonoLightAstro",
-            cairo.FONT_SLANT_NORMAL,
-            cairo.FONT_WEIGHT_NORMAL,
-        )
+        # font face is created once
+        cr.set_font_face(font_face())
         cr.set_font_size(font_size)
+        self.text_size = font_size
 
     def draw_rotated_text(self, cr, text, x, y, angle, color=(1, 1, 1, 1)):
-        _, _, tw, th, _, _ = cr.text_extents(text)
+        _, _, tw, th, _, _ = text_extents(text, self.text_size)
         cr.save()
         cr.translate(x, y)
         cr.rotate(angle + pi / 2)
-        cr.move_to(-tw / 2, th / 2)
         cr.set_source_rgba(*color)
-        cr.show_text(text)
-        cr.new_path()
+        show_text(cr, text, self.text_size, -tw / 2, th / 2)
         cr.restore()
 
 
@@ -118,17 +134,24 @@ class ObjectRingBase(RingBase):
         for guest in guests:
             name = guest.data.get("name", "")
             guest_by_name[name] = guest
+        drawn = [
+            (name, guest_by_name[name])
+            for name in self.draw_order
+            if name in guest_by_name
+            and guest_by_name[name].data.get("name") not in ("p3date", "p3jdut")
+        ]
+        # spread crowded objects (stellium) apart along ring
+        lons = [guest.data.get("lon") for _, guest in drawn]
+        scale = max((guest.scale for _, guest in drawn), default=1.0)
+        size = 2 * AstroObject.size * obj_scale * scale
+        placed = spread(lons, gap_for(size, mid_ring))
         # draw objects in order
-        for name in self.draw_order:
-            # for guest in guests:
-            guest = guest_by_name.get(name)
-            if not guest:
-                continue
-            if guest.data.get("name") in ("p3date", "p3jdut"):
-                continue
-            angle = pi - radians(guest.data.get("lon"))
+        for (name, guest), lon, lon_placed in zip(drawn, lons, placed):
+            angle = pi - radians(lon_placed)
             x = self.cx + mid_ring * cos(angle)
             y = self.cy + mid_ring * sin(angle)
+            if abs(lon_placed - lon) % 360.0 > 1e-6:
+                self.draw_leader(cr, lon, x, y)
             # true asc marker
             if name == "tas":
                 self.draw_marker(
@@ -174,7 +197,9 @@ class ObjectRingBase(RingBase):
                     self.draw_diamond,
                 )
             else:
-                guest.draw(cr, self.cx, self.cy, mid_ring, obj_scale)
+                guest.draw(
+                    cr, self.cx, self.cy, mid_ring, obj_scale, lon=lon_placed
+                )
 
     # override in subclasses for custom colors
     def marker_color(self, name):
@@ -257,11 +282,8 @@ class Info(RingBase):
         # calculate start y to roughly center text block
         y = self.cy - total_height / 2
         for line in lines:
-            _, _, tw, _, _, _ = cr.text_extents(line)
-            x = self.cx - tw / 2
-            cr.move_to(x, y)
-            cr.show_text(line)
-            cr.new_path()  # clear drawn path
+            _, _, tw, _, _, _ = text_extents(line, self.text_size)
+            show_text(cr, line, self.text_size, self.cx - tw / 2, y)
             y += line_spacing
 
 
@@ -293,21 +315,40 @@ class Event(RingBase):
         self.event_r = radius_dict.get("event", "")
         self.info_r = radius_dict.get("info", "")
         self.mid_ring = (self.event_r + self.info_r) / 2
+        # glyph font size : star marker font of signs ring
+        self.glyph_size = int(radius_dict.get("signs", 0.0) * 0.07) * 1.2
         # todo inject retro onto chart
         self.retro = retro
-        self.lots = [AstroObject(lot) for lot in (lots or []) if isinstance(lot, dict)]
+        self.lots = objects_for(
+            "lots", [lot for lot in (lots or []) if isinstance(lot, dict)]
+        )
         # print(f"rings : lots : {lots}")
-        self.eclipses = [
-            AstroObject(eclipse)
-            for eclipse in (eclipses or [])
-            if isinstance(eclipse, dict)
-        ]
-        self.lunation = [
-            AstroObject(lun) for lun in (lunation or []) if isinstance(lun, dict)
-        ]
+        self.eclipses = objects_for(
+            "eclipses", [ecl for ecl in (eclipses or []) if isinstance(ecl, dict)]
+        )
+        self.lunation = objects_for(
+            "lunation", [lun for lun in (lunation or []) if isinstance(lun, dict)]
+        )
         if not self.guests or not self.cusps or not self.ascmc:
             return
 
+    def is_rotated(self) -> bool:
+        return bool(self.chart_settings.get("fixed asc", False) and self.ascmc)
+
+    def draw_glyph(self, cr, glyph, x, y, color=(0, 0, 0, 1), size=None):
+        """glyph centred on x, y from cached outline, kept upright (horizontal)
+        when chart is rotated by fixed asc"""
+        size = size or self.text_size
+        cr.set_source_rgba(*color)
+        if self.is_rotated():
+            cr.save()
+            cr.translate(x, y)
+            cr.rotate(-radians(self.ascmc[0]))
+            show_centered(cr, glyph, size, 0, 0)
+            cr.restore()
+        else:
+            show_centered(cr, glyph, size, x, y)
+
     def draw(self, cr):
         # main circle of event 1
         cr.arc(self.cx, self.cy, self.radius, 0, 2 * pi)
@@ -391,9 +432,20 @@ class Event(RingBase):
                 (0, 0, 0, 0.7),
                 self.draw_diamond,
             )
+        # glyph font as left by signs ring (star markers) on shared context
+        self.set_custom_font(cr, self.glyph_size)
         # guests with adjusted radius based on latitude
         use_mean_node = self.chart_settings.get("mean node", False)
-        for guest in self.guests:
+        enable_glyphs = self.chart_settings.get("enable glyphs", True)
+        # spread crowded objects (stellium) apart along ring : objects & their
+        # glyphs keep min gap at middle circle
+        lons = [guest.data.get("lon", 0) for guest in self.guests]
+        scale = max((guest.scale for guest in self.guests), default=1.0)
+        size = 2 * AstroObject.size * self.font_size * scale
+        if enable_glyphs:
+            size = max(size, self.text_size)
+        placed = spread(lons, gap_for(size, self.mid_ring))
+        for guest, lon, lon_placed in zip(self.guests, lons, placed):
             # print(f"guest : {guest.data}\n")
             lat = guest.data.get("lat", 0)
             name = guest.data.get("name", "").lower()
@@ -418,36 +470,18 @@ class Event(RingBase):
                     radius = self.mid_ring + (self.event_r - self.mid_ring) * ratio
                 else:
                     radius = self.mid_ring + (self.info_r - self.mid_ring) * (-ratio)
+            angle = pi - radians(lon_placed)
+            x = self.cx + radius * cos(angle)
+            y = self.cy + radius * sin(angle)
+            if abs(lon_placed - lon) % 360.0 > 1e-6:
+                self.draw_leader(cr, lon, x, y)
             # draw guests : astro object
-            guest.draw(cr, self.cx, self.cy, radius, self.font_size)
+            guest.draw(cr, self.cx, self.cy, radius, self.font_size, lon=lon_placed)
             # if 'enable glyphs' > draw glyphs
-            if self.chart_settings.get("enable glyphs", True):
+            if enable_glyphs:
                 glyph = get_glyph(name, use_mean_node)
                 if glyph:
-                    angle = pi - radians(guest.data.get("lon", 0))
-                    x = self.cx + radius * cos(angle)
-                    y = self.cy + radius * sin(angle)
-                    cr.save()
-                    # rotate chart so ascendant is horizon
-                    if self.chart_settings.get("fixed asc", False) and self.ascmc:
-                        cr.translate(x, y)
-                        cr.rotate(-radians(self.ascmc[0]))
-                        te = cr.text_extents(glyph)
-                        tx = -(te.width / 2 + te.x_bearing)
-                        ty = -(te.height / 2 + te.y_bearing)
-                        cr.set_source_rgba(0, 0, 0, 1)
-                        cr.move_to(tx, ty)
-                        cr.show_text(glyph)
-                        cr.new_path()
-                    else:
-                        te = cr.text_extents(glyph)
-                        tx = x - (te.width / 2 + te.x_bearing)
-                        ty = y - (te.height / 2 + te.y_bearing)
-                        cr.set_source_rgba(0, 0, 0, 1)
-                        cr.move_to(tx, ty)
-                        cr.show_text(glyph)
-                        cr.new_path()
-                    cr.restore()
+                    self.draw_glyph(cr, glyph, x, y)
         if self.lots:
             for lot in self.lots:
                 # print(f"rings : lot : {lot.data}")
@@ -472,27 +506,7 @@ class Event(RingBase):
                         angle = pi - radians(lot.data.get("lon", 0))
                         x = self.cx + radius * cos(angle)
                         y = self.cy + radius * sin(angle)
-                        cr.save()
-                        # rotate chart so ascendant is horizon
-                        if self.chart_settings.get("fixed asc", False) and self.ascmc:
-                            cr.translate(x, y)
-                            cr.rotate(-radians(self.ascmc[0]))
-                            te = cr.text_extents(glyph)
-                            tx = -(te.width / 2 + te.x_bearing)
-                            ty = -(te.height / 2 + te.y_bearing)
-                            cr.set_source_rgba(0, 0, 0, 1)
-                            cr.move_to(tx, ty)
-                            cr.show_text(glyph)
-                            cr.new_path()
-                        else:
-                            te = cr.text_extents(glyph)
-                            tx = x - (te.width / 2 + te.x_bearing)
-                            ty = y - (te.height / 2 + te.y_bearing)
-                            cr.set_source_rgba(0, 0, 0, 1)
-                            cr.move_to(tx, ty)
-                            cr.show_text(glyph)
-                            cr.new_path()
-                        cr.restore()
+                        self.draw_glyph(cr, glyph, x, y)
         if self.eclipses:
             for eclipse in self.eclipses:
                 # skip event attribute
@@ -516,27 +530,7 @@ class Event(RingBase):
                         angle = pi - radians(eclipse.data.get("lon", 0))
                         x = self.cx + radius * cos(angle)
                         y = self.cy + radius * sin(angle)
-                        cr.save()
-                        # rotate chart so ascendant is horizon
-                        if self.chart_settings.get("fixed asc", False) and self.ascmc:
-                            cr.translate(x, y)
-                            cr.rotate(-radians(self.ascmc[0]))
-                            te = cr.text_extents(glyph)
-                            tx = -(te.width / 2 + te.x_bearing)
-                            ty = -(te.height / 2 + te.y_bearing)
-                            cr.set_source_rgba(0, 0, 0, 1)
-                            cr.move_to(tx, ty)
-                            cr.show_text(glyph)
-                            cr.new_path()
-                        else:
-                            te = cr.text_extents(glyph)
-                            tx = x - (te.width / 2 + te.x_bearing)
-                            ty = y - (te.height / 2 + te.y_bearing)
-                            cr.set_source_rgba(0, 0, 0, 1)
-                            cr.move_to(tx, ty)
-                            cr.show_text(glyph)
-                            cr.new_path()
-                        cr.restore()
+                        self.draw_glyph(cr, glyph, x, y)
         if self.lunation:
             for lun in self.lunation:
                 # skip event attribute
@@ -558,31 +552,12 @@ class Event(RingBase):
                     glyph = get_lunation_glyph(name)
                     if glyph:
                         angle = pi - radians(lun.data.get("lon", 0))
-                        # print(f"rings : eventdraw : lon : {lun.data.get('lon', 0)}")
                         x = self.cx + radius * cos(angle)
                         y = self.cy + radius * sin(angle)
-                        cr.save()
-                        # rotate chart so ascendant is horizon
-                        if self.chart_settings.get("fixed asc", False) and self.ascmc:
-                            self.set_custom_font(cr, font_size=20)
-                            cr.translate(x, y)
-                            cr.rotate(-radians(self.ascmc[0]))
-                            te = cr.text_extents(glyph)
-                            tx = -(te.width / 2 + te.x_bearing)
-                            ty = -(te.height / 2 + te.y_bearing)
-                            cr.set_source_rgba(0, 0, 0, 0.7)
-                            cr.move_to(tx, ty)
-                            cr.show_text(glyph)
-                            cr.new_path()
+                        if self.is_rotated():
+                            self.draw_glyph(cr, glyph, x, y, (0, 0, 0, 0.7), size=20)
                         else:
-                            te = cr.text_extents(glyph)
-                            tx = x - (te.width / 2 + te.x_bearing)
-                            ty = y - (te.height / 2 + te.y_bearing)
-                            cr.set_source_rgba(0, 0, 0, 1)
-                            cr.move_to(tx, ty)
-                            cr.show_text(glyph)
-                            cr.new_path()
-                        cr.restore()
+                            self.draw_glyph(cr, glyph, x, y)
 
 
 class Signs(RingBase):
@@ -623,8 +598,25 @@ class Signs(RingBase):
             y = self.cy + self.radius * 0.96 * sin(angle)
             self.draw_rotated_text(cr, glyph, x, y, angle)
         self.set_custom_font(cr, self.font_size * 1.2)
-        for name, (lon, _) in self.stars.items():
-            angle = pi - radians(lon)
+        lons = [lon for lon, _ in self.stars.values()]
+        # star markers spread apart, true longitude ticked on outer border
+        width = text_extents("*", self.text_size)[2]
+        placed = spread(lons, gap_for(width * 1.2, self.radius * 0.97))
+        for lon, lon_placed in zip(lons, placed):
+            if abs(lon_placed - lon) % 360.0 > 1e-6:
+                angle = pi - radians(lon)
+                cr.move_to(
+                    self.cx + self.radius * 0.99 * cos(angle),
+                    self.cy + self.radius * 0.99 * sin(angle),
+                )
+                cr.line_to(
+                    self.cx + self.radius * cos(angle),
+                    self.cy + self.radius * sin(angle),
+                )
+                cr.set_source_rgba(1, 0.9, 0.2, 0.7)
+                cr.set_line_width(1)
+                cr.stroke()
+            angle = pi - radians(lon_placed)
             x = self.cx + self.radius * 0.97 * cos(angle)
             y = self.cy + self.radius * 0.97 * sin(angle)
             self.draw_rotated_text(cr, "*", x, y, angle, color=(1, 0.9, 0.2, 1))
@@ -665,16 +657,14 @@ class Naksatras(RingBase):
         for i in range(self.naks_num):
             angle = pi - ((i + 0.5) * seg_angle)
             label = str((self.first_nak + i - 1) % self.naks_num + 1)
-            te = cr.text_extents(label)
+            _, _, tw, th, _, _ = text_extents(label, self.text_size)
             x = self.cx + self.mid_ring * cos(angle)
             y = self.cy + self.mid_ring * sin(angle)
             cr.save()
             cr.translate(x, y)
             cr.rotate(angle + pi / 2)
-            cr.move_to(-te.width / 2, te.height / 2)
-            cr.show_text(label)
+            show_text(cr, label, self.text_size, -tw / 2, th / 2)
             cr.restore()
-            cr.new_path()
 
 
 class Harmonic(RingBase):
@@ -692,9 +682,9 @@ class Harmonic(RingBase):
             self.varga_data = None
             return
         self.event = varga_data[0].get("event") if varga_data else None
-        self.varga_data = [
-            AstroObject(div) for div in (varga_data or []) if isinstance(div, dict)
-        ]
+        self.varga_data = objects_for(
+            "harmonic", [div for div in (varga_data or []) if isinstance(div, dict)]
+        )
         # print(f"rings : divdata : {self.division_data}")
         self.font_size = font_size
         # print(f"harmonic : raddict : {radius_dict}")
@@ -814,9 +804,9 @@ class P1Progress(ObjectRingBase):
         self.app = Gtk.Application.get_default()
         self.notify = self.app.notify_manager
         self.font_size = font_size
-        self.guests = [
-            AstroObject(obj) for obj in (p1_pos or []) if isinstance(obj, dict)
-        ]
+        self.guests = objects_for(
+            "p1 progress", [obj for obj in (p1_pos or []) if isinstance(obj, dict)]
+        )
         keys = list(radius_dict.keys())
         idx = keys.index("p1 progress")
         next_val = (
@@ -857,11 +847,14 @@ class P2Progress(ObjectRingBase):
         self.app = Gtk.Application.get_default()
         self.notify = self.app.notify_manager
         self.font_size = font_size
-        self.guests = [
-            AstroObject(obj)
-            for obj in (p2_pos or [])
-            if (isinstance(obj, dict) and obj.get("name") != "p3date")
-        ]
+        self.guests = objects_for(
+            "p2 progress",
+            [
+                obj
+                for obj in (p2_pos or [])
+                if (isinstance(obj, dict) and obj.get("name") != "p3date")
+            ],
+        )
         keys = list(radius_dict.keys())
         idx = keys.index("p2 progress")
         next_val = (
@@ -905,11 +898,14 @@ class P3Progress(ObjectRingBase):
         self.app = Gtk.Application.get_default()
         self.notify = self.app.notify_manager
         self.font_size = font_size
-        self.guests = [
-            AstroObject(obj)
-            for obj in (p3_pos or [])
-            if (isinstance(obj, dict) and obj.get("name") != "p3date")
-        ]
+        self.guests = objects_for(
+            "p3 progress",
+            [
+                obj
+                for obj in (p3_pos or [])
+                if (isinstance(obj, dict) and obj.get("name") != "p3date")
+            ],
+        )
         keys = list(radius_dict.keys())
         idx = keys.index("p3 progress")
         next_val = (
@@ -954,9 +950,10 @@ class SolarReturn(ObjectRingBase):
         self.notify = self.app.notify_manager
         self.font_size = font_size
         self.cusps = next(x for x in sol_ret_data if not isinstance(x, dict))
-        self.guests = [
-            AstroObject(obj) for obj in (sol_ret_data or []) if isinstance(obj, dict)
-        ]
+        self.guests = objects_for(
+            "solar return",
+            [obj for obj in (sol_ret_data or []) if isinstance(obj, dict)],
+        )
         keys = list(radius_dict.keys())
         idx = keys.index("solar return")
         next_val = (
@@ -1011,9 +1008,10 @@ class LunarReturn(ObjectRingBase):
         self.notify = self.app.notify_manager
         self.font_size = font_size
         self.cusps = next(x for x in lun_ret_data if not isinstance(x, dict))
-        self.guests = [
-            AstroObject(obj) for obj in (lun_ret_data or []) if isinstance(obj, dict)
-        ]
+        self.guests = objects_for(
+            "lunar return",
+            [obj for obj in (lun_ret_data or []) if isinstance(obj, dict)],
+        )
         keys = list(radius_dict.keys())
         idx = keys.index("lunar return")
         next_val = (
@@ -1065,9 +1063,9 @@ class Varga(ObjectRingBase):
         self.app = Gtk.Application.get_default()
         self.notify = self.app.notify_manager
         self.font_size = font_size
-        self.guests = [
-            AstroObject(obj) for obj in (varga_data or []) if isinstance(obj, dict)
-        ]
+        self.guests = objects_for(
+            "varga", [obj for obj in (varga_data or []) if isinstance(obj, dict)]
+        )
         keys = list(radius_dict.keys())
         idx = keys.index("varga")
         next_val = (
@@ -1109,9 +1107,9 @@ class Transit(ObjectRingBase):
         self.notify = self.app.notify_manager
         self.font_size = font_size
         self.cusps = next(x for x in transit_data if not isinstance(x, dict))
-        self.guests = [
-            AstroObject(obj) for obj in (transit_data or []) if isinstance(obj, dict)
-        ]
+        self.guests = objects_for(
+            "transit", [obj for obj in (transit_data or []) if isinstance(obj, dict)]
+        )
         keys = list(radius_dict.keys())
         idx = keys.index("transit")
         next_val = (
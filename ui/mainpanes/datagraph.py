@@ -1,6 +1,7 @@
 # ui/mainpanes/datagraph.py
 # ruff: noqa: E402
 import os
+import threading
 import pandas as pd
 import numpy as np
 import matplotlib
@@ -13,9 +14,39 @@ import matplotlib.pyplot as plt
 import gi
 
 gi.require_version("Gtk", "4.0")
-from gi.repository import Gtk  # type: ignore
-from matplotlib.patches import Rectangle
-from matplotlib.lines import Line2D
+from gi.repository import Gtk, GLib  # type: ignore
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba
+from sweph.calculations.astrofeatures import astro_features, export_features
+from sweph.calculations import stationindex
+from ui.executor import SWE_LOCK
+from ui.mainpanes.timeseries import is_cached, list_instruments, open_series
+
+
+COLOR_UP = np.array(to_rgba("dodgerblue"))
+COLOR_DOWN = np.array(to_rgba("red"))
+
+
+def lod_ohlc(op, hi, lo, cl, columns: int):
+    """ohlc aggregated per pixel column when bars outnumber pixels
+    returns x (bar units, window relative), open, high, low, close & bars per
+    candle ; inputs may be memory-mapped, each value is read once"""
+    n = len(op)
+    step = max(1, int(np.ceil(n / max(1, columns))))
+    if step == 1:
+        x = np.arange(n, dtype=np.float64)
+        return x, np.asarray(op), np.asarray(hi), np.asarray(lo), np.asarray(cl), 1
+    starts = np.arange(0, n, step)
+    ends = np.minimum(starts + step, n)
+    x = (starts + ends - 1) / 2.0
+    return (
+        x,
+        np.asarray(op[starts]),
+        np.maximum.reduceat(hi, starts),
+        np.minimum.reduceat(lo, starts),
+        np.asarray(cl[ends - 1]),
+        step,
+    )
 
 
 class DataGraph(Gtk.Box):
@@ -32,15 +63,25 @@ class DataGraph(Gtk.Box):
         self.append(self.canvas)
         # global datetime attribute to move astro chart
         self.app.selected_dt = None
-        # load & plot data
-        self.full_df = None
+        # load & plot data : memory-mapped series of selected instrument
+        self.series = None
         self.plot_range = [None, None]  # start, end
         self.last_mouse_x = None  # mouse position zoom
-        self.max_bars = 500
+        # no upper limit : large ranges are downsampled per pixel column
+        self.max_bars = None
         self.min_bars = 100
+        self.background = None
+        self.setup_axes()
+        # csv files in data folder, cycled with key 'i'
+        self.instruments = list_instruments(self.app.files.get("data"))
+        self.data_file = "gold/gold_d_990603_250809.csv"
+        # timezone of naive datetimes in data file
+        self.data_tz = "UTC"
+        # shift-click at window edge jumps by this period (any bar size)
+        self.jump_period = pd.Timedelta(days=365)
         self.data_load()
-        self.plot_last_n(200)
         # mouse events
+        self.canvas.mpl_connect("draw_event", self.on_draw)
         self.canvas.mpl_connect("motion_notify_event", self.on_mouse_move)
         self.canvas.mpl_connect("scroll_event", self.on_scroll)
         self.canvas.mpl_connect("button_press_event", self.on_click)
@@ -50,26 +91,105 @@ class DataGraph(Gtk.Box):
         self.canvas.mpl_connect("key_release_event", self.on_key_release)
 
     def data_load(self):
-        """load & plot data"""
+        """open data file : instant from cache, else converted on own thread"""
         # construct file path
         data_folder = self.app.files.get("data")
-        filepath = os.path.join(data_folder, "gold/gold_d_990603_250809.csv")
-        # load csv
-        df = pd.read_csv(
-            filepath,
-            parse_dates=["datetime"],
-            index_col="datetime",
+        filepath = os.path.join(data_folder, self.data_file)
+        if not os.path.exists(filepath):
+            self.notify.warning(
+                f"data file not found : {filepath}",
+                source="datagraph",
+                route=["terminal"],
+            )
+            return
+        if is_cached(filepath):
+            self.data_loaded(self.data_file, open_series(filepath, self.data_file))
+            return
+        self.notify.info(
+            f"converting {self.data_file} to cache ...",
+            source="datagraph",
+            route=["terminal", "user"],
         )
-        self.full_df = df
+
+        def job(data_file=self.data_file):
+            try:
+                series = open_series(filepath, data_file)
+            except (OSError, ValueError) as e:
+                # format now : name e is unbound after except block
+                msg = f"loading {data_file} failed\n\terror :\n\t{e}"
+                GLib.idle_add(self.data_failed, msg)
+                return
+            GLib.idle_add(self.data_loaded, data_file, series)
+
+        threading.Thread(target=job, name="data-load", daemon=True).start()
+
+    def data_loaded(self, data_file, series):
+        # main thread : ignore file no longer selected
+        if data_file == self.data_file:
+            self.series = series
+            self.plot_last_n(200)
+        return False
+
+    def data_failed(self, msg):
+        self.notify.error(msg, source="datagraph", route=["terminal", "user"])
+        return False
+
+    def next_instrument(self):
+        """switch to next csv file in data folder"""
+        if not self.instruments:
+            return
+        try:
+            i = self.instruments.index(self.data_file)
+        except ValueError:
+            i = -1
+        self.data_file = self.instruments[(i + 1) % len(self.instruments)]
+        self.notify.info(
+            f"data : {self.data_file}",
+            source="datagraph",
+            route=["terminal", "user"],
+        )
+        self.data_load()
+
+    def setup_axes(self):
+        """axes design & artists, created once : plot_data() only updates them"""
+        self.figure.patch.set_facecolor("#181818")
+        self.ax.set_facecolor("#181818")
+        # remove spines, ticks, labels
+        for spine in self.ax.spines.values():
+            spine.set_visible(False)
+        self.ax.tick_params(
+            axis="both",
+            which="both",
+            bottom=False,
+            left=False,
+            labelbottom=False,
+            labelleft=False,
+        )
+        # minimal margins
+        self.ax.set_position((0, 0, 1, 1))
+        self.ax.margins(5)
+        self.figure.subplots_adjust(
+            left=0,
+            right=1,
+            top=1,
+            bottom=0,
+        )
+        # candles : all bodies & all wicks as one collection each
+        self.wicks = LineCollection([], linewidths=1, zorder=1)
+        self.bodies = PolyCollection([], linewidths=0.5, zorder=2)
+        self.ax.add_collection(self.wicks)
+        self.ax.add_collection(self.bodies)
+        self.init_cursor()
 
     def init_cursor(self):
-        """info cursor is created after every plot as ax is cleared"""
+        """info cursor : animated, drawn by blitting over cached background"""
         self.info_cursor = self.ax.axvline(
             0,
             color="white",
             lw=0.7,
             ls="--",
             alpha=0.8,
+            animated=True,
         )
         self.cursor_text = self.ax.text(
             0.01,
@@ -81,6 +201,7 @@ class DataGraph(Gtk.Box):
             va="top",
             ha="left",
             zorder=10,
+            animated=True,
             bbox=dict(
                 facecolor="#181818",
                 edgecolor="white",
@@ -91,83 +212,70 @@ class DataGraph(Gtk.Box):
 
     def plot_last_n(self, n):
         """initial number of bars to plot"""
-        df = self.full_df
-        if df is None or len(df) == 0:
+        if self.series is None or len(self.series) == 0:
             return
-        start = max(0, len(df) - n)
-        end = len(df)
+        start = max(0, len(self.series) - n)
+        end = len(self.series)
         self.plot_range = [start, end]
         self.plot_data(start, end)
 
+    def pixel_columns(self) -> int:
+        """axes width in pixels : lod target"""
+        width = int(self.ax.bbox.width)
+        return width if width > 0 else 1000
+
     def plot_data(self, start, end):
-        """data to plot & chart design incl. colors"""
-        df_ = self.full_df
-        if df_ is None or len(df_) == 0:
+        """update candle collections with data range, downsampled to pixels"""
+        series = self.series
+        if series is None or len(series) == 0:
             return
         if start is None or end is None or end <= start:
             return
-        df = df_.iloc[start:end]
-        self.df = df
-        # clear previous axes drawing
-        self.ax.clear()
-        self.figure.patch.set_facecolor("#181818")
-        self.ax.set_facecolor("#181818")
-        # remove spines, ticks, labels
-        for spine in self.ax.spines.values():
-            spine.set_visible(False)
-        self.ax.tick_params(
-            axis="both",
-            which="both",
-            bottom=False,
-            left=False,
-            labelbottom=False,
-            labelleft=False,
+        # only visible window is read from mapped columns
+        x, op, hi, lo, cl, step = lod_ohlc(
+            *(series.column(c, start, end) for c in ("open", "high", "low", "close")),
+            self.pixel_columns(),
         )
-        # minimal margins
-        self.ax.set_position((0, 0, 1, 1))
-        self.ax.margins(5)
-        self.figure.subplots_adjust(
-            left=0,
-            right=1,
-            top=1,
-            bottom=0,
+        width = 0.8 * step
+        up = cl >= op
+        # body : zero-height bars get 0.8 (price units) as before
+        bottom = np.minimum(op, cl)
+        height = np.where(cl != op, np.abs(cl - op), 0.8)
+        left, right = x - width / 2, x + width / 2
+        verts = np.empty((x.size, 4, 2))
+        verts[:, :, 0] = np.stack([left, left, right, right], axis=1)
+        verts[:, :, 1] = np.stack(
+            [bottom, bottom + height, bottom + height, bottom], axis=1
         )
-        # plot candles manually for full color control
-        ohlc = df[["open", "high", "low", "close"]].values
-        x = np.arange(len(ohlc))
-        bars_shown = (self.plot_range[1] or 0) - (self.plot_range[0] or 0)
-        width = max(0.7, 0.8 * (len(ohlc) / bars_shown)) if bars_shown > 0 else 0.7
-        self.candles = []
-        for i in range(len(ohlc)):
-            op, hi, lo, cl = ohlc[i]
-            color = "dodgerblue" if cl >= op else "red"
-            # body
-            rect = Rectangle(
-                (x[i] - width / 2, min(op, cl)),
-                width,
-                abs(cl - op) if cl != op else 0.8,
-                facecolor=color,
-                edgecolor=color,
-                zorder=2,
-            )
-            # wick
-            wick = Line2D(
-                [x[i], x[i]],
-                [lo, hi],
-                color=color,
-                linewidth=1,
-                zorder=1,
-            )
-            self.ax.add_patch(rect)
-            self.ax.add_line(wick)
-            self.candles.append((rect, wick, op, hi, lo, cl))
-        self.ax.set_xlim(-1, len(ohlc))
-        lows = df["low"].min() if not df.empty else 0
-        highs = df["high"].max() if not df.empty else 1
+        segments = np.empty((x.size, 2, 2))
+        segments[:, :, 0] = x[:, None]
+        segments[:, 0, 1] = lo
+        segments[:, 1, 1] = hi
+        colors = np.where(up[:, None], COLOR_UP, COLOR_DOWN)
+        self.bodies.set_verts(verts)
+        self.bodies.set_facecolors(colors)
+        self.bodies.set_edgecolors(colors)
+        self.wicks.set_segments(segments)
+        self.wicks.set_colors(colors)
+        self.ax.set_xlim(-1, end - start)
+        lows = lo.min() if lo.size else 0
+        highs = hi.max() if hi.size else 1
         # fill canvas vertically
         self.ax.set_ylim(lows - (highs - lows) * 0.03, highs + (highs - lows) * 0.03)
-        self.init_cursor()
-        self.canvas.draw()
+        self.canvas.draw_idle()
+
+    def on_draw(self, event):
+        """full redraw done : cache background for cursor blitting"""
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_cursor()
+
+    def draw_cursor(self):
+        if self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.info_cursor)
+        self.ax.draw_artist(self.cursor_text)
+        self.canvas.blit(self.figure.bbox)
 
     def on_mouse_move(self, event):
         """show bar info on mouse-over"""
@@ -175,7 +283,7 @@ class DataGraph(Gtk.Box):
             self.info_cursor.set_visible(False)
             self.cursor_text.set_visible(False)
             self.last_mouse_x = None
-            self.canvas.draw_idle()
+            self.draw_cursor()
             return
         self.info_cursor.set_visible(True)
         self.cursor_text.set_visible(True)
@@ -184,17 +292,101 @@ class DataGraph(Gtk.Box):
         self.info_cursor.set_xdata([event.xdata, event.xdata])
         ix = int(round(event.xdata))
         info = ""
-        if self.df is not None and 0 <= ix < len(self.df):
-            dt_str = self.df.index[ix].strftime("%Y-%m-%d %H:%M")
-            op, hi, lo, cl = self.candles[ix][2:]
+        i = self.bar_index(ix)
+        if i is not None:
+            dt_str = self.series.timestamp(i).strftime("%Y-%m-%d %H:%M")
+            op, hi, lo, cl = (
+                float(self.series.columns[c][i])
+                for c in ("open", "high", "low", "close")
+            )
             info = f"{dt_str}\nh={hi:.2f}\no={op:.2f}\nc={cl:.2f}\nl={lo:.2f}"
         self.cursor_text.set_text(info)
-        self.canvas.draw_idle()
+        self.draw_cursor()
+
+    def bar_index(self, ix):
+        """series row of window bar ix, none outside window"""
+        start, end = self.plot_range
+        if self.series is None or start is None or not 0 <= ix < end - start:
+            return None
+        return start + ix
 
     def on_key_press(self, event):
         # print(f"datagraph : key : {event.key}")
         if event.key == "shift":
             self.shift_held = True
+        elif event.key == "x":
+            self.export_features()
+        elif event.key == "i":
+            self.next_instrument()
+
+    def export_features(self):
+        """astro columns for all bars, written next to data file as parquet"""
+        if self.series is None or not len(self.series):
+            return
+        series = self.series
+        sweph = getattr(self.app, "e1_sweph", None) or {}
+        location = None
+        if sweph.get("lon") is not None and sweph.get("lat") is not None:
+            location = (sweph["lon"], sweph["lat"], sweph.get("alt") or 0.0)
+        # event 1 moon & julian day : running dasa lords per bar
+        natal = None
+        lumies = getattr(self.app, "e1_lumies", None) or {}
+        moon = next(
+            (
+                v
+                for v in lumies.values()
+                if isinstance(v, dict) and v.get("name") == "mo"
+            ),
+            None,
+        )
+        if moon and lumies.get("jd_ut"):
+            natal = (moon.get("lon", 0.0), lumies["jd_ut"])
+        data_folder = self.app.files.get("data")
+        path = os.path.join(
+            data_folder, f"{os.path.splitext(self.data_file)[0]}_astro.parquet"
+        )
+        flag = self.app.sweph_flag
+
+        def job():
+            data = series.frame()
+            features = astro_features(
+                data.index,
+                flag,
+                location,
+                objects=self.app.selected_objects_e1,
+                tz=self.data_tz,
+                use_mean_node=self.app.chart_settings.get("mean node", False),
+                cycle_members=self.app.chart_settings.get("cycle members"),
+                natal=natal,
+                lock=SWE_LOCK,
+            )
+            export_features(data.join(features), path)
+            return features.shape, stationindex.load_index(flag) is None
+
+        def done(result):
+            if result is None:
+                return
+            shape, no_stations = result
+            self.notify.info(
+                f"astro features : {shape[0]} bars x {shape[1]} columns\n\t{path}",
+                source="datagraph",
+                route=["terminal", "user"],
+            )
+            if no_stations:
+                self.notify.warning(
+                    "astro features : station index not built, station columns "
+                    "are empty\n\tbuild it once from terminal :"
+                    "\n\tpython -m sweph.calculations.stationindex",
+                    source="datagraph",
+                    route=["terminal", "user"],
+                )
+
+        self.notify.info(
+            "exporting astro features ...",
+            source="datagraph",
+            route=["terminal", "user"],
+        )
+        self.app.executor.submit("astro features", job, (), done, lane="batch")
 
     def on_key_release(self, event):
         # print(f"datagraph : key : {event.key}")
@@ -204,16 +396,16 @@ class DataGraph(Gtk.Box):
     def on_click(self, event):
         if event.button == 1 and event.inaxes:
             ix = int(round(event.xdata))
-            num = len(self.df)
+            num = self.plot_range[1] - self.plot_range[0]
             threshold = max(2, int(num * 0.1))  # 10 % of window
             # check shift-click
             if getattr(self, "shift_held", False):
                 if ix <= threshold:
                     # print("datagraph : shift-click - jump back")
-                    self.jump_bars(-5800)  # ~ 1 year of hours
+                    self.jump_time(-1)
                 elif ix >= num - 1 - threshold:
                     # print("datagraph : shift-click - jump forward")
-                    self.jump_bars(5800)
+                    self.jump_time(1)
                 else:
                     self.notify.info(
                         "shift-click : not at edge",
@@ -222,36 +414,39 @@ class DataGraph(Gtk.Box):
                     )
             else:
                 # normal click
-                if self.df is not None and 0 <= ix < len(self.df):
-                    dt = self.df.index[ix]
+                i = self.bar_index(ix)
+                if i is not None:
+                    dt = self.series.timestamp(i)
                     self.app.signal_manager._emit("datetime_captured", ("e2", dt))
                     # print(f"datagraph : datetime : {dt}")
 
-    def jump_bars(self, bars):
-        """fast-jump cca 1 year forward or backward in data range"""
+    def jump_time(self, direction):
+        """fast-jump by jump period (1 year) forward or backward in data range"""
         cur_start, cur_end = self.plot_range
-        if self.full_df is not None:
-            df_len = len(self.full_df)
+        if self.series is not None:
+            df_len = len(self.series)
         else:
             return
         if cur_start is None or cur_end is None:
             return
         num = cur_end - cur_start
-        if bars < 0 and cur_start == 0:
+        if direction < 0 and cur_start == 0:
             self.notify.warning(
                 "reached data start",
                 source="datagraph",
                 route=["terminal", "user"],
             )
             return
-        if bars > 0 and cur_end == df_len:
+        if direction > 0 and cur_end == df_len:
             self.notify.warning(
                 "reached data end",
                 source="datagraph",
                 route=["terminal", "user"],
             )
             return
-        new_start = min(max(0, cur_start + bars), df_len - num)
+        # bars in period depend on data bar size : search by time
+        target = self.series.timestamp(cur_start) + direction * self.jump_period
+        new_start = min(max(0, self.series.searchsorted(target)), df_len - num)
         new_end = new_start + num
         if new_end > df_len:
             new_end = df_len
@@ -265,10 +460,11 @@ class DataGraph(Gtk.Box):
         if cur_start is None or cur_end is None or cur_end <= cur_start:
             return
         n = cur_end - cur_start
-        if self.full_df is not None:
-            df_len = len(self.full_df)
+        if self.series is None:
+            return
+        df_len = len(self.series)
         zoom_amount = int(max(10, n * 0.2))
-        min_bars, max_bars = self.min_bars, self.max_bars
+        min_bars, max_bars = self.min_bars, self.max_bars or df_len
         # detect shift for pan
         is_pan = self.shift_held
         if hasattr(event, "key") and event.key == "shift":
@@ -5,12 +5,15 @@ import gi
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk  # type: ignore
 from typing import Tuple
+import numpy as np
 
 from ui.helpers import _decimal_to_sign_dms as decsigndms
 from ui.helpers import _decimal_to_ra as decra
 from user.settings import HOUSE_SYSTEMS
 from sweph.calculations.retro import calculate_retro, retro_marker
-from sweph.calculations.hora import calculate_hora
+from sweph.calculations.aspects import grid_cell
+from sweph.calculations.vimsottari import calculate_vimsottari
+from sweph.calculations.timeline import calculate_timeline, timeline_span
 from sweph.swetime import jd_to_custom_iso as jdtoiso
 from ui.fonts.glyphs import get_glyph
 
@@ -34,6 +37,12 @@ class Tables(Gtk.Notebook):
         # vimsottari fold level
         self.app.current_lvl = 1
         self.current_event = None
+        # station data for progressions : filled by calculation worker
+        self.p2_retro = None
+        self.p3_retro = None
+        # transit timeline : rows streamed by calculation worker
+        self.timeline_gen = 0
+        self.timeline_rows = []
         # formatting symbols : victormonolightastro.ttf
         self.v_sym = "\u01ef"
         self.h_sym = "\u01ee"
@@ -52,6 +61,8 @@ class Tables(Gtk.Notebook):
         signal._connect("p2_changed", self.p2_changed)
         # p3 table
         signal._connect("p3_changed", self.p3_changed)
+        # transit-to-natal aspect timeline
+        signal._connect("timeline_changed", self.timeline_changed)
 
     def event_data_widget(self, event: str, content: str):
         # create a scrollable text view for an event
@@ -162,10 +173,13 @@ class Tables(Gtk.Notebook):
                 hsys_char = None
             ln_csps = ""
             raH, raM, raS = decra(self.armc)
-            horas_data = calculate_hora(event)
-            if horas_data:
+            # calculated with positions on calculation worker
+            horas_data = getattr(self.app, f"{event}_horas", None)
+            weekday = hora_glyph = "-"
+            if horas_data and horas_data.get("horas"):
                 curr_hora = horas_data["current_hora"]
-                hora_glyph = get_glyph(curr_hora, False)
+                if curr_hora:
+                    hora_glyph = get_glyph(curr_hora, False)
                 weekday = horas_data["horas"][0]["weekday"]
             if hsys_char in ["E", "D", "W"]:
                 # print(f"selected_hsys : {self.app.selected_house_sys_str}")
@@ -252,9 +266,17 @@ class Tables(Gtk.Notebook):
 
     def p2_changed(self, event):
         self.p2_pos = getattr(self.app, "p2_pos", None)
-        self.p2_retro = calculate_retro("p2")
+        # station search runs on calculation worker : table first, retro after
+        self.p2_event = event
+        self.app.executor.submit(
+            "retro p2", calculate_retro, ("p2",), self.p2_retro_done
+        )
         self.update_p2(event)
 
+    def p2_retro_done(self, retro):
+        self.p2_retro = retro
+        self.update_p2(self.p2_event)
+
     def update_p2(self, event):
         p2_pos = getattr(self, "p2_pos", None)
         msg = ""
@@ -367,9 +389,17 @@ class Tables(Gtk.Notebook):
     # ----
     def p3_changed(self, event):
         self.p3_pos = getattr(self.app, "p3_pos", None)
-        self.p3_retro = calculate_retro("p3")
+        # station search runs on calculation worker : table first, retro after
+        self.p3_event = event
+        self.app.executor.submit(
+            "retro p3", calculate_retro, ("p3",), self.p3_retro_done
+        )
         self.update_p3(event)
 
+    def p3_retro_done(self, retro):
+        self.p3_retro = retro
+        self.update_p3(self.p3_event)
+
     def update_p3(self, event):
         p3_pos = getattr(self, "p3_pos", None)
         msg = ""
@@ -496,7 +526,7 @@ class Tables(Gtk.Notebook):
         obj_names = aspects["obj names"]
         speeds = aspects["speeds"]
         name2idx = {n: i for i, n in enumerate(aspects["obj names"])}
-        matrix = aspects["aspects"]
+        grid = aspects["grid"]
         # title line
         text = f" aspects {self.h_sym * 56}\n"
         # header row
@@ -516,7 +546,7 @@ class Tables(Gtk.Notebook):
             # text += f" {row_name:>2} {v_}"
             for col_name in obj_names:
                 j = name2idx[col_name]
-                cell = matrix[i][j]
+                cell = grid_cell(grid, i, j)
                 if i == j:
                     text += f"{self.vic_spc}**** {self.v_sym}"
                 elif i < j:
@@ -537,6 +567,20 @@ class Tables(Gtk.Notebook):
             text += "\n"
         # horizontal line at end
         text += self.h_line
+        # synastry : event 1 objects against e2 / p2 / transit objects
+        for key, data in aspects.get("cross", {}).items():
+            cross_grid = data["grid"]
+            names2 = data["obj names"]
+            rows = []
+            for i, j in zip(*np.nonzero(cross_grid["aspect"] >= 0)):
+                cell = grid_cell(cross_grid, i, j)
+                a_s = "a" if cell["applying"] else "s"
+                rows.append(
+                    f" {obj_names[i]} {cell['glyph']} {names2[j]:<3} "
+                    f"{cell['orb']:.1f} {a_s}"
+                )
+            if rows:
+                text += f" e1 x {key} {self.h_sym * 10}\n" + "\n".join(rows) + "\n"
         self.notify.debug(
             f"updateaspects : {text}",
             source="tables",
@@ -660,30 +704,61 @@ class Tables(Gtk.Notebook):
             # print("vimsottari_widget : creating new page")
             self.vimsottari_widget(event, content)
 
+    def show_timeline(self):
+        """search transit-to-natal aspects from event 2 (or 1) onwards"""
+        sweph = getattr(self.app, "e2_sweph", None) or {}
+        start = sweph.get("jd_ut")
+        if start is None:
+            start = (getattr(self.app, "e1_sweph", None) or {}).get("jd_ut")
+        if start is None:
+            self.notify.warning(
+                "timeline : missing event data\n\texiting ...",
+                source="tables",
+                route=["terminal", "user"],
+            )
+            return
+        # new search supersedes running one
+        self.timeline_gen += 1
+        gen = self.timeline_gen
+        self.timeline_rows = []
+        self.update_vimsottari("timeline", "searching ...")
+        self.app.executor.submit(
+            "timeline",
+            calculate_timeline,
+            (start, start + timeline_span(), gen, lambda: self.timeline_gen == gen),
+            lane="batch",
+        )
+
+    def timeline_changed(self, generation, events, done):
+        if generation != self.timeline_gen:
+            return
+        for e in events:
+            self.timeline_rows.append(
+                (
+                    e["jd"],
+                    f"{jdtoiso(e['jd'])} {e['transit']:<3} {e['glyph']} "
+                    f"{e['natal']:<3} {e['kind']}",
+                )
+            )
+        self.timeline_rows.sort(key=lambda r: r[0])
+        content = "\n".join(r[1] for r in self.timeline_rows)
+        if not done:
+            content += "\n\nsearching ..."
+        elif not self.timeline_rows:
+            content = "no aspects found"
+        self.update_vimsottari("timeline", content)
+
     # def toggle_vimso(self, gesture=None, n_press=0, x=0, y=0):
     def toggle_vimso(self):
         # cycle toggle level: 1->2->3->4->5->1
         event = "e1"  # self.current_event
         # print(f"toggle_vimso  {event} called")
-        if self.app.current_lvl == 1:
-            self.app.current_lvl = 2
-        elif self.app.current_lvl == 2:
-            self.app.current_lvl = 3
-        elif self.app.current_lvl == 3:
-            self.app.current_lvl = 4
-        elif self.app.current_lvl == 4:
-            self.app.current_lvl = 5
-        else:
-            self.app.current_lvl = 1
+        self.app.current_lvl = self.app.current_lvl % 5 + 1
         # print(f"current_lvl : {self.app.current_lvl}")
-        # update vimsottari for new level
+        # dasa tree is cached : re-render table for new level directly, no
+        # positions recalculation
         if event and event in self.events_data:
-            # emit signal to force recalculation
-            self.app.signal_manager._emit(
-                "luminaries_changed",
-                event,
-                # "luminaries_changed", "vimsottari", self.app.last_luminaries
-            )
+            calculate_vimsottari(event)
 
     def which_house(self, lon: float, cusps: Tuple[float, ...]) -> str:
         # determine which house a celestial longitude falls in
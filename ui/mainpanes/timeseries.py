@@ -0,0 +1,214 @@
+# ui/mainpanes/timeseries.py
+# ruff: noqa: E402
+# time-series data layer for datagraph : csv is converted once, in chunks, to
+# columnar cache (one raw memory-mapped file per column + meta.json) in
+# .cache folder next to it ; later opens are instant & only pages of visible
+# window are ever read from disk
+# convert from terminal : python -m ui.mainpanes.timeseries file.csv [...]
+import json
+import os
+import shutil
+import sys
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Optional
+
+CACHE_FOLDER = ".cache"
+CACHE_VERSION = 1
+TIME_COLUMN = "datetime"
+# csv rows parsed per chunk while converting
+CHUNK_ROWS = 1_000_000
+
+
+def list_instruments(data_folder: str) -> List[str]:
+    """csv files in data folder (recursive), relative paths, sorted"""
+    found = []
+    for root, dirs, files in os.walk(data_folder):
+        dirs[:] = [d for d in dirs if d != CACHE_FOLDER]
+        for name in files:
+            if name.lower().endswith(".csv"):
+                found.append(os.path.relpath(os.path.join(root, name), data_folder))
+    return sorted(found)
+
+
+def cache_dir(csv_path: str) -> str:
+    folder, name = os.path.split(os.path.abspath(csv_path))
+    return os.path.join(folder, CACHE_FOLDER, os.path.splitext(name)[0])
+
+
+def _source_stamp(csv_path: str) -> Dict[str, int]:
+    st = os.stat(csv_path)
+    return {"size": st.st_size, "mtime": st.st_mtime_ns}
+
+
+def _read_meta(path: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_cached(csv_path: str) -> bool:
+    """cache exists & matches csv file (size & modification time)"""
+    meta = _read_meta(cache_dir(csv_path))
+    return bool(
+        meta
+        and meta.get("version") == CACHE_VERSION
+        and meta.get("source") == _source_stamp(csv_path)
+    )
+
+
+def _time_format(sample: str) -> Optional[str]:
+    try:
+        from pandas.tseries.api import guess_datetime_format
+
+        return guess_datetime_format(sample.strip())
+    except ImportError:
+        return None
+
+
+def convert(
+    csv_path: str,
+    chunk_rows: int = CHUNK_ROWS,
+    progress: Optional[Callable[[int], None]] = None,
+) -> str:
+    """csv > columnar cache, chunk by chunk (constant memory), return cache dir"""
+    target = cache_dir(csv_path)
+    folder, name = os.path.split(target)
+    os.makedirs(folder, exist_ok=True)
+    # own temp dir per conversion : concurrent ones of same file do not clash
+    tmp = tempfile.mkdtemp(prefix=f"{name}.", suffix=".tmp", dir=folder)
+    try:
+        _write_columns(csv_path, tmp, chunk_rows, progress)
+        shutil.rmtree(target, ignore_errors=True)
+        try:
+            os.replace(tmp, target)
+        except OSError:
+            # other conversion finished first : its cache is as good
+            if not is_cached(csv_path):
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return target
+
+
+def _write_columns(
+    csv_path: str,
+    tmp: str,
+    chunk_rows: int,
+    progress: Optional[Callable[[int], None]],
+):
+    """time & numeric columns as raw binary files + meta.json into tmp"""
+    files = {}
+    columns: List[str] = []
+    fmt = None
+    rows = 0
+    last = None
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+            chunk.columns = [str(c).strip().lower() for c in chunk.columns]
+            if not files:
+                if TIME_COLUMN not in chunk.columns:
+                    raise ValueError(f"missing '{TIME_COLUMN}' column : {csv_path}")
+                columns = [
+                    c
+                    for c in chunk.columns
+                    if c != TIME_COLUMN and pd.api.types.is_numeric_dtype(chunk[c])
+                ]
+                if len(chunk):
+                    fmt = _time_format(str(chunk[TIME_COLUMN].iloc[0]))
+                for name in [TIME_COLUMN] + columns:
+                    files[name] = open(os.path.join(tmp, f"{name}.bin"), "wb")
+            times = pd.to_datetime(chunk[TIME_COLUMN], format=fmt)
+            ns = times.to_numpy(dtype="datetime64[ns]").view(np.int64)
+            if ns.size:
+                if (last is not None and ns[0] < last) or np.any(np.diff(ns) < 0):
+                    raise ValueError(f"rows not sorted by {TIME_COLUMN} : {csv_path}")
+                last = ns[-1]
+            ns.tofile(files[TIME_COLUMN])
+            for name in columns:
+                chunk[name].to_numpy(dtype=np.float64).tofile(files[name])
+            rows += len(chunk)
+            if progress:
+                progress(rows)
+    finally:
+        for f in files.values():
+            f.close()
+    meta = {
+        "version": CACHE_VERSION,
+        "source": _source_stamp(csv_path),
+        "rows": rows,
+        "columns": columns,
+    }
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+class TimeSeries:
+    """memory-mapped columns of one instrument, sorted by time"""
+
+    def __init__(self, path: str, meta: dict, name: str = ""):
+        self.path = path
+        self.name = name
+        self.rows = int(meta["rows"])
+        self.columns: Dict[str, np.ndarray] = {}
+        self.times = self._map(TIME_COLUMN, np.int64)
+        for column in meta["columns"]:
+            self.columns[column] = self._map(column, np.float64)
+
+    def _map(self, name: str, dtype) -> np.ndarray:
+        if not self.rows:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(
+            os.path.join(self.path, f"{name}.bin"),
+            dtype=dtype,
+            mode="r",
+            shape=(self.rows,),
+        )
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str, start: int, end: int) -> np.ndarray:
+        """view into mapped column : nothing is read until values are used"""
+        return self.columns[name][start:end]
+
+    def index(self, start: int, end: int) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(
+            np.asarray(self.times[start:end]).view("datetime64[ns]"),
+            name=TIME_COLUMN,
+        )
+
+    def frame(self, start: int = 0, end: Optional[int] = None) -> pd.DataFrame:
+        """rows start : end as dataframe (copied into memory)"""
+        end = self.rows if end is None else end
+        return pd.DataFrame(
+            {c: np.asarray(v[start:end]) for c, v in self.columns.items()},
+            index=self.index(start, end),
+        )
+
+    def timestamp(self, i: int) -> pd.Timestamp:
+        return pd.Timestamp(int(self.times[i]))
+
+    def searchsorted(self, ts: pd.Timestamp) -> int:
+        """first row at or after ts (binary search touches few pages)"""
+        return int(np.searchsorted(self.times, pd.Timestamp(ts).value))
+
+
+def open_series(csv_path: str, name: str = "") -> TimeSeries:
+    """open cached series, converting csv first if cache is missing / stale"""
+    if not is_cached(csv_path):
+        convert(csv_path)
+    path = cache_dir(csv_path)
+    return TimeSeries(path, _read_meta(path), name or os.path.basename(csv_path))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage : timeseries file.csv [file.csv ...]")
+    for src in sys.argv[1:]:
+        print(f"converting {src} ...")
+        out = convert(src, progress=lambda n: print(f"\t{n} rows", end="\r"))
+        print(f"\n\t{len(open_series(src))} rows : {out}")
@@ -111,6 +111,10 @@ class MainWindow(
         self.hotkeys.register_hotkey("Down", self.obc_arrow_dn)
         self.hotkeys.register_hotkey("Left", self.obc_arrow_l)
         self.hotkeys.register_hotkey("Right", self.obc_arrow_r)
+        # transit-to-natal aspect timeline
+        self.hotkeys.register_hotkey("l", lambda: self.tables.show_timeline())
+        # play / stop change time
+        self.hotkeys.register_hotkey("k", self.obc_time_run)
         # call helper function for time now
         self.hotkeys.register_hotkey("n", lambda: self.on_time_now())
         # toggle selected event
@@ -193,6 +197,8 @@ class MainWindow(
             "\n\tfor selected event"
             "\nn : set time now for selected event location"
             "\n\t(your computer > utc > event location time)"
+            "\nk : play / stop change time for selected event (arrows : direction)"
+            "\nl : list transit aspects to event 1 from event 2 (span in settings)"
             "\ntab/shift+tab : navigate between widgets in side pane"
             "\nspace/enter : activate button / dropdown when focused"
             "\nshift+1/2/3/4 : show single / double / triple / all panes"
@@ -113,6 +113,7 @@ comment (add '# ' & save file) uninterested country"""
             ent_city.set_text(default)
     ent_city.set_tooltip_text(
         """enter city name
+suggestions appear while typing : click one to accept it
 if more than 1 city (within selected country) is found
 user needs to select the one of interest
 
@@ -124,6 +125,7 @@ user needs to select the one of interest
         lambda entry, country: event_location.get_selected_city(entry, country),
         ddn_country,
     )
+    event_location.attach_completion(ent_city, ddn_country)
     # store as widget so we access fresh data later
     if event_name == "e1":
         manager.city_one = ent_city
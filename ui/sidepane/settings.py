@@ -23,6 +23,8 @@ from user.settings import (
     CUSTOM_AYANAMSA,
     FILES,
 )
+from sweph import ephestore
+from ui.executor import SWE_LOCK
 
 
 def setup_settings(manager) -> CollapsePanel:
@@ -1392,14 +1394,18 @@ def set_ayanamsa(manager):
     if "sidereal zodiac" not in manager.app.selected_flags:
         return
     ayanamsa = manager.app.selected_ayanamsa
-    # custom ayanamsa
-    if ayanamsa == 255:
-        swe.set_sid_mode(
-            ayanamsa, manager.app.custom_julian_day, manager.app.custom_ayan
-        )
-    # one of predefined ayanamsas
-    else:
-        swe.set_sid_mode(ayanamsa)
+    # global sweph state : wait for running calculation job, so it does not
+    # mix old & new ayanamsa
+    with SWE_LOCK:
+        ephestore.set_sid_mode(ayanamsa)
+        # custom ayanamsa
+        if ayanamsa == 255:
+            swe.set_sid_mode(
+                ayanamsa, manager.app.custom_julian_day, manager.app.custom_ayan
+            )
+        # one of predefined ayanamsas
+        else:
+            swe.set_sid_mode(ayanamsa)
     manager.notify.debug(
         f"set ayanamsa : {ayanamsa}"
         + (
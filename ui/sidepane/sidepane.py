@@ -13,6 +13,7 @@ from sweph.swetime import custom_iso_to_jd, jd_to_custom_iso
 from .events import setup_event
 from .tools import setup_tools
 from .settings import setup_settings
+from .timeplayer import TimePlayer
 
 
 class SidepaneManager:
@@ -30,6 +31,8 @@ class SidepaneManager:
         "arrow_l": "move time backward (hk : arrow left)",
         "arrow_r": "move time forward (hk : arrow right)",
         "time_now": "time now (hk : n)\nset time now for selected event",
+        "time_run": "play / stop (hk : k)\nmove selected event time by selected"
+        " period at target frame rate\narrow left / right : play direction",
         "arrow_up": "select previous time period (hk : arrow up)",
         "arrow_dn": "select next time period (hk : arrow down)",
     }
@@ -63,6 +66,8 @@ class SidepaneManager:
         self.clp_event_two = None
         self.clp_tools = None
         self.clp_settings = None
+        # play mode for change time
+        self.time_player = TimePlayer(self)
 
     def setup_side_pane(self):
         # main box for widgets
@@ -284,12 +289,18 @@ or ie panes have been manually resized (click any text to focus sidepane)"""
         self, widget: Optional[Gtk.Widget] = None, data: Optional[str] = None
     ):
         """move selected event time backward"""
+        if self.time_player.playing:
+            self.time_player.direction = -1
+            return
         self.change_event_time(-float(self.CHANGE_TIME_SELECTED))
 
     def obc_arrow_r(
         self, widget: Optional[Gtk.Widget] = None, data: Optional[str] = None
     ):
         """move selected event time forward"""
+        if self.time_player.playing:
+            self.time_player.direction = 1
+            return
         self.change_event_time(float(self.CHANGE_TIME_SELECTED))
 
     def obc_time_now(
@@ -299,6 +310,12 @@ or ie panes have been manually resized (click any text to focus sidepane)"""
         # obc_time_now needed because button created dynamically
         self.on_time_now()
 
+    def obc_time_run(
+        self, widget: Optional[Gtk.Widget] = None, data: Optional[str] = None
+    ):
+        """play / stop change time for selected event"""
+        self.time_player.toggle()
+
     def obc_arrow_up(
         self, widget: Optional[Gtk.Widget] = None, data: Optional[str] = None
     ):
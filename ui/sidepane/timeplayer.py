@@ -0,0 +1,110 @@
+# ui/sidepane/timeplayer.py
+# ruff: noqa: E402
+# play mode for change time : selected event advances by selected period at
+# target frame rate ; julian day goes straight to event data & calculation
+# graph (no entry text round-trip), frames are dropped while previous frame
+# is still calculated, achieved fps is shown in main title
+import time
+import gi
+
+gi.require_version("Gtk", "4.0")
+from gi.repository import GLib  # type: ignore
+from ui.helpers import _update_main_title
+from user.settings import TIME_PLAY
+
+
+class TimePlayer:
+    """advance event time by change time period on every frame"""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.app = manager.app
+        self.notify = manager.notify
+        self.timer_id = None
+        self.event_data = None
+        self.jd = 0.0
+        self.direction = 1
+        # fps measurement window
+        self.frames = 0
+        self.dropped = 0
+        self.window_start = 0.0
+
+    @property
+    def playing(self) -> bool:
+        return self.timer_id is not None
+
+    def toggle(self):
+        if self.playing:
+            self.stop()
+        else:
+            self.start()
+
+    def start(self, direction: int = 1):
+        """start playing selected event"""
+        event = self.app.selected_event
+        data = self.app.EVENT_ONE if event == "e1" else self.app.EVENT_TWO
+        sweph = self.app.e1_sweph if event == "e1" else self.app.e2_sweph
+        if data is None or not sweph.get("jd_ut"):
+            self.notify.warning(
+                f"play : {event} has no date-time set",
+                source="timeplayer",
+                route=["terminal", "user"],
+            )
+            return
+        self.event_data = data
+        self.jd = sweph["jd_ut"]
+        self.direction = direction
+        self.frames = self.dropped = 0
+        self.window_start = time.monotonic()
+        fps = max(1.0, float(TIME_PLAY.get("fps", 24)))
+        self.timer_id = GLib.timeout_add(max(1, int(1000 / fps)), self.tick)
+        self.notify.debug(
+            f"play {event} at {fps:g} fps",
+            source="timeplayer",
+            route=["terminal"],
+        )
+
+    def stop(self):
+        """stop playing : one full update (validation, hora) for last frame"""
+        if self.timer_id is None:
+            return
+        GLib.source_remove(self.timer_id)
+        self.timer_id = None
+        data, self.event_data = self.event_data, None
+        if data is not None:
+            data.on_datetime_change(data.date_time)
+
+    def tick(self) -> bool:
+        # time runs at target rate even when frames are dropped
+        self.jd += self.direction * float(self.manager.CHANGE_TIME_SELECTED)
+        if self.app.signal_manager.busy(float(TIME_PLAY.get("max lag", 1.0))):
+            self.dropped += 1
+        else:
+            try:
+                self.event_data.set_jd(self.jd)
+            except Exception as e:
+                self.notify.error(
+                    f"play frame failed\n\terror :\n\t{e}",
+                    source="timeplayer",
+                    route=["terminal"],
+                )
+                self.timer_id = None
+                self.event_data = None
+                return False
+            self.frames += 1
+        now = time.monotonic()
+        elapsed = now - self.window_start
+        if elapsed >= 1.0:
+            self.show_fps(self.frames / elapsed, self.dropped)
+            self.frames = self.dropped = 0
+            self.window_start = now
+        return True
+
+    def show_fps(self, fps: float, dropped: int):
+        period = self.manager.time_periods_list[
+            self.manager.ddn_time_periods.get_selected()
+        ]
+        arrow = "▶" if self.direction > 0 else "◀"
+        _update_main_title(
+            self.manager, f"{period} {arrow} {fps:.1f} fps ({dropped} dropped)"
+        )
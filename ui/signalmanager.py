@@ -1,9 +1,53 @@
 # ui/signalmanager.py
 # ruff: noqa: E402
+import threading
+import time
 import gi
 
 gi.require_version("Gtk", "4.0")
-from gi.repository import Gtk  # type: ignore
+from gi.repository import Gtk, GLib  # type: ignore
+from typing import Dict, List, Tuple
+
+# calculation nodes : handler name -> nodes whose results it reads
+# nodes are not run on emit, they are marked dirty & flushed once per
+# main-loop iteration in dependency order on calculation worker ;
+# other handlers run immediately on main thread
+CALC_GRAPH: Dict[str, Tuple[str, ...]] = {
+    "calculate_houses": (),
+    "calculate_positions": (),
+    "calculate_stars": (),
+    "calculate_aspects": ("calculate_positions", "calculate_p2"),
+    "calculate_cycles": ("calculate_positions",),
+    "calculate_vimsottari": ("calculate_positions",),
+    "calculate_varga": ("calculate_positions", "calculate_houses"),
+    "calculate_transit": ("calculate_positions", "calculate_houses"),
+    "calculate_p1": ("calculate_positions", "calculate_houses"),
+    "calculate_p2": ("calculate_positions", "calculate_houses"),
+    "calculate_p3": ("calculate_positions", "calculate_houses"),
+    "calculate_sr": ("calculate_positions", "calculate_houses"),
+    "calculate_lr": ("calculate_positions", "calculate_houses"),
+}
+
+
+def _topo_order(graph: Dict[str, Tuple[str, ...]]) -> List[str]:
+    """nodes sorted so that every node comes after its dependencies"""
+    order: List[str] = []
+    state: Dict[str, int] = {}
+
+    def visit(node):
+        if state.get(node) == 2:
+            return
+        if state.get(node) == 1:
+            raise ValueError(f"signalmanager : cycle in calculation graph at {node}")
+        state[node] = 1
+        for dep in graph.get(node, ()):
+            visit(dep)
+        state[node] = 2
+        order.append(node)
+
+    for node in graph:
+        visit(node)
+    return order
 
 
 class SignalManager:
@@ -11,18 +55,197 @@ class SignalManager:
         # store handlers
         self.app = app or Gtk.Application.get_default()
         self.handlers = {}
+        # calculation graph
+        self.graph = dict(CALC_GRAPH)
+        self.order = _topo_order(self.graph)
+        self.nodes = {}  # node name -> handler
+        self.dirty: Dict[str, list] = {}  # node name -> pending args
+        self.lock = threading.Lock()
+        self.flush_id = None
+        self.coalesced = 0
+        self.last_report = {}
+        # bumped on every edit from main thread, per event (or per node for
+        # signals without event) : results of older edits of same event are
+        # stale, edits of other event do not affect them
+        self.generations: Dict[str, int] = {}
+        # event -> generation at which its data was deleted
+        self.cleared: Dict[str, int] = {}
+        # nodes dirtied while worker runs a batch
+        self.local = threading.local()
+        # monotonic time of graph batch handed to worker, 0 = none in flight
+        self.in_flight = 0.0
 
     def _emit(self, signal_name, *args):
         # print(f"signalmanager : emitting signal : {signal_name}")
+        batch = getattr(self.local, "batch", None)
         for handler in self.handlers.get(signal_name, []):
-            handler(*args)
+            node = getattr(handler, "__name__", "")
+            if node in self.graph:
+                if batch is not None:
+                    self._add_pending(batch, node, args)
+                else:
+                    self._mark_dirty(node, args)
+            elif batch is not None:
+                # emitted from worker : hand over to main thread
+                GLib.idle_add(
+                    self._deliver, *self.local.generation, handler, args
+                )
+            else:
+                handler(*args)
 
     def _connect(self, signal_name, handler):
         # print(f"signalmanager : connecting signal : {signal_name}")
         if signal_name not in self.handlers:
             self.handlers[signal_name] = []
         self.handlers[signal_name].append(handler)
+        node = getattr(handler, "__name__", "")
+        if node in self.graph:
+            self.nodes[node] = handler
 
     def _disconnect(self, signal_name, handler):
         if signal_name in self.handlers and handler in self.handlers[signal_name]:
             self.handlers[signal_name].remove(handler)
+
+    def _add_pending(self, dirty, node, args):
+        # run for all events (none) covers runs for one event & vice versa
+        pending = dirty.setdefault(node, [])
+        if args in pending or (self._event_args(args) and (None,) in pending):
+            self.coalesced += 1
+        elif args == (None,):
+            kept = [a for a in pending if not self._event_args(a)]
+            self.coalesced += len(pending) - len(kept)
+            pending[:] = kept + [args]
+        else:
+            pending.append(args)
+
+    @staticmethod
+    def _event_args(args):
+        # signal for single event : ("e1",) or ("e2",)
+        return len(args) == 1 and args[0] in ("e1", "e2")
+
+    @staticmethod
+    def _generation_key(node, args):
+        # event name ("e1", "e2") if signal carries one, else node name
+        if args and isinstance(args[0], str) and args[0] in ("e1", "e2"):
+            return args[0]
+        return node
+
+    def _mark_dirty(self, node, args):
+        """queue node with args, same args are coalesced into one run"""
+        key = self._generation_key(node, args)
+        with self.lock:
+            self._add_pending(self.dirty, node, args)
+            self.generations[key] = self.generations.get(key, 0) + 1
+        if self.flush_id is None:
+            self.flush_id = GLib.idle_add(self._flush)
+
+    def clear_event(self, event):
+        """event data deleted (ie e2) : drop its queued runs ; results of its
+        older edits, in flight or queued in running batch, are discarded"""
+        with self.lock:
+            for node in list(self.dirty):
+                kept = [
+                    args
+                    for args in self.dirty[node]
+                    if self._generation_key(node, args) != event
+                ]
+                if kept:
+                    self.dirty[node] = kept
+                else:
+                    del self.dirty[node]
+            generation = self.generations.get(event, 0) + 1
+            self.generations[event] = generation
+            self.cleared[event] = generation
+
+    def _flush(self):
+        """hand dirty nodes to calculation worker, once per main-loop iteration"""
+        self.flush_id = None
+        executor = getattr(self.app, "executor", None)
+        if executor is None:
+            self._run_nodes()
+            return False
+        # job reads dirty set when it starts : waiting job is simply replaced
+        self.in_flight = time.monotonic()
+        executor.submit("signal graph", self._run_nodes, (), self._report)
+        return False
+
+    def busy(self, max_lag: float = 1.0) -> bool:
+        """calculation graph has queued or running nodes (ie for frame dropping)
+        batch running longer than max_lag seconds is not waited for"""
+        if self.dirty or self.flush_id is not None:
+            return True
+        return bool(self.in_flight) and time.monotonic() - self.in_flight < max_lag
+
+    def _run_nodes(self):
+        """run dirty nodes once each in dependency order"""
+        with self.lock:
+            batch, self.dirty = self.dirty, {}
+            generations = dict(self.generations)
+        if not batch:
+            return None
+        self.local.batch = batch
+        ran: List[str] = []
+        try:
+            # nodes emit while running : dependants join batch & run in same
+            # pass ; repeat only if an upstream node got dirty again
+            passes = 0
+            while batch and passes < len(self.order):
+                passes += 1
+                for node in self.order:
+                    pending = batch.pop(node, None)
+                    if not pending:
+                        continue
+                    handler = self.nodes.get(node)
+                    for args in pending:
+                        # ui updates emitted by handler carry its own edit
+                        key = self._generation_key(node, args)
+                        if self.cleared.get(key, 0) > generations.get(key, 0):
+                            # event deleted after batch started : keep it deleted
+                            continue
+                        self.local.generation = (key, generations.get(key, 0))
+                        try:
+                            handler(*args)
+                        except Exception as e:
+                            self._notify_error(
+                                f"node {node} failed\n\terror :\n\t{e}"
+                            )
+                    ran.append(node)
+        finally:
+            self.local.batch = None
+        skipped = [n for n in self.order if n in self.nodes and n not in ran]
+        report = {
+            "ran": ran,
+            "skipped": skipped,
+            "coalesced": self.coalesced,
+            "generations": generations,
+        }
+        self.coalesced = 0
+        return report
+
+    def _deliver(self, key, generation, handler, args):
+        # main thread : skip ui updates computed for superseded edit of same
+        # event / node
+        if generation == self.generations.get(key, 0):
+            handler(*args)
+        return False
+
+    def _report(self, report):
+        self.in_flight = 0.0
+        if not report:
+            return
+        self.last_report = report
+        notify = getattr(self.app, "notify_manager", None)
+        if notify:
+            notify.debug(
+                f"ran : {report['ran']}\nskipped : {report['skipped']}\n"
+                f"coalesced : {report['coalesced']}",
+                source="signalmanager",
+                route=[""],
+            )
+
+    def _notify_error(self, msg):
+        notify = getattr(self.app, "notify_manager", None)
+        if notify:
+            notify.error(msg, source="signalmanager", route=["terminal"])
+        else:
+            print(f"signalmanager : {msg}")
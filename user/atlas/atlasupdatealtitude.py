@@ -1,13 +1,19 @@
+import os
+import sys
 import sqlite3
-import requests
 import time
 import logging
+import numpy as np
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# srtm .hgt tiles : 1x1 degree, big-endian int16, north row first ;
+# 3601 x 3601 (1 arc-second) or 1201 x 1201 (3 arc-seconds)
+HGT_VOID = -32768
+
 
 def get_cities(db_path):
     conn = sqlite3.connect(db_path)
@@ -30,6 +36,9 @@ def get_cities(db_path):
 
 
 def get_elevations(locations):
+    # http api : only needed without local dem tiles
+    import requests
+
     locations_str = "|".join([f"{lat},{lon}" for lat, lon in locations])
     url = f"https://api.open-elevation.com/api/v1/lookup?locations={locations_str}"
     logging.info(f"Requesting elevations from API: {url}")  # Add this line for logging
@@ -43,14 +52,15 @@ def get_elevations(locations):
         return [None] * len(locations)
 
 
-def update_elevation(db_path, city_id, elevation):
+def update_elevations(db_path, rows):
+    """write (city_id, elevation) pairs in one transaction"""
+    conn = sqlite3.connect(db_path)
     try:
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        cur.execute(
-            "UPDATE GeoNames SET elevation = ? WHERE _idx = ?", (elevation, city_id)
-        )
-        conn.commit()
+        with conn:
+            conn.executemany(
+                "UPDATE GeoNames SET elevation = ? WHERE _idx = ?",
+                [(int(round(elev)), city_id) for city_id, elev in rows],
+            )
     except sqlite3.Error as e:
         logging.error(f"Error updating database: {e}")
     finally:
@@ -63,7 +73,86 @@ def save_cities_to_file(cities, filename):
             file.write(f"{city[0]}, {city[1]}, {city[2]}, {city[3]}\n")
 
 
-def main(db_path):
+def hgt_name(lat0, lon0):
+    # tile named after its south-west corner, ie N46E014.hgt
+    ns = "N" if lat0 >= 0 else "S"
+    ew = "E" if lon0 >= 0 else "W"
+    return f"{ns}{abs(lat0):02d}{ew}{abs(lon0):03d}.hgt"
+
+
+def open_tile(dem_dir, lat0, lon0):
+    """memory-mapped tile or None : only sampled pages are read from disk"""
+    path = os.path.join(dem_dir, hgt_name(lat0, lon0))
+    if not os.path.exists(path):
+        return None
+    size = int(round((os.path.getsize(path) // 2) ** 0.5))
+    return np.memmap(path, dtype=">i2", mode="r", shape=(size, size))
+
+
+def bilinear(tile, lats, lons, lat0, lon0):
+    """elevations inside one tile, void corners are left out of weights"""
+    n = tile.shape[0] - 1
+    y = (lat0 + 1 - lats) * n
+    x = (lons - lon0) * n
+    i = np.clip(np.floor(y).astype(np.int64), 0, n - 1)
+    j = np.clip(np.floor(x).astype(np.int64), 0, n - 1)
+    fy, fx = y - i, x - j
+    corners = np.stack(
+        [tile[i, j], tile[i, j + 1], tile[i + 1, j], tile[i + 1, j + 1]]
+    ).astype(np.float64)
+    weights = np.stack([(1 - fy) * (1 - fx), (1 - fy) * fx, fy * (1 - fx), fy * fx])
+    valid = corners != HGT_VOID
+    weights = np.where(valid, weights, 0.0)
+    total = weights.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        elev = (corners * weights).sum(axis=0) / total
+    return np.where(total > 0, elev, np.nan)
+
+
+def dem_elevations(lats, lons, dem_dir):
+    """bilinear elevation for every point, nan where no tile / only voids"""
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    out = np.full(lats.size, np.nan)
+    lat0 = np.floor(lats).astype(np.int64)
+    lon0 = np.floor(lons).astype(np.int64)
+    tiles, inverse = np.unique(
+        np.stack([lat0, lon0], axis=1), axis=0, return_inverse=True
+    )
+    inverse = inverse.ravel()
+    for t, (la, lo) in enumerate(tiles.tolist()):
+        tile = open_tile(dem_dir, la, lo)
+        if tile is None:
+            continue
+        sel = np.nonzero(inverse == t)[0]
+        out[sel] = bilinear(tile, lats[sel], lons[sel], la, lo)
+    return out
+
+
+def backfill_from_dem(db_path, dem_dir):
+    """fill elevation = 0 rows from local srtm tiles, no network"""
+    start = time.time()
+    cities = get_cities(db_path)
+    if not cities:
+        logging.info("No cities without elevation")
+        return
+    ids = np.array([c[0] for c in cities])
+    lats = np.array([c[2] for c in cities], dtype=np.float64)
+    lons = np.array([c[3] for c in cities], dtype=np.float64)
+    elevations = dem_elevations(lats, lons, dem_dir)
+    # sea level / void samples stay 0
+    found = np.nonzero(~np.isnan(elevations) & (np.round(elevations) != 0))[0]
+    update_elevations(db_path, zip(ids[found].tolist(), elevations[found].tolist()))
+    logging.info(
+        f"Updated {found.size} of {len(cities)} cities from DEM "
+        f"in {time.time() - start:.1f} s"
+    )
+
+
+def main(db_path, dem_dir=None):
+    if dem_dir:
+        backfill_from_dem(db_path, dem_dir)
+        return
     cities = get_cities(db_path)
     save_cities_to_file(cities, "cities.txt")  # Save cities to a text file
     # batch_size = 100  # Adjust batch size according to your needs and API limitations
@@ -71,22 +160,22 @@ def main(db_path):
     #     batch = cities[i : i + batch_size]
     #     locations = [(lat, lon) for _, _, lat, lon in batch]
     #     elevations = get_elevations(locations)
-    #     for (city_id, name, lat, lon), elevation in zip(batch, elevations):
-    #         if elevation is not None:
-    #             update_elevation(db_path, city_id, elevation)
-    #             logging.info(
-    #                 f"Updated city: {name} (ID: {city_id}) with elevation: {elevation} meters"
-    #             )
-    #         else:
-    #             logging.warning(
-    #                 f"Failed to get elevation for city: {name} (ID: {city_id})"
-    #             )
+    #     updated = [
+    #         (city_id, elevation)
+    #         for (city_id, name, lat, lon), elevation in zip(batch, elevations)
+    #         if elevation is not None
+    #     ]
+    #     update_elevations(db_path, updated)
+    #     logging.info(f"Updated {len(updated)} of {len(batch)} cities")
     #     time.sleep(1)  # To avoid hitting the API rate limit
     #
 
 
 if __name__ == "__main__":
+    # atlasupdatealtitude.py [atlas.db] [srtm tiles folder]
     db_path = (
         "/media/aumhren/susaTera/3.astro/_archive/pyswisseph.bu/atlas.db.bu/atlas.db"
     )
-    main(db_path)
+    if len(sys.argv) > 1:
+        db_path = sys.argv[1]
+    main(db_path, sys.argv[2] if len(sys.argv) > 2 else None)
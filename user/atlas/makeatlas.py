@@ -5,6 +5,16 @@
 
 Works best on linuxes, for now.
 
+Country files are parsed in a process pool and loaded with executemany in
+large transactions ; indexes are created after the load. Progress is kept in
+out/atlas.checkpoint : an interrupted build resumes where it stopped.
+
+usage :
+    makeatlas.py [--offline] [--jobs N]
+        --offline : no downloads, use files already in in/ (.txt or .zip)
+        --jobs N : parser processes (default : cpu count)
+    makeatlas.py --index path/to/atlas.db : only add search indexes
+
 """
 
 # CONFIGURATION
@@ -26,6 +36,9 @@ _workdir = "."
 # _minpop = 1
 _minpop = 1000
 
+# rows per transaction while loading cities
+_batchrows = 200000
+
 # country codes
 # this list must be up to date with geonames ftp
 allcodes = [
@@ -284,14 +297,29 @@ allcodes = [
 # END CONFIG
 
 import sys
+import io
+import json
 import os.path
+import zipfile
+from multiprocessing import Pool
 from sqlite3 import dbapi2 as sqlite
 
+_offline = False
+_checkpoint = "out/atlas.checkpoint"
+
+
+def download(url, path):
+    # fetch url into in/ unless offline or already there
+    if os.path.exists(path) or _offline:
+        return os.path.exists(path)
+    os.system("cd in && wget %s" % url)
+    return os.path.exists(path)
+
 
 # Timezones
 
 tzschema = """
-CREATE TABLE Timezones
+CREATE TABLE IF NOT EXISTS Timezones
 (
     _idx integer primary key,
     timezoneid varchar not null unique,
@@ -312,51 +340,40 @@ class TimeZone(object):
         self.dstoffset = line[3]
         self.rawoffset = line[4]
 
-    def insert(self, cur):
-        print("... timezone [%s]" % self.timezoneid)
-        sql = """INSERT INTO Timezones (timezoneid, gmtoffset, dstoffset,
-            rawoffset) VALUES ( ?,?,?,? );"""
-        try:
-            cur.execute(
-                sql, (self.timezoneid, self.gmtoffset, self.dstoffset, self.rawoffset)
-            )
-        except:
-            print("ERR=" + self.timezoneid)
-            raise
+    def row(self):
+        return (self.timezoneid, self.gmtoffset, self.dstoffset, self.rawoffset)
 
     @staticmethod
-    def insertDummy(cur):
-        print("... insert empty timezone")
+    def insert(cur, zones):
+        print("... %d timezones" % len(zones))
         sql = """INSERT INTO Timezones (timezoneid, gmtoffset, dstoffset,
-            rawoffset) VALUES ('?', 0, 0, 0);"""
-        cur.execute(sql)
+            rawoffset) VALUES ( ?,?,?,? );"""
+        # empty timezone first
+        cur.execute(sql, ("?", 0, 0, 0))
+        cur.executemany(sql, [z.row() for z in zones])
 
     @staticmethod
     def downloadFile():
         url = "http://download.geonames.org/export/dump/timeZones.txt"
-        if not os.path.exists("in/timeZones.txt"):
-            os.system("cd in && wget %s && rm -f _timeZones.txt" % url)
-        # sort file
-        if not os.path.exists("in/_timeZones.txt"):
-            os.system("cd in && tail -n +2 timeZones.txt | sort -uk 2 > _timeZones.txt")
+        return download(url, "in/timeZones.txt")
 
     @staticmethod
     def parseFile():
-        f = open("in/_timeZones.txt", "r")
-        lines = f.read()
-        f.close()
-        lines = lines.split("\n")
-        ret = []
+        # skip header, unique & sorted by timezone id
+        with open("in/timeZones.txt", "r") as f:
+            lines = f.read().split("\n")[1:]
+        zones = {}
         for line in lines:
             if line != "":
-                ret.append(TimeZone(line))
-        return ret
+                zone = TimeZone(line)
+                zones.setdefault(zone.timezoneid, zone)
+        return [zones[k] for k in sorted(zones)]
 
 
 # countries
 
 ctyschema = """
-CREATE TABLE CountryInfo
+CREATE TABLE IF NOT EXISTS CountryInfo
 (
     _idx integer primary key,
     iso varchar not null unique,
@@ -405,68 +422,55 @@ class CountryInfo(object):
         self.neighbours = words[17]
         self.equivalentfipscode = words[18]
 
-    def insert(self, cur):
-        print("... country [%s]" % self.iso)
+    def row(self):
+        return (
+            self.iso,
+            self.iso3,
+            self.iso_numeric,
+            self.fips,
+            self.country,
+            self.capital,
+            self.area,
+            self.population,
+            self.continent,
+            self.tld,
+            self.currencycode,
+            self.currencyname,
+            self.phone,
+            self.postalcodeformat,
+            self.postalcoderegex,
+            self.languages,
+            self.geonameid,
+            self.neighbours,
+            self.equivalentfipscode,
+        )
+
+    @staticmethod
+    def insert(cur, cties):
+        print("... %d countries" % len(cties))
         sql = """INSERT INTO CountryInfo (iso, iso3, iso_numeric, fips,
             country, capital, area, population, continent, tld, currencycode,
             currencyname, phone, postalcodeformat, postalcoderegex, languages,
             geonameid, neighbours, equivalentfipscode)
             VALUES ( ?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,? );"""
-        cur.execute(
-            sql,
-            (
-                self.iso,
-                self.iso3,
-                self.iso_numeric,
-                self.fips,
-                self.country,
-                self.capital,
-                self.area,
-                self.population,
-                self.continent,
-                self.tld,
-                self.currencycode,
-                self.currencyname,
-                self.phone,
-                self.postalcodeformat,
-                self.postalcoderegex,
-                self.languages,
-                self.geonameid,
-                self.neighbours,
-                self.equivalentfipscode,
-            ),
-        )
+        cur.executemany(sql, [c.row() for c in cties])
 
     @staticmethod
     def downloadFile():
         url = "http://download.geonames.org/export/dump/countryInfo.txt"
-        if not os.path.exists("in/countryInfo.txt"):
-            os.system("cd in && wget %s" % url)
+        return download(url, "in/countryInfo.txt")
 
     @staticmethod
     def parseFile():
-        f = open("in/countryInfo.txt", "r")
-        lines = f.read()
-        f.close()
-        lines = lines.split("\n")
-        lines = lines[:-1]
-        i = 0
-        ret = []
-        while True:
-            try:
-                line = lines[i]
-            except IndexError:
-                return ret
-            if not line.startswith("#"):
-                ret.append(CountryInfo(line))
-            i += 1
-        #
+        with open("in/countryInfo.txt", "r") as f:
+            lines = f.read().split("\n")
+        return [CountryInfo(line) for line in lines if line and line[0] != "#"]
 
 
 # cities
 
 citiesschema = """
-CREATE TABLE GeoNames
+CREATE TABLE IF NOT EXISTS GeoNames
 (
     _idx integer primary key,
     geonameid integer default null,
@@ -483,7 +487,7 @@ CREATE TABLE GeoNames
     --admin2_code varchar,
     --admin3_code varchar,
     --admin4_code varchar,
-    --population integer,
+    population integer not null default 0,
     elevation integer not null default 0,
     --dem integer,
     timezone integer not null,
@@ -521,59 +525,61 @@ class GeoName(object):
             self.timezone = "?"
         self.modification_date = words[18]
 
-    def insert(self, cur):
-        # print(self.name)
+    def row(self):
+        # country & timezone are resolved to ids by loader
+        return (
+            self.geonameid,
+            self.name,
+            self.asciiname,
+            self.alternatenames,
+            self.latitude,
+            self.longitude,
+            self.country_code,
+            self.population or 0,
+            self.elevation,
+            self.timezone,
+        )
+
+    @staticmethod
+    def insert(cur, rows):
         sql = """INSERT INTO GeoNames (geonameid, name, asciiname,
-            alternatenames, latitude, longitude, country, elevation, timezone)
-            VALUES ( ?,?,?,?,?,?,(SELECT _idx FROM CountryInfo WHERE iso = ?),
-            ?,(SELECT _idx FROM Timezones WHERE timezoneid = ?));"""
-        try:
-            cur.execute(
-                sql,
-                (
-                    self.geonameid,
-                    self.name,
-                    self.asciiname,
-                    self.alternatenames,
-                    self.latitude,
-                    self.longitude,
-                    self.country_code,
-                    self.elevation,
-                    self.timezone,
-                ),
-            )
-        except sqlite.IntegrityError:
-            # print('ERR=(%s)' % self.timezone)
-            raise
+            alternatenames, latitude, longitude, country, population, elevation,
+            timezone)
+            VALUES ( ?,?,?,?,?,?,?,?,?,? );"""
+        cur.executemany(sql, rows)
 
     @staticmethod
     def downloadFile(ctycode):
-        if not os.path.exists("in/%s.txt" % ctycode):
-            if not os.path.exists("in/%s.zip" % ctycode):
-                os.system(
-                    "cd in && wget http://download.geonames.org/export/dump/%s.zip"
-                    % ctycode
-                )
-            os.system("cd in && unzip -o %s.zip" % ctycode)
+        if os.path.exists("in/%s.txt" % ctycode):
+            return True
+        url = "http://download.geonames.org/export/dump/%s.zip" % ctycode
+        return download(url, "in/%s.zip" % ctycode)
 
     @staticmethod
-    def parseFile(ctycode):
+    def readFile(ctycode):
+        # plain text file, or read straight from zip : no unzip needed
         path = "in/%s.txt" % ctycode
-        f = open(path, "r")
-        lines = f.read()
-        f.close()
-        lines = lines.split("\n")
-        lines = lines[:-1]
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        with zipfile.ZipFile("in/%s.zip" % ctycode) as z:
+            with z.open("%s.txt" % ctycode) as f:
+                return io.TextIOWrapper(f, encoding="utf-8").read()
+
+    @staticmethod
+    def parseFile(ctycode):
+        lines = GeoName.readFile(ctycode).split("\n")
+        lines = [l for l in lines if l != ""]
         ret = []
         if ctycode not in ["AN", "BV", "CS", "HM"]:  # those have no P
             for l in lines:
                 name = GeoName(l)
                 if name.feature_class == "P":
                     if name.population and int(name.population) >= _minpop:
-                        ret.append(name)
+                        ret.append(name.row())
         else:
             for l in lines:
-                ret.append(GeoName(l))
+                ret.append(GeoName(l).row())
         return ret
 
     @staticmethod
@@ -588,72 +594,201 @@ class GeoName(object):
         return int(cur.fetchone()[0])
 
 
+def initWorker(offline, workdir):
+    # worker processes may be spawned (not forked) : pass settings explicitly
+    global _offline
+    _offline = offline
+    os.chdir(workdir)
+
+
+def parseCountry(ctycode):
+    # runs in worker process : (code, rows) or (code, None) if file missing
+    if not GeoName.downloadFile(ctycode):
+        return ctycode, None
+    return ctycode, GeoName.parseFile(ctycode)
+
+
+# search indexes : country lookup & trigram full-text index over names
+# (fts5 trigram needs sqlite 3.34+), used by sweph/eventlocation.py
+
+indexschema = """
+CREATE INDEX IF NOT EXISTS GeoNames_country_name
+    ON GeoNames (country, name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS CountryInfo_iso3 ON CountryInfo (iso3);
+CREATE VIRTUAL TABLE IF NOT EXISTS GeoNamesFTS USING fts5
+(
+    name,
+    asciiname,
+    content='GeoNames',
+    content_rowid='_idx',
+    tokenize='trigram'
+);
+INSERT INTO GeoNamesFTS (GeoNamesFTS) VALUES ('rebuild');
+INSERT INTO GeoNamesFTS (GeoNamesFTS) VALUES ('optimize');
+"""
+
+
+def makeIndexes(cur):
+    print("... making search indexes")
+    cur.executescript("begin;" + indexschema + "end;")
+    cur.execute("analyze;")
+
+
+def indexOnly(path):
+    # add search indexes to existing atlas
+    if not os.path.exists(path):
+        print("error: file %s does not exist" % path)
+        sys.exit(1)
+    cnx = sqlite.connect(path, isolation_level=None)
+    makeIndexes(cnx.cursor())
+    cnx.close()
+
+
+# checkpoint : stage & loaded countries, rewritten after every commit
+
+
+def loadCheckpoint():
+    if not os.path.exists(_checkpoint):
+        return None
+    with open(_checkpoint, "r") as f:
+        return json.load(f)
+
+
+def saveCheckpoint(state):
+    tmp = _checkpoint + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, _checkpoint)
+
+
 def connectdb():
     cnx = sqlite.connect("out/atlas.db", isolation_level=None)
     cur = cnx.cursor()
+    # write-ahead log : interrupted run (ctrl-c, crash) leaves db consistent
+    # & batch not committed is deleted & loaded again from checkpoint ;
+    # synchronous normal fsyncs at wal checkpoints only, so an os crash / power
+    # loss may lose last batches (remove out/ & build again if counts look off)
+    cur.execute("PRAGMA journal_mode = WAL;")
+    cur.execute("PRAGMA synchronous = NORMAL;")
+    cur.execute("PRAGMA temp_store = MEMORY;")
+    # large page cache : pages are not spilled mid-transaction
+    cur.execute("PRAGMA cache_size = -262144;")
     return cur
 
 
-def makeTimeZones(cur):
-    print("... making timezones table")
-    TimeZone.downloadFile()
+def makeTables(cur, state):
+    print("... making timezones & countries tables")
+    if not (TimeZone.downloadFile() and CountryInfo.downloadFile()):
+        print("error: in/timeZones.txt or in/countryInfo.txt missing")
+        sys.exit(1)
     cur.execute(tzschema)
-    TimeZone.insertDummy(cur)
-    zones = TimeZone.parseFile()
-    cur.execute("begin;")
-    for z in zones:
-        z.insert(cur)
-    cur.execute("end;")
-
-
-def makeCountries(cur):
-    print("... making countries table")
-    CountryInfo.downloadFile()
     cur.execute(ctyschema)
-    cties = CountryInfo.parseFile()
-    cur.execute("begin;")
-    for c in cties:
-        c.insert(cur)
-    cur.execute("end;")
-
-
-def makeCountry(cur, ctycode):
-    print("... adding locations [%s]" % ctycode)
-    GeoName.downloadFile(ctycode)
-    loc = GeoName.parseFile(ctycode)
+    cur.execute(citiesschema)
     cur.execute("begin;")
-    for l in loc:
-        l.insert(cur)
+    # leftovers of interrupted run
+    cur.execute("DELETE FROM Timezones;")
+    cur.execute("DELETE FROM CountryInfo;")
+    TimeZone.insert(cur, TimeZone.parseFile())
+    CountryInfo.insert(cur, CountryInfo.parseFile())
     cur.execute("end;")
+    state["stage"] = "cities"
+    saveCheckpoint(state)
+
+
+def idMaps(cur):
+    # country iso & timezone id -> row id, resolved in memory while loading
+    cur.execute("SELECT iso, _idx FROM CountryInfo;")
+    countries = dict(cur.fetchall())
+    cur.execute("SELECT timezoneid, _idx FROM Timezones;")
+    zones = dict(cur.fetchall())
+    return countries, zones
+
+
+def makeCities(cur, state, jobs):
+    countries, zones = idMaps(cur)
+    done = set(state["done"])
+    # rows of countries not in checkpoint are leftovers of interrupted batch
+    if done:
+        keep = ",".join(str(countries[c]) for c in done if c in countries)
+        cur.execute("DELETE FROM GeoNames WHERE country NOT IN (%s);" % keep)
+    else:
+        cur.execute("DELETE FROM GeoNames;")
+    todo = [c for c in allcodes if c not in done]
+    print("... making cities table : %d countries to load" % len(todo))
+    batch, batchcodes, missing = [], [], []
+
+    def commit():
+        cur.execute("begin;")
+        GeoName.insert(cur, batch)
+        cur.execute("end;")
+        state["done"] += batchcodes
+        saveCheckpoint(state)
+        print("... committed %d rows %s" % (len(batch), " ".join(batchcodes)))
+        del batch[:]
+        del batchcodes[:]
+
+    unknownzone = zones["?"]
+    with Pool(jobs, initWorker, (_offline, os.getcwd())) as pool:
+        for code, rows in pool.imap_unordered(parseCountry, todo):
+            if rows is None:
+                missing.append(code)
+                continue
+            for r in rows:
+                country = countries.get(r[6])
+                if country is None:
+                    continue
+                zone = zones.get(r[9], unknownzone)
+                batch.append(r[:6] + (country,) + r[7:9] + (zone,))
+            batchcodes.append(code)
+            if len(batch) >= _batchrows:
+                commit()
+    if batchcodes:
+        commit()
+    if missing:
+        print("... missing country files : %s" % " ".join(sorted(missing)))
+    state["stage"] = "indexes"
+    saveCheckpoint(state)
 
 
 def main():
+    global _offline
+    args = sys.argv[1:]
+    _offline = "--offline" in args
+    jobs = int(args[args.index("--jobs") + 1]) if "--jobs" in args else None
     os.chdir(_workdir)
     if not os.path.exists("in"):
         os.mkdir("in")
     if not os.path.exists("out"):
         os.mkdir("out")
-    if os.path.exists("out/atlas.db"):
+    state = loadCheckpoint()
+    if state is not None and state.get("minpop") != _minpop:
+        print("error: checkpoint was made with other _minpop, remove out/")
+        sys.exit(1)
+    if os.path.exists("out/atlas.db") and state is None:
         print("error: file %s/out/atlas.db exists" % _workdir)
         sys.exit(1)
+    if state is None:
+        state = {"minpop": _minpop, "stage": "tables", "done": []}
+    else:
+        print("... resuming at stage [%s]" % state["stage"])
     cur = connectdb()
-    makeTimeZones(cur)
-    makeCountries(cur)
-    print("... making cities table")
-    cur.execute(citiesschema)
-    for code in allcodes:
-        makeCountry(cur, code)
-        # os.system('rm -f in/%s.txt' % code)
-    # tot = 0
-    # print('... counting:')
-    # for code in allcodes:
-    #    cnt = GeoName.count(cur, code)
-    #    print("++ [%s]: %d" % (code, cnt))
-    #    tot += cnt
-    # print('# Total count = %d' % tot)
+    if state["stage"] == "tables":
+        makeTables(cur, state)
+    if state["stage"] == "cities":
+        makeCities(cur, state, jobs)
+    if state["stage"] == "indexes":
+        makeIndexes(cur)
+    # app opens atlas read-only & immutable : wal must be merged into db file
+    cur.execute("PRAGMA journal_mode = DELETE;")
+    os.remove(_checkpoint)
+    print("# Total count = %d" % GeoName.count(cur))
 
 
 if __name__ == "__main__":
-    main()
+    # makeatlas.py --index path/to/atlas.db : only add search indexes
+    if len(sys.argv) > 2 and sys.argv[1] == "--index":
+        indexOnly(sys.argv[2])
+    else:
+        main()
 
 # vi: set sw=4 ts=4 et
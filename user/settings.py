@@ -381,6 +381,43 @@ CUSTOM_AYANAMSA = {
     # 'astrology of death', for 2000-01-01
     "custom ayanamsa": 23.76694444,
 }
+ASPECT_ORBS = {
+    # orb in degrees per major aspect angle, used for aspect tables & timeline
+    0: 1.5,  # conjunction
+    60: 1.5,  # sextile
+    90: 1.5,  # square
+    120: 1.5,  # trine
+    180: 1.5,  # opposition
+}
+STATION_INDEX = {
+    # precomputed retro stations for mercury - pluto, stored in sweph/ephe/stations
+    # built once per sweph flag (takes a while), then loaded from disk ;
+    # outside this range stations are searched on the fly
+    "start year": 1800,
+    "end year": 2200,
+}
+EPHE_STORE = {
+    # precomputed chebyshev ephemeris tables in sweph/ephe/cheb, built per sweph
+    # flag & ayanamsa with : python -m sweph.ephestore [flag] [ayanamsa]
+    # outside this range, or without table, positions come from sweph
+    "enabled": True,
+    "start year": 1900,
+    "end year": 2100,
+    # max fit error in degrees (lon & lat) : less precise tables are ignored
+    "max error": 1e-6,
+}
+TIME_PLAY = {
+    # play mode (change time at frame rate) : target frames per second ; frames
+    # are dropped while previous one is still calculated, time keeps running
+    "fps": 24,
+    # calculation running longer than this (seconds) no longer blocks next frame
+    "max lag": 1.0,
+}
+TIMELINE = {
+    # transit-to-natal aspect timeline ('l' hotkey) : days searched from event 2
+    # (or event 1) onwards ; longer span takes longer
+    "span days": 365.25,
+}
 FILES = {
     # --- path to ephemerides folder, with min semo_18.se1 & sepl_18.se1 files, or
     # a complete ephe folder https://github.com/aloistr/swisseph/tree/master/ephe